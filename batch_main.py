@@ -0,0 +1,18 @@
+from argparse import Namespace
+
+from src.app.batch_scoring_app import BatchScoringApp
+from src.service.transformations import (
+    clean_features,  # noqa
+    get_features_names,  # noqa
+    remove_outliers,  # noqa
+)
+
+if __name__ == "__main__":
+    args: Namespace = BatchScoringApp.parse_args()
+    app: BatchScoringApp = BatchScoringApp(
+        model_path=args.model,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        compiled=not args.no_compiled,
+    )
+    app.run(args.source, args.output)
@@ -0,0 +1,229 @@
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable
+from datetime import datetime, timezone
+from io import BytesIO
+from json import dump, load
+from pathlib import Path
+from platform import platform, python_version
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any, ClassVar
+
+import numpy
+import pandas
+from numpy import mean, percentile
+from pandas import DataFrame
+
+from benchmarks.synthetic_data import SyntheticCreditData
+from src.controller.streamlit_controller import StreamlitController
+from src.controller.upload_cache import PARSED_UPLOADS
+from src.service.arrow_preprocessing_service import ArrowPreprocessingService
+from src.service.prediction_service import PredictionService
+from src.service.preprocessing_service import PreprocessingService
+from src.service.transformations import (
+    clean_features,  # noqa
+    get_features_names,  # noqa
+    remove_outliers,  # noqa
+)
+
+# builds the input of a stage outside the timed region, then runs the stage on it
+Stage = tuple[Callable[[], Any], Callable[[Any], Any]]
+
+
+class HotPathsBenchmark:
+    """Times the preprocessing and prediction hot paths over synthetic batches.
+
+    Every stage runs `repeats` times per batch size and reports latency percentiles and
+    throughput. Peak memory is measured in one extra run under `tracemalloc`, kept apart from
+    the timed runs because tracing slows allocations down; memory allocated by Arrow outside
+    the Python allocator is not traced.
+    """
+
+    # tracing the unplanned model over 1M rows takes about 6 GB, pass larger sizes explicitly
+    DEFAULT_SIZES: ClassVar[list[int]] = [1_000, 10_000, 100_000, 300_000]
+    DEFAULT_MODEL: ClassVar[str] = r"models/credit_classification-logistic_regression-v2.joblib"
+    STAGES: ClassVar[list[str]] = [
+        "preprocessing",
+        "preprocessing_arrow",
+        "prediction",
+        "prediction_compiled",
+        "batch_prediction",
+        "batch_prediction_cached",
+    ]
+
+    def __init__(self, model_path: str = DEFAULT_MODEL, repeats: int = 5, seed: int = 42):
+        """Initializes the benchmark.
+
+        Args:
+            model_path (str, optional): Model scored by the prediction stages.
+                Defaults to DEFAULT_MODEL.
+            repeats (int, optional): Timed runs per stage and batch size. Defaults to 5.
+            seed (int, optional): Seed of the synthetic data. Defaults to 42.
+        """
+        assert repeats > 0
+
+        self.__model_path: str = model_path
+        self.__repeats: int = repeats
+        self.__seed: int = seed
+        self.__data: SyntheticCreditData = SyntheticCreditData(seed=seed)
+        self.__preprocessing: PreprocessingService = PreprocessingService()
+        self.__arrow_preprocessing: ArrowPreprocessingService = ArrowPreprocessingService()
+        self.__prediction: PredictionService = PredictionService(model_path)
+        self.__compiled_prediction: PredictionService = PredictionService(model_path, compiled=True)
+        self.__controller: StreamlitController = StreamlitController(
+            self.__prediction, self.__preprocessing
+        )
+
+    @staticmethod
+    def __uncached(upload: BytesIO) -> BytesIO:
+        """A copy of the upload, which the controller has to parse again."""
+        PARSED_UPLOADS.clear()
+        return BytesIO(upload.getbuffer())
+
+    def __cached(self, upload: BytesIO) -> Callable[[], BytesIO]:
+        """Prepares copies of the upload, parsed once by a warm-up run before the first."""
+        warm: list[bool] = []
+
+        def prepare() -> BytesIO:
+            if not warm:
+                self.__controller.handle_batch_prediction(BytesIO(upload.getbuffer()))
+                warm.append(True)
+            return BytesIO(upload.getbuffer())
+
+        return prepare
+
+    def __stages(self, batch: DataFrame, upload: BytesIO) -> dict[str, Stage]:
+        """Stage inputs are copied before every run, preprocessing dedups its input inplace.
+
+        The controller caches parsed uploads: `batch_prediction` clears the cache before every
+        run, `batch_prediction_cached` only times runs that reuse the parse.
+        """
+        preprocessed: DataFrame = self.__preprocessing.execute(batch.copy())
+        return {
+            "preprocessing": (batch.copy, self.__preprocessing.execute),
+            "preprocessing_arrow": (batch.copy, self.__arrow_preprocessing.execute),
+            "prediction": (preprocessed.copy, self.__prediction.execute),
+            "prediction_compiled": (preprocessed.copy, self.__compiled_prediction.execute),
+            "batch_prediction": (
+                lambda: self.__uncached(upload),
+                self.__controller.handle_batch_prediction,
+            ),
+            "batch_prediction_cached": (
+                self.__cached(upload),
+                self.__controller.handle_batch_prediction,
+            ),
+        }
+
+    def __measure(self, stage: Stage, rows: int) -> dict[str, float]:
+        prepare, run = stage
+        latencies: list[float] = []
+        for _ in range(self.__repeats):
+            data: Any = prepare()
+            began: float = perf_counter()
+            run(data)
+            latencies.append(perf_counter() - began)
+
+        data = prepare()
+        start()
+        try:
+            run(data)
+            peak: int = get_traced_memory()[1]
+        finally:
+            stop()
+
+        p50, p95, p99 = percentile(latencies, [50, 95, 99]).tolist()
+        return {
+            "p50_s": p50,
+            "p95_s": p95,
+            "p99_s": p99,
+            "mean_s": float(mean(latencies)),
+            "rows_per_s": rows / p50,
+            "peak_memory_mb": peak / 2**20,
+        }
+
+    def run(self, sizes: list[int], stages: list[str]) -> dict[str, Any]:
+        """Runs the selected stages over batches of every size.
+
+        Args:
+            sizes (list[int]): Rows per synthetic batch.
+            stages (list[str]): Names of the stages to run, a subset of STAGES.
+
+        Returns:
+            dict[str, Any]: Run metadata and one result per stage and batch size.
+        """
+        results: list[dict[str, Any]] = []
+        for rows in sizes:
+            batch: DataFrame = self.__data.frame(rows)
+            upload: BytesIO = BytesIO(batch.to_csv(index=False).encode())
+            available: dict[str, Stage] = self.__stages(batch, upload)
+            for name in stages:
+                result: dict[str, Any] = {
+                    "stage": name,
+                    "rows": rows,
+                    **self.__measure(available[name], rows),
+                }
+                print(
+                    f"{name:<24} {rows:>10,} rows  p50 {result['p50_s']:9.4f}s  "
+                    f"{result['rows_per_s']:>12,.0f} rows/s  "
+                    f"peak {result['peak_memory_mb']:9.1f} MB"
+                )
+                results.append(result)
+
+        return {
+            "metadata": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": python_version(),
+                "numpy": numpy.__version__,
+                "pandas": pandas.__version__,
+                "platform": platform(),
+                "model": self.__model_path,
+                "repeats": self.__repeats,
+                "seed": self.__seed,
+            },
+            "results": results,
+        }
+
+    @staticmethod
+    def compare(baseline: dict[str, Any], current: dict[str, Any]) -> None:
+        """Prints the throughput change of every stage and size present in both runs."""
+        previous: dict[tuple[str, int], dict[str, Any]] = {
+            (result["stage"], result["rows"]): result for result in baseline["results"]
+        }
+        for result in current["results"]:
+            old: dict[str, Any] | None = previous.get((result["stage"], result["rows"]))
+            if old is None:
+                continue
+            speedup: float = result["rows_per_s"] / old["rows_per_s"]
+            print(
+                f"{result['stage']:<24} {result['rows']:>10,} rows  "
+                f"{old['rows_per_s']:>12,.0f} -> {result['rows_per_s']:>12,.0f} rows/s  "
+                f"x{speedup:.2f}"
+            )
+
+    @classmethod
+    def parse_args(cls) -> Namespace:
+        parser: ArgumentParser = ArgumentParser(
+            description="Benchmark the preprocessing and prediction hot paths."
+        )
+        parser.add_argument("--sizes", type=int, nargs="+", default=cls.DEFAULT_SIZES)
+        parser.add_argument("--stages", nargs="+", choices=cls.STAGES, default=cls.STAGES)
+        parser.add_argument("--repeats", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--model", default=cls.DEFAULT_MODEL)
+        parser.add_argument("-o", "--output", help="JSON file the results are saved to")
+        parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+        return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: Namespace = HotPathsBenchmark.parse_args()
+    benchmark: HotPathsBenchmark = HotPathsBenchmark(args.model, args.repeats, args.seed)
+    report: dict[str, Any] = benchmark.run(args.sizes, args.stages)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as file:
+            dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            HotPathsBenchmark.compare(load(file), report)
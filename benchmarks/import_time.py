@@ -0,0 +1,158 @@
+from argparse import ArgumentParser, Namespace
+from datetime import datetime, timezone
+from json import dump, load, loads
+from pathlib import Path
+from platform import platform, python_version
+from subprocess import run
+from sys import executable
+from time import perf_counter
+from typing import Any, ClassVar
+
+from numpy import median
+
+# imports an entry point in a fresh interpreter and reports how long it took
+PROBE: str = """
+import json, sys, time
+from importlib import import_module
+
+sys.path.insert(0, ".")
+start = time.perf_counter()
+import_module(sys.argv[1])
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}))
+"""
+
+
+class ImportTimeBenchmark:
+    """Times the cold start of every entry point, one fresh interpreter per run.
+
+    Importing an entry point module loads everything it needs before serving its first
+    request (its `__main__` block does not run). Every run reports the import time measured
+    inside the interpreter and the wall time of the whole process, interpreter startup
+    included, along with the heavy packages that ended up loaded: scoring-only entry points
+    should never load Streamlit or plotting.
+    """
+
+    ENTRY_POINTS: ClassVar[dict[str, str]] = {
+        "streamlit": "main",
+        "http": "http_main",
+        "batch": "batch_main",
+    }
+    HEAVY_PACKAGES: ClassVar[list[str]] = [
+        "streamlit",
+        "matplotlib",
+        "seaborn",
+        "shap",
+        "sklearn",
+        "imblearn",
+        "scipy",
+        "pyarrow",
+    ]
+
+    def __init__(self, repeats: int = 5):
+        assert repeats > 0
+
+        self.__repeats: int = repeats
+
+    def __measure(self, module: str) -> dict[str, Any]:
+        imports: list[float] = []
+        processes: list[float] = []
+        modules: list[str] = []
+        for _ in range(self.__repeats):
+            began: float = perf_counter()
+            # fixed command, the module is one of ENTRY_POINTS
+            probe = run(  # noqa: S603
+                [executable, "-c", PROBE, module], capture_output=True, text=True, check=False
+            )
+            processes.append(perf_counter() - began)
+            if probe.returncode:  # e.g. a dependency missing from this environment
+                return {"error": probe.stderr.strip().splitlines()[-1]}
+            output: dict[str, Any] = loads(probe.stdout.splitlines()[-1])
+            imports.append(output["seconds"])
+            modules = output["modules"]
+
+        return {
+            "import_s": float(median(imports)),
+            "process_s": float(median(processes)),
+            "modules": len(modules),
+            "heavy_packages": [package for package in self.HEAVY_PACKAGES if package in modules],
+        }
+
+    def run(self, entry_points: list[str]) -> dict[str, Any]:
+        """Times the selected entry points.
+
+        Args:
+            entry_points (list[str]): Names of the entry points, a subset of ENTRY_POINTS.
+
+        Returns:
+            dict[str, Any]: Run metadata and one result per entry point.
+        """
+        results: list[dict[str, Any]] = []
+        for name in entry_points:
+            result: dict[str, Any] = {
+                "entry_point": name,
+                **self.__measure(self.ENTRY_POINTS[name]),
+            }
+            if "error" in result:
+                print(f"{name:<10} failed: {result['error']}")
+            else:
+                print(
+                    f"{name:<10} import {result['import_s']:7.3f}s  "
+                    f"process {result['process_s']:7.3f}s  {result['modules']:>5} modules  "
+                    f"heavy: {', '.join(result['heavy_packages']) or '-'}"
+                )
+            results.append(result)
+
+        return {
+            "metadata": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": python_version(),
+                "platform": platform(),
+                "repeats": self.__repeats,
+            },
+            "results": results,
+        }
+
+    @staticmethod
+    def compare(baseline: dict[str, Any], current: dict[str, Any]) -> None:
+        """Prints the import time change of every entry point timed in both runs."""
+        previous: dict[str, dict[str, Any]] = {
+            result["entry_point"]: result for result in baseline["results"]
+        }
+        for result in current["results"]:
+            old: dict[str, Any] | None = previous.get(result["entry_point"])
+            if old is None or "error" in old or "error" in result:
+                continue
+            print(
+                f"{result['entry_point']:<10} "
+                f"{old['import_s']:7.3f} -> {result['import_s']:7.3f}s  "
+                f"x{old['import_s'] / result['import_s']:.2f}"
+            )
+
+    @classmethod
+    def parse_args(cls) -> Namespace:
+        parser: ArgumentParser = ArgumentParser(
+            description="Benchmark the cold-start import time of every entry point."
+        )
+        parser.add_argument(
+            "--entry-points",
+            nargs="+",
+            choices=list(cls.ENTRY_POINTS),
+            default=list(cls.ENTRY_POINTS),
+        )
+        parser.add_argument("--repeats", type=int, default=5)
+        parser.add_argument("-o", "--output", help="JSON file the results are saved to")
+        parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+        return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: Namespace = ImportTimeBenchmark.parse_args()
+    report: dict[str, Any] = ImportTimeBenchmark(args.repeats).run(args.entry_points)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as file:
+            dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            ImportTimeBenchmark.compare(load(file), report)
@@ -0,0 +1,330 @@
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from json import dump, load
+from pathlib import Path
+from platform import platform, python_version
+from tempfile import TemporaryDirectory
+from threading import Lock
+from time import perf_counter, sleep
+from typing import Any, ClassVar
+
+from numpy import array, floor, ndarray, percentile
+from numpy.random import Generator, default_rng
+from pandas import DataFrame
+
+from benchmarks.synthetic_data import SyntheticCreditData
+from src.controller.streamlit_controller import StreamlitController
+from src.service.arrow_preprocessing_service import ArrowPreprocessingService
+from src.service.prediction_log_service import PredictionLogService
+from src.service.prediction_service import PredictionService
+from src.service.transformations import (
+    clean_features,  # noqa
+    get_features_names,  # noqa
+    remove_outliers,  # noqa
+)
+
+# intended start, actual start and end of a request, and whether it raised
+Sample = tuple[float, float, float, bool]
+
+
+class LoadTestBenchmark:
+    """Replays single applicant requests at a target rate, open loop, to find saturation.
+
+    Requests are sent on a fixed schedule (evenly spaced, or Poisson arrivals) whether or
+    not the previous ones are done, and served by `concurrency` worker threads. Latency is
+    measured from the time a request was due, not from the time a worker picked it up: once
+    the target saturates, requests queue and their latency grows with the queue instead of
+    the generator silently slowing down (coordinated omission). Every rate runs for
+    `duration` seconds and is reported per `interval` second window of completion, with a
+    summary telling whether the target kept up.
+    """
+
+    DEFAULT_MODEL: ClassVar[str] = r"models/credit_classification-logistic_regression-v2.joblib"
+    DEFAULT_RATES: ClassVar[list[float]] = [25, 50, 100, 200]
+    TARGETS: ClassVar[list[str]] = [
+        "prediction",
+        "prediction_compiled",
+        "controller",
+        "controller_logged",
+    ]
+    KEPT_UP: ClassVar[float] = 0.95  # share of the target rate completed to count as sustained
+    SYNTHETIC_REQUESTS: ClassVar[int] = 10_000
+
+    def __init__(  # noqa: PLR0913
+        self,
+        target: str = "prediction",
+        concurrency: int = 4,
+        duration: float = 10.0,
+        interval: float = 1.0,
+        model_path: str = DEFAULT_MODEL,
+        seed: int = 42,
+    ):
+        """Initializes the benchmark and the service under load.
+
+        Args:
+            target (str, optional): What serves the requests, one of TARGETS.
+                Defaults to "prediction".
+            concurrency (int, optional): Worker threads serving requests. Defaults to 4.
+            duration (float, optional): Seconds every rate is sustained. Defaults to 10.0.
+            interval (float, optional): Seconds per reported window. Defaults to 1.0.
+            model_path (str, optional): Model scoring the requests. Defaults to DEFAULT_MODEL.
+            seed (int, optional): Seed of the synthetic requests and of Poisson arrivals.
+                Defaults to 42.
+        """
+        assert target in self.TARGETS
+        assert concurrency > 0
+        assert duration > 0
+        assert interval > 0
+
+        self.__target: str = target
+        self.__concurrency: int = concurrency
+        self.__duration: float = duration
+        self.__interval: float = interval
+        self.__model_path: str = model_path
+        self.__seed: int = seed
+        self.__rng: Generator = default_rng(seed)
+        self.__log_dir: TemporaryDirectory[str] = TemporaryDirectory()
+        self.__prediction_log: PredictionLogService | None = None
+        self.__handler: Callable[[dict[str, Any]], Any] = self.__build(target)
+
+    def __build(self, target: str) -> Callable[[dict[str, Any]], Any]:
+        prediction: PredictionService = PredictionService(
+            self.__model_path, compiled=target == "prediction_compiled"
+        )
+        if target.startswith("prediction"):
+            return prediction.execute
+        if target == "controller_logged":
+            self.__prediction_log = PredictionLogService(
+                str(Path(self.__log_dir.name) / "predictions.jsonl")
+            )
+        controller: StreamlitController = StreamlitController(
+            prediction, ArrowPreprocessingService(), prediction_log=self.__prediction_log
+        )
+        return controller.handle_prediction
+
+    @classmethod
+    def load_requests(cls, path: str | None = None, seed: int = 42) -> list[dict[str, Any]]:
+        """Loads the requests to replay, one applicant each.
+
+        Args:
+            path (str | None, optional): Prediction log written by `PredictionLogService`,
+                e.g. logs/predictions.jsonl, read back with its rotated files. Requests are
+                sampled from the raw CSV if None.
+                Either way, requests preprocessing would leave incomplete are left out.
+                Defaults to None.
+            seed (int, optional): Seed of the synthetic requests. Defaults to 42.
+
+        Returns:
+            list[dict[str, Any]]: The requests, as the form sends them.
+        """
+        raw: DataFrame = (
+            SyntheticCreditData(seed=seed).frame(cls.SYNTHETIC_REQUESTS)
+            if path is None
+            else PredictionLogService.read(path)
+        )
+        # the form only sends valid, complete requests
+        requests: DataFrame = ArrowPreprocessingService().execute(raw).dropna()
+        assert len(requests), "No requests to replay"
+        records: list[dict[str, Any]] = requests.astype(object).to_dict(orient="records")
+        return records
+
+    def __arrivals(self, rate: float, poisson: bool) -> ndarray:
+        """Seconds after the start at which every request of a run is due."""
+        if not poisson:
+            times: ndarray = array(range(int(rate * self.__duration))) / rate
+            return times
+        gaps: ndarray = self.__rng.exponential(1 / rate, size=int(rate * self.__duration * 2))
+        times = gaps.cumsum()
+        return times[times < self.__duration]
+
+    def __serve(
+        self, request: dict[str, Any], due: float, samples: list[Sample], lock: Lock
+    ) -> None:
+        began: float = perf_counter()
+        failed: bool = False
+        try:
+            self.__handler(request)
+        except Exception:  # counted, a load test reports errors rather than stopping on them
+            failed = True
+        sample: Sample = (due, began, perf_counter(), failed)
+        with lock:
+            samples.append(sample)
+
+    def __generate(
+        self, requests: list[dict[str, Any]], rate: float, poisson: bool
+    ) -> tuple[list[Sample], float]:
+        """Sends the requests of one run on schedule and waits for all of them to complete.
+
+        Returns:
+            tuple[list[Sample], float]: The samples, and the `perf_counter` time of the start.
+        """
+        samples: list[Sample] = []
+        lock: Lock = Lock()
+        arrivals: ndarray = self.__arrivals(rate, poisson)
+        with ThreadPoolExecutor(
+            max_workers=self.__concurrency, thread_name_prefix="load-test"
+        ) as pool:
+            start: float = perf_counter()
+            futures: list[Any] = []
+            for index, offset in enumerate(arrivals.tolist()):
+                due: float = start + offset
+                delay: float = due - perf_counter()
+                if delay > 0:
+                    sleep(delay)
+                # sent when due even if the workers are busy, it then waits in the pool queue
+                futures.append(
+                    pool.submit(self.__serve, requests[index % len(requests)], due, samples, lock)
+                )
+            wait(futures)
+        return samples, start
+
+    @staticmethod
+    def __latencies(latencies: ndarray) -> dict[str, float]:
+        if not len(latencies):
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+        p50, p95, p99 = (percentile(latencies, [50, 95, 99]) * 1000).tolist()
+        return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+
+    def __windows(self, outcomes: ndarray) -> list[dict[str, Any]]:
+        """Splits the samples by the window in which they completed."""
+        windows: list[dict[str, Any]] = []
+        indices: ndarray = floor(outcomes[:, 2] / self.__interval).astype(int)
+        for window in range(int(indices.max()) + 1 if len(indices) else 0):
+            selected: ndarray = outcomes[indices == window]
+            windows.append(
+                {
+                    "second": window * self.__interval,
+                    "completed": len(selected),
+                    "throughput": len(selected) / self.__interval,
+                    "errors": int(selected[:, 3].sum()),
+                    **self.__latencies(selected[:, 2] - selected[:, 0]),
+                }
+            )
+        return windows
+
+    def __measure(
+        self, requests: list[dict[str, Any]], rate: float, poisson: bool
+    ) -> dict[str, Any]:
+        samples, start = self.__generate(requests, rate, poisson)
+        outcomes: ndarray = array(samples, dtype=float).reshape(-1, 4)
+        outcomes[:, :3] -= start
+        elapsed: float = float(outcomes[:, 2].max()) if len(outcomes) else self.__duration
+        throughput: float = len(outcomes) / max(elapsed, self.__duration)
+        return {
+            "target_qps": rate,
+            "requests": len(outcomes),
+            "errors": int(outcomes[:, 3].sum()),
+            "throughput": throughput,
+            "sustained": throughput >= self.KEPT_UP * rate,
+            **self.__latencies(outcomes[:, 2] - outcomes[:, 0]),
+            "service_p50_ms": self.__latencies(outcomes[:, 2] - outcomes[:, 1])["p50_ms"],
+            "max_queue_wait_ms": float((outcomes[:, 1] - outcomes[:, 0]).max() * 1000)
+            if len(outcomes)
+            else 0.0,
+            "windows": self.__windows(outcomes),
+        }
+
+    def run(
+        self, requests: list[dict[str, Any]], rates: list[float], poisson: bool = False
+    ) -> dict[str, Any]:
+        """Runs the load at every rate in turn, lowest first.
+
+        Args:
+            requests (list[dict[str, Any]]): Requests replayed in a loop, see `load_requests`.
+            rates (list[float]): Target requests per second.
+            poisson (bool, optional): Poisson arrivals instead of evenly spaced ones.
+                Defaults to False.
+
+        Returns:
+            dict[str, Any]: Run metadata and one result per rate, with its windows.
+        """
+        results: list[dict[str, Any]] = []
+        for rate in sorted(rates):
+            result: dict[str, Any] = self.__measure(requests, rate, poisson)
+            for window in result["windows"]:
+                print(
+                    f"  {window['second']:6.1f}s  {window['throughput']:8.1f} req/s  "
+                    f"p50 {window['p50_ms']:8.1f}  p95 {window['p95_ms']:8.1f}  "
+                    f"p99 {window['p99_ms']:8.1f} ms  errors {window['errors']}"
+                )
+            print(
+                f"{self.__target} @ {rate:g} qps: {result['throughput']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:.1f}  p95 {result['p95_ms']:.1f}  "
+                f"p99 {result['p99_ms']:.1f} ms  errors {result['errors']}/{result['requests']}  "
+                + ("sustained" if result["sustained"] else "SATURATED")
+            )
+            results.append(result)
+
+        if self.__prediction_log is not None:
+            self.__prediction_log.close()
+        return {
+            "metadata": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": python_version(),
+                "platform": platform(),
+                "model": self.__model_path,
+                "target": self.__target,
+                "concurrency": self.__concurrency,
+                "duration_s": self.__duration,
+                "interval_s": self.__interval,
+                "poisson": poisson,
+                "seed": self.__seed,
+            },
+            "results": results,
+        }
+
+    @staticmethod
+    def compare(baseline: dict[str, Any], current: dict[str, Any]) -> None:
+        """Prints the throughput and p99 change at every rate present in both runs."""
+        previous: dict[float, dict[str, Any]] = {
+            result["target_qps"]: result for result in baseline["results"]
+        }
+        for result in current["results"]:
+            old: dict[str, Any] | None = previous.get(result["target_qps"])
+            if old is None:
+                continue
+            print(
+                f"{result['target_qps']:>8g} qps  "
+                f"{old['throughput']:8.1f} -> {result['throughput']:8.1f} req/s  "
+                f"p99 {old['p99_ms']:8.1f} -> {result['p99_ms']:8.1f} ms"
+            )
+
+    @classmethod
+    def parse_args(cls) -> Namespace:
+        parser: ArgumentParser = ArgumentParser(
+            description="Load test single predictions at target rates, open loop."
+        )
+        parser.add_argument("--target", choices=cls.TARGETS, default="prediction")
+        parser.add_argument("--qps", type=float, nargs="+", default=cls.DEFAULT_RATES)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--duration", type=float, default=10.0, help="seconds per rate")
+        parser.add_argument("--interval", type=float, default=1.0, help="seconds per window")
+        parser.add_argument("--poisson", action="store_true", help="Poisson arrivals")
+        parser.add_argument(
+            "--requests", help="Prediction log to replay, synthesized from the raw CSV if omitted"
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--model", default=cls.DEFAULT_MODEL)
+        parser.add_argument("-o", "--output", help="JSON file the results are saved to")
+        parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+        return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: Namespace = LoadTestBenchmark.parse_args()
+    benchmark: LoadTestBenchmark = LoadTestBenchmark(
+        args.target, args.concurrency, args.duration, args.interval, args.model, args.seed
+    )
+    report: dict[str, Any] = benchmark.run(
+        LoadTestBenchmark.load_requests(args.requests, args.seed), args.qps, args.poisson
+    )
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as file:
+            dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            LoadTestBenchmark.compare(load(file), report)
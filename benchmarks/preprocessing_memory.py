@@ -0,0 +1,58 @@
+from argparse import ArgumentParser, Namespace
+from tracemalloc import get_traced_memory, start, stop
+from typing import ClassVar
+
+from pandas import DataFrame
+
+from benchmarks.synthetic_data import SyntheticCreditData
+from src.service.arrow_preprocessing_service import ArrowPreprocessingService
+from src.service.preprocessing_service import PreprocessingService
+
+
+class PreprocessingMemoryReport:
+    """Reports the memory a synthetic batch takes before and after preprocessing.
+
+    For every service the report lists the bytes held by each preprocessed column and the
+    peak memory traced while preprocessing, so the cost of the raw batch, of the temporaries
+    and of the compact result can be told apart. Memory allocated by Arrow outside the Python
+    allocator is not traced.
+    """
+
+    SERVICES: ClassVar[dict[str, type[PreprocessingService]]] = {
+        "preprocessing": PreprocessingService,
+        "preprocessing_arrow": ArrowPreprocessingService,
+    }
+
+    def __init__(self, seed: int = 42):
+        self.__data: SyntheticCreditData = SyntheticCreditData(seed=seed)
+
+    def run(self, rows: int) -> None:
+        batch: DataFrame = self.__data.frame(rows)
+        raw: DataFrame = PreprocessingService.memory_report(batch)
+        print(f"raw batch: {rows:,} rows, {raw.loc['total', 'bytes'] / 2**20:,.1f} MB")
+
+        for name, service in self.SERVICES.items():
+            data: DataFrame = batch.copy()
+            start()
+            try:
+                preprocessed: DataFrame = service().execute(data)
+                peak: int = get_traced_memory()[1]
+            finally:
+                stop()
+            report: DataFrame = PreprocessingService.memory_report(preprocessed)
+            print(
+                f"\n{name}: peak {peak / 2**20:,.1f} MB while preprocessing, "
+                f"result {report.loc['total', 'bytes'] / 2**20:,.1f} MB"
+            )
+            print(report.to_string(float_format="{:.2f}".format))
+
+
+if __name__ == "__main__":
+    parser: ArgumentParser = ArgumentParser(
+        description="Report the memory taken by preprocessed batches."
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args: Namespace = parser.parse_args()
+
+    PreprocessingMemoryReport(args.seed).run(args.rows)
@@ -0,0 +1,64 @@
+from io import BytesIO
+from typing import ClassVar
+
+from numpy import arange
+from numpy.random import Generator, default_rng
+from pandas import DataFrame, read_csv
+
+
+class SyntheticCreditData:
+    """Generates synthetic credit requests from the raw German credit data.
+
+    Every column is sampled independently from its empirical distribution in the raw CSV, so
+    batches keep the same share of missing values and malformed entries (e.g. text inside
+    "Credit amount") as the real data. "Unnamed: 0" is regenerated as a unique id, otherwise
+    preprocessing would deduplicate a large batch down to the size of the source.
+    """
+
+    RAW_DATA_PATH: ClassVar[str] = r"data/raw_german_credit_data.csv"
+    ID_COLUMN: ClassVar[str] = "Unnamed: 0"
+
+    def __init__(self, raw_data_path: str = RAW_DATA_PATH, seed: int | None = 42):
+        """Initializes the generator.
+
+        Args:
+            raw_data_path (str, optional): CSV the distributions are sampled from.
+                Defaults to RAW_DATA_PATH.
+            seed (int | None, optional): Seed for reproducible batches. Defaults to 42.
+        """
+        self.__source: DataFrame = read_csv(raw_data_path)
+        self.__rng: Generator = default_rng(seed)
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.__source.columns)
+
+    def frame(self, rows: int) -> DataFrame:
+        """Samples a batch as a DataFrame, with the dtypes `read_csv` gives the raw CSV.
+
+        Args:
+            rows (int): Number of rows to generate.
+
+        Returns:
+            DataFrame: Synthetic batch with the columns of the raw CSV.
+        """
+        batch: DataFrame = DataFrame(
+            {
+                col: self.__source[col].to_numpy()[self.__rng.integers(0, len(self.__source), rows)]
+                for col in self.__source.columns
+            }
+        )
+        if self.ID_COLUMN in batch.columns:
+            batch[self.ID_COLUMN] = arange(rows)
+        return batch
+
+    def csv(self, rows: int) -> BytesIO:
+        """Samples a batch serialized as a CSV upload.
+
+        Args:
+            rows (int): Number of rows to generate.
+
+        Returns:
+            BytesIO: The batch as CSV bytes, like a file uploaded to the batch tab.
+        """
+        return BytesIO(self.frame(rows).to_csv(index=False).encode())
@@ -0,0 +1,33 @@
+from argparse import ArgumentParser, Namespace
+
+from src.app.http_app import HttpScoringApp
+from src.controller.http_controller import HttpController
+from src.service.micro_batching_service import MicroBatchingService
+from src.service.prediction_service import PredictionService
+from src.service.transformations import (
+    clean_features,  # noqa
+    get_features_names,  # noqa
+    remove_outliers,  # noqa
+)
+
+if __name__ == "__main__":
+    parser: ArgumentParser = ArgumentParser(description="Serve credit predictions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--window-ms", type=float, default=5.0, help="micro-batching window")
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument(
+        "--model", default=r"models/credit_classification-logistic_regression-v2.joblib"
+    )
+    args: Namespace = parser.parse_args()
+
+    prediction_service: PredictionService = PredictionService(args.model, compiled=True)
+    batching_service: MicroBatchingService = MicroBatchingService(
+        prediction_service, window_ms=args.window_ms, max_batch_size=args.max_batch_size
+    )
+    http_controller: HttpController = HttpController(service=batching_service)
+    app: HttpScoringApp = HttpScoringApp(http_controller, host=args.host, port=args.port)
+    try:
+        app.run()
+    finally:
+        batching_service.close()
@@ -1,21 +1,78 @@
+from argparse import ArgumentParser, Namespace
+from atexit import register
+
+from pandas import DataFrame, read_csv
+from streamlit import cache_resource
+
 from src.app.streamlit_app import StreamlitApp
 from src.controller.streamlit_controller import StreamlitController
-from src.service.prediction_service import PredictionService
-from src.service.preprocessing_service import PreprocessingService
+from src.service.arrow_preprocessing_service import ArrowPreprocessingService
+from src.service.cached_prediction_service import CachedPredictionService
+from src.service.drift_monitor_service import DriftMonitorService
+from src.service.explanation_service import ExplanationService
+from src.service.metrics import METRICS
+from src.service.model_registry import ModelRegistry
+from src.service.prediction_log_service import PredictionLogService
+from src.service.shadow_scoring_service import ShadowScoringService
 from src.service.transformations import (
     clean_features,  # noqa
     get_features_names,  # noqa
     remove_outliers,  # noqa
 )
 
-if __name__ == "__main__":
-    preprocessing_service: PreprocessingService = PreprocessingService()
-    prediction_service: PredictionService = PredictionService(
-        r"models/credit_classification-logistic_regression-v2.joblib"
+
+@cache_resource
+def build_controller(shadow_version: int | None = None) -> StreamlitController:
+    """Loads the services once per server process.
+
+    Streamlit reruns this script on every interaction of every session, the model and the
+    explanation background would otherwise be loaded again on each of them.
+
+    Args:
+        shadow_version (int | None, optional): Version in models/ scored in the shadow of
+            the served one, to evaluate it before promoting it. Defaults to None.
+    """
+    preprocessing_service: ArrowPreprocessingService = ArrowPreprocessingService()
+    prediction_service: ModelRegistry = ModelRegistry(models_dir=r"models")
+    # latest version found in models/, besides the candidate
+    prediction_service.activate(prediction_service.latest(excluding=shadow_version))
+    training_data: DataFrame = preprocessing_service.execute(
+        read_csv(r"data/raw_german_credit_data.csv")
+    )
+    # contributions are relative to the average applicant of the training data
+    explanation_service: ExplanationService = ExplanationService(
+        prediction_service.active.model, background=training_data
     )
-    streamlit_controller: StreamlitController = StreamlitController(
+    prediction_log: PredictionLogService = PredictionLogService(r"logs/predictions.jsonl")
+    register(prediction_log.close)  # writes the decisions still queued on shutdown
+    return StreamlitController(
         preprocessing=preprocessing_service,
-        service=prediction_service,
+        service=CachedPredictionService(prediction_service),  # resubmits, reruns, re-uploads
+        explanation=explanation_service,
+        shadow=None
+        if shadow_version is None
+        else ShadowScoringService(prediction_service.get(shadow_version)),
+        drift=DriftMonitorService(reference=training_data),
+        prediction_log=prediction_log,
+        registry=prediction_service,  # versions are swapped live, see --admin
+    )
+
+
+if __name__ == "__main__":
+    # streamlit run main.py -- --shadow-version 3
+    parser: ArgumentParser = ArgumentParser(description="Serve the credit application app.")
+    parser.add_argument("--shadow-version", type=int, help="model version to shadow score")
+    parser.add_argument(
+        "--admin", action="store_true", help="swap the served model version from the sidebar"
+    )
+    parser.add_argument(
+        "--metrics", action="store_true", help="time every stage and show it in the batch tab"
+    )
+    args: Namespace = parser.parse_args()
+
+    if args.metrics:  # off by default, instrumented stages then only check a flag
+        METRICS.enable()
+    app: StreamlitApp = StreamlitApp(
+        controller=build_controller(args.shadow_version), admin=args.admin
     )
-    app: StreamlitApp = StreamlitApp(controller=streamlit_controller)
     app.run()
@@ -0,0 +1,183 @@
+from argparse import ArgumentParser, Namespace
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from os import cpu_count
+from pathlib import Path
+from time import perf_counter
+from typing import ClassVar
+
+from numpy import ndarray
+from pandas import DataFrame, Series
+from pyarrow import Table
+
+from src.controller.batch_result import BatchResult
+from src.service.arrow_preprocessing_service import ArrowPreprocessingService
+from src.service.base_service import BaseService
+from src.service.prediction_service import PredictionService
+from src.service.seen_rows import SeenRows
+
+# services owned by each worker process, loaded once by `_init_worker`
+_preprocessing: BaseService | None = None
+_prediction: BaseService | None = None
+
+
+def _init_worker(model_path: str, compiled: bool) -> None:
+    global _preprocessing, _prediction  # noqa: PLW0603
+    _preprocessing = ArrowPreprocessingService()
+    _prediction = PredictionService(model_path, compiled=compiled)
+
+
+def _score_chunk(table: Table) -> DataFrame:
+    """Preprocesses and scores one chunk inside a worker, appending the mapped labels.
+
+    Args:
+        table (Table): Raw rows as read from the input file by `ArrowPreprocessingService`.
+
+    Returns:
+        DataFrame: Rows kept by preprocessing with the "Credit Request" column appended.
+    """
+    assert _preprocessing and _prediction, "Worker services have not been loaded"
+    preprocessed: DataFrame = _preprocessing.execute(table)
+    chunk: DataFrame = ArrowPreprocessingService.rows(table, preprocessed)
+    predictions: ndarray = _prediction.execute(preprocessed)
+    chunk[BatchResult.CREDIT_REQUEST_COL] = Series(predictions, index=chunk.index).map(
+        BatchResult.CREDIT_REQUEST_MAPPINGS
+    )
+    return chunk
+
+
+class BatchScoringApp:
+    """Headless batch scoring of CSV files across a pool of worker processes.
+
+    Input files are read in chunks by Arrow's CSV reader, each chunk is scored by a worker
+    and the labelled rows are written in input order. Rows already seen in the file are
+    dropped before scoring, outlier bounds are computed per chunk.
+    """
+
+    CHUNK_SIZE: ClassVar[int] = 100_000
+    OUTPUT_SUFFIX: ClassVar[str] = "_scored"
+    SOURCE_NOT_FOUND: ClassVar[str] = "No CSV files found at {}"
+
+    def __init__(
+        self,
+        model_path: str,
+        workers: int | None = None,
+        chunk_size: int = CHUNK_SIZE,
+        compiled: bool = True,
+    ):
+        """Initializes the app.
+
+        Args:
+            model_path (str): The file path to the trained model.
+            workers (int | None, optional): Worker processes, all cores if None.
+                Defaults to None.
+            chunk_size (int, optional): Rows sent to a worker at a time.
+                Defaults to CHUNK_SIZE.
+            compiled (bool, optional): Score through the compiled NumPy plan. Defaults to True.
+        """
+        assert chunk_size > 0
+
+        self.__model_path: str = model_path
+        self.__workers: int = workers or cpu_count() or 1
+        self.__chunk_size: int = chunk_size
+        self.__compiled: bool = compiled
+        self.__reader: ArrowPreprocessingService = ArrowPreprocessingService()
+
+    def __score_chunks(
+        self, pool: ProcessPoolExecutor, chunks: Iterator[Table]
+    ) -> Iterator[DataFrame]:
+        """Scores chunks in parallel, yielding them in input order.
+
+        At most two chunks per worker are in flight, so memory stays bounded for any file size.
+        """
+        pending: deque[Future[DataFrame]] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_chunk, chunk))
+            if len(pending) >= 2 * self.__workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def __score_file(self, pool: ProcessPoolExecutor, source: Path, target: Path) -> int:
+        rows: int = 0
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with source.open("rb") as file, target.open("w", newline="") as sink:
+            chunks: Iterator[Table] = self.__reader.read_chunks(
+                file, self.__chunk_size, all_columns=True
+            )
+            for scored in self.__score_chunks(pool, map(SeenRows().drop, chunks)):
+                scored.to_csv(sink, index=False, header=not rows)
+                rows += len(scored)
+        return rows
+
+    def run(self, source: str, output: str | None = None) -> int:
+        """Scores a CSV file, or every CSV file in a directory.
+
+        Args:
+            source (str): CSV file or directory of CSV files.
+            output (str | None, optional): Output file for a single input, output directory
+                for a directory. Defaults to the source name with OUTPUT_SUFFIX appended.
+
+        Raises:
+            FileNotFoundError: If the source has no CSV files.
+
+        Returns:
+            int: Number of scored rows.
+        """
+        source_path: Path = Path(source)
+        files: list[Path] = (
+            sorted(source_path.glob("*.csv")) if source_path.is_dir() else [source_path]
+        )
+        if not files or not all(file.is_file() for file in files):
+            raise FileNotFoundError(self.SOURCE_NOT_FOUND.format(source))
+
+        if source_path.is_dir():
+            output_dir: Path = Path(output or f"{source_path}{self.OUTPUT_SUFFIX}")
+            targets: list[Path] = [output_dir / file.name for file in files]
+        else:
+            targets = [
+                Path(output or source_path.with_stem(f"{source_path.stem}{self.OUTPUT_SUFFIX}"))
+            ]
+
+        rows: int = 0
+        start: float = perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=self.__workers,
+            initializer=_init_worker,
+            initargs=(self.__model_path, self.__compiled),
+        ) as pool:
+            for file, target in zip(files, targets, strict=True):
+                rows += self.__score_file(pool, file, target)
+                print(f"Scored {file} -> {target}")
+        elapsed: float = perf_counter() - start
+        print(f"Scored {rows} rows in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)")
+        return rows
+
+    @staticmethod
+    def parse_args(args: list[str] | None = None) -> Namespace:
+        parser: ArgumentParser = ArgumentParser(description="Score credit requests in batch.")
+        parser.add_argument("source", help="CSV file or directory of CSV files to score")
+        parser.add_argument("-o", "--output", help="output file, or directory for a directory")
+        parser.add_argument(
+            "-m",
+            "--model",
+            default=r"models/credit_classification-logistic_regression-v2.joblib",
+            help="path to the trained model",
+        )
+        parser.add_argument(
+            "-w", "--workers", type=int, help="worker processes, all cores by default"
+        )
+        parser.add_argument(
+            "-c",
+            "--chunk-size",
+            type=int,
+            default=BatchScoringApp.CHUNK_SIZE,
+            help="rows sent to a worker at a time",
+        )
+        parser.add_argument(
+            "--no-compiled",
+            action="store_true",
+            help="score through the sklearn pipeline instead of the compiled plan",
+        )
+        return parser.parse_args(args)
@@ -0,0 +1,79 @@
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import JSONDecodeError, dumps, loads
+from typing import Any, ClassVar
+
+from src.controller.http_controller import HttpController
+
+
+class _ScoringRequestHandler(BaseHTTPRequestHandler):
+    PREDICT_PATH: ClassVar[str] = "/predict"
+    HEALTH_PATH: ClassVar[str] = "/health"
+
+    def __init__(self, *args: Any, controller: HttpController, **kwargs: Any) -> None:
+        self.controller: HttpController = controller
+        super().__init__(*args, **kwargs)
+
+    def __send_json(self, status: HTTPStatus, body: dict[str, Any]) -> None:
+        payload: bytes = dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        if self.path != self.HEALTH_PATH:
+            self.__send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+        self.__send_json(HTTPStatus.OK, {"status": "ok"})
+
+    def do_POST(self) -> None:
+        if self.path != self.PREDICT_PATH:
+            self.__send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+        try:
+            body: bytes = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            result: dict[str, Any] = self.controller.handle_prediction(loads(body))
+        except (JSONDecodeError, ValueError, TypeError) as err:
+            self.__send_json(HTTPStatus.BAD_REQUEST, {"error": str(err)})
+        except Exception as err:
+            self.__send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(err)})
+        else:
+            self.__send_json(HTTPStatus.OK, result)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silenced, one line per request is too much noise under load."""
+
+
+class _ScoringServer(ThreadingHTTPServer):
+    request_queue_size: int = 1024  # the default backlog of 5 resets bursts of clients
+
+
+class HttpScoringApp:
+    """Local HTTP scoring service.
+
+    `POST /predict` takes one applicant as a JSON object and returns its prediction,
+    `GET /health` reports the service is up. Requests are served on one thread each, so
+    concurrent requests can be micro-batched by the service behind the controller.
+    """
+
+    def __init__(self, controller: HttpController, host: str = "127.0.0.1", port: int = 8000):
+        """Initializes the app.
+
+        Args:
+            controller (HttpController): Controller that handles the prediction requests.
+            host (str, optional): Interface to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on. Defaults to 8000.
+        """
+        self.__controller: HttpController = controller
+        self.__address: tuple[str, int] = (host, port)
+
+    def run(self) -> None:
+        server: ThreadingHTTPServer = _ScoringServer(
+            self.__address, partial(_ScoringRequestHandler, controller=self.__controller)
+        )
+        print(f"Serving predictions on http://{self.__address[0]}:{self.__address[1]}")
+        with server:
+            server.serve_forever()
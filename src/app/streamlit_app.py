@@ -1,32 +1,46 @@
 from io import BytesIO
-from time import sleep
 from typing import Any, ClassVar
 
-from pandas import DataFrame
+from pandas import DataFrame, Series
 from streamlit import (
     button,
     divider,
     error,
     form,
     form_submit_button,
-    spinner,
+    fragment,
+    progress,
+    query_params,
+    rerun,
+    session_state,
     success,
     tabs,
     title,
+    warning,
 )
 
 from src.controller.base_batch_controller import BaseBatchController
 from src.controller.base_controller import BaseController
+from src.controller.batch_jobs import BatchJob
+from src.controller.batch_result import BatchResult
 from src.controller.streamlit_controller import StreamlitController
+from src.service.drift_monitor_service import DriftMonitorService
+from src.service.metrics import METRICS
 from src.view import (
     BaseView,
     CreditRequestView,
+    DecisionThresholdView,
     DonwloadPredictionsView,
+    FeatureDriftView,
     FilePreviewView,
     FinancialStatusView,
+    ModelVersionView,
     PersonalInformationView,
+    PredictionExplanationView,
     PredictionsPreviewView,
     PredictionsStatsView,
+    ShadowScoringView,
+    StageMetricsView,
     UploadFileView,
 )
 
@@ -45,7 +59,20 @@ class StreamlitApp:
     \nLet's work on it together.
     """
 
-    def __init__(self, controller: StreamlitController) -> None:
+    JOB_CANCELLED_MESSAGE: ClassVar[str] = "Batch prediction cancelled."
+
+    STREAMING_MIN_FILE_SIZE: ClassVar[int] = 50 * 1024**2  # bytes, larger uploads are chunked
+    JOB_KEY: ClassVar[str] = "batch_job"  # session state and query parameter
+    JOB_POLL_INTERVAL: ClassVar[float] = 1.0  # seconds between progress refreshes
+
+    def __init__(self, controller: StreamlitController, admin: bool = False) -> None:
+        """Initializes the app.
+
+        Args:
+            controller (StreamlitController): Controller serving the form and the batches.
+            admin (bool, optional): Shows the model versions in the sidebar, to swap the
+                served one without restarting. Defaults to False.
+        """
         assert isinstance(controller, BaseController) and isinstance(
             controller, BaseBatchController
         )  # controller must have batch and base (form) capabilities
@@ -56,18 +83,27 @@ class StreamlitApp:
                 FinancialStatusView(),
                 PersonalInformationView(),
             ],
+            "form_result": [PredictionExplanationView()],
             "batch": [
                 UploadFileView(),
                 FilePreviewView(),
                 PredictionsPreviewView(),
                 PredictionsStatsView(),
                 DonwloadPredictionsView(),
+                StageMetricsView(),
+                DecisionThresholdView(),
+                ShadowScoringView(),
+                FeatureDriftView(),
             ],
+            "admin": [ModelVersionView()],
         }
         self.__controller: StreamlitController = controller
+        self.__admin: bool = admin
 
     def run(self) -> None:
         title("Your Credit Request")
+        if self.__admin:
+            self.__show_model_versions()
 
         tab1, tab2 = tabs(["Credit Application", "Bulk Credit Applications"])
 
@@ -84,11 +120,15 @@ class StreamlitApp:
                     success(self.CREDIT_APPROVED_MESSAGE)
                 else:
                     error(self.CREDIT_NOT_APPROVED_MESSAGE)
+                contributions: Series | None = self.__controller.handle_explanation(form_data)
+                if contributions is not None and self.__controller.explanation is not None:
+                    (explanation_view,) = self.__views["form_result"]
+                    explanation_view.render(
+                        contributions, self.__controller.explanation.expected_value
+                    )
 
         with tab2:
-            upload_view, preview_view, predictions_view, stats_view, download_view = self.__views[
-                "batch"
-            ]
+            upload_view, preview_view, *_ = self.__views["batch"]
             uploaded_file: BytesIO = upload_view.render()
             if uploaded_file:
                 try:
@@ -97,20 +137,86 @@ class StreamlitApp:
                     error(e)
                 preview_view.render(preview_df)
                 if button("Predict Credit Approval"):
-                    with spinner("Processing data and making predictions..."):
-                        try:
-                            predictions: DataFrame = self.__controller.handle_batch_prediction(
-                                uploaded_file
-                            )
-                        except Exception as e:
-                            error(e)
-                        else:
-                            sleep(3)
-                            predictions_view.render(predictions.sample(7, ignore_index=True))
-                            approval_rate: float = self.__controller.get_approval_rate(predictions)
-                            stats_view.render(
-                                approval_rate,
-                                100 - approval_rate,
-                                self.__controller.get_plot_data(),
-                            )
-                            download_view.render(predictions.to_csv(index=False))
+                    job_id: str = self.__controller.submit_batch_prediction(
+                        uploaded_file,
+                        stream=uploaded_file.getbuffer().nbytes >= self.STREAMING_MIN_FILE_SIZE,
+                    )
+                    session_state[self.JOB_KEY] = query_params[self.JOB_KEY] = job_id
+
+            # the job id survives reruns in the session and reconnects in the URL
+            job_id = session_state.get(self.JOB_KEY) or query_params.get(self.JOB_KEY)
+            if job_id:
+                self.__show_batch_job(job_id)
+
+    def __show_model_versions(self) -> None:
+        (version_view,) = self.__views["admin"]
+        versions, active = self.__controller.model_versions()
+        selected: int | None = version_view.render(versions, active)
+        if selected is not None:
+            try:
+                self.__controller.activate_model(selected)
+            except Exception as e:
+                error(e)
+            else:
+                rerun()
+
+    @fragment(run_every=JOB_POLL_INTERVAL)
+    def __poll_batch_job(self, job_id: str) -> None:
+        """Refreshes the progress of a running job on its own, rerunning the app once done."""
+        job: BatchJob | None = self.__controller.get_batch_job(job_id)
+        if job is None or job.finished:
+            rerun()
+            return
+        status: str = "Scoring"  # a whole batch only reports rows once labelled
+        if job.status == BatchJob.QUEUED:
+            status = "Queued"
+        elif job.rows:
+            status = f"Scored {job.rows:,} rows"
+        progress(job.progress, text=f"{status}...")
+        if button("Cancel", key=f"cancel-{job_id}"):
+            self.__controller.cancel_batch_job(job_id)
+
+    def __show_batch_job(self, job_id: str) -> None:
+        (
+            _,
+            _,
+            predictions_view,
+            stats_view,
+            download_view,
+            metrics_view,
+            threshold_view,
+            shadow_view,
+            drift_view,
+        ) = self.__views["batch"]
+        job: BatchJob | None = self.__controller.get_batch_job(job_id)
+        if job is None:  # evicted, or submitted to a server that has since restarted
+            session_state.pop(self.JOB_KEY, None)
+            query_params.pop(self.JOB_KEY, None)
+            return
+
+        if not job.finished:
+            self.__poll_batch_job(job_id)
+        elif job.status == BatchJob.CANCELLED:
+            warning(self.JOB_CANCELLED_MESSAGE)
+        elif job.status == BatchJob.FAILED:
+            error(job.error)
+        elif job.result is not None and job.predictions is not None:
+            result: BatchResult = job.result
+            # relabels from the kept scores, the batch is not scored again
+            result.threshold = threshold_view.render(result.threshold, f"threshold-{job_id}")
+            predictions_view.render(result.preview)
+            stats_view.render(result.approval_rate, result.rejection_rate, result.plot_data)
+            if isinstance(job.predictions, DataFrame):
+                download_view.render(result.rows)
+            else:  # streamed rows were written with the threshold they were scored with
+                download_view.render(
+                    job.predictions,
+                    None if result.threshold == result.rows_threshold else result.relabel,
+                )
+            if result.shadow is not None:
+                shadow_view.render(result.shadow)
+            drift: DriftMonitorService | None = self.__controller.drift
+            if result.drift is not None and drift is not None:
+                drift_view.render(drift.compare(result.drift), drift.compare())
+            if job.last_run is not None:
+                metrics_view.render(job.last_run, METRICS.to_prometheus())
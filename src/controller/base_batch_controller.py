@@ -1,12 +1,28 @@
 from abc import ABC, abstractmethod
 from io import BytesIO
+from typing import TextIO
 
 from pandas import DataFrame
 
+from src.controller.batch_jobs import BatchJob
+from src.controller.batch_result import BatchResult
+
 
 class BaseBatchController(ABC):
     @abstractmethod
     def get_file_preview(self, file: BytesIO) -> DataFrame: ...
 
     @abstractmethod
-    def handle_batch_prediction(self, file: BytesIO) -> DataFrame: ...
+    def handle_batch_prediction(self, file: BytesIO) -> BatchResult: ...
+
+    @abstractmethod
+    def handle_batch_prediction_stream(self, file: BytesIO, sink: TextIO) -> BatchResult: ...
+
+    @abstractmethod
+    def submit_batch_prediction(self, file: BytesIO, stream: bool = False) -> str: ...
+
+    @abstractmethod
+    def get_batch_job(self, job_id: str) -> BatchJob | None: ...
+
+    @abstractmethod
+    def cancel_batch_job(self, job_id: str) -> None: ...
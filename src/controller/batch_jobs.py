@@ -0,0 +1,148 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
+from typing import ClassVar, TextIO
+from uuid import uuid4
+
+from pandas import DataFrame
+
+from src.controller.batch_result import BatchResult
+
+BatchOutput = tuple[BatchResult, DataFrame | TextIO]  # result and the labelled rows to export
+
+
+class BatchJobCancelledError(Exception):
+    """Raised inside a job when a chunk is reported after the job was cancelled."""
+
+
+class BatchJob:
+    """State of a batch scored in the background, polled by the UI through its id."""
+
+    QUEUED: ClassVar[str] = "queued"
+    RUNNING: ClassVar[str] = "running"
+    DONE: ClassVar[str] = "done"
+    FAILED: ClassVar[str] = "failed"
+    CANCELLED: ClassVar[str] = "cancelled"
+
+    def __init__(self, job_id: str):
+        self.job_id: str = job_id
+        self.status: str = self.QUEUED
+        self.rows: int = 0
+        self.progress: float = 0.0  # fraction of the uploaded file consumed
+        self.result: BatchResult | None = None
+        self.predictions: DataFrame | TextIO | None = None
+        self.last_run: DataFrame | None = None  # stage timings, when metrics are enabled
+        self.error: Exception | None = None
+        self.__cancelled: Event = Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.DONE, self.FAILED, self.CANCELLED)
+
+    def cancel(self) -> None:
+        """Asks the job to stop, it does so at its next report."""
+        self.__cancelled.set()
+
+    def report(self, rows: int, progress: float) -> None:
+        """Records a scored chunk, stopping the job if it was cancelled in the meantime.
+
+        Args:
+            rows (int): Rows scored so far.
+            progress (float): Fraction of the uploaded file consumed so far.
+
+        Raises:
+            BatchJobCancelledError: If the job has been cancelled.
+        """
+        if self.__cancelled.is_set():
+            raise BatchJobCancelledError(self.job_id)
+        self.rows = rows
+        self.progress = min(progress, 1.0)
+
+
+class BatchJobManager:
+    """Runs batch predictions on a thread pool and keeps their results by job id.
+
+    Jobs outlive the script run (and the browser session) that submitted them, so a rerun
+    or a reconnect only needs the id to pick up the progress or the results. Threads share
+    the loaded model, and scoring spends most of its time in numpy and pandas, which release
+    the GIL, so jobs of different users overlap instead of queueing behind each other. Only
+    the latest `max_finished` finished jobs are kept.
+    """
+
+    def __init__(self, max_workers: int = 2, max_finished: int = 32):
+        """Initializes the manager and its pool.
+
+        Args:
+            max_workers (int, optional): Jobs scored at the same time, later ones are queued.
+                Defaults to 2.
+            max_finished (int, optional): Finished jobs kept for later fetching.
+                Defaults to 32.
+        """
+        assert max_workers > 0
+        assert max_finished > 0
+
+        self.__pool: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="batch-job"
+        )
+        self.__max_finished: int = max_finished
+        self.__jobs: dict[str, BatchJob] = {}  # in submission order
+        self.__lock: Lock = Lock()
+
+    def __run(self, job: BatchJob, run: Callable[[BatchJob], BatchOutput]) -> None:
+        with self.__lock:  # a job cancelled while queued never starts
+            if job.finished:
+                return
+            job.status = BatchJob.RUNNING
+        try:
+            job.result, job.predictions = run(job)
+        except BatchJobCancelledError:
+            job.status = BatchJob.CANCELLED
+        except Exception as err:
+            job.error = err
+            job.status = BatchJob.FAILED
+        else:
+            job.progress = 1.0
+            job.status = BatchJob.DONE
+        self.__evict()
+
+    def __evict(self) -> None:
+        """Forgets the oldest finished jobs past `max_finished`, closing their exports."""
+        with self.__lock:
+            finished: list[BatchJob] = [job for job in self.__jobs.values() if job.finished]
+            for job in finished[: max(len(finished) - self.__max_finished, 0)]:
+                del self.__jobs[job.job_id]
+                if job.predictions is not None and not isinstance(job.predictions, DataFrame):
+                    job.predictions.close()
+
+    def submit(self, run: Callable[[BatchJob], BatchOutput]) -> str:
+        """Queues a batch prediction.
+
+        Args:
+            run (Callable[[BatchJob], BatchOutput]): Scores the batch, reporting every chunk
+                to the job it receives.
+
+        Returns:
+            str: Id of the job.
+        """
+        job: BatchJob = BatchJob(uuid4().hex)
+        with self.__lock:
+            self.__jobs[job.job_id] = job
+        self.__pool.submit(self.__run, job, run)
+        return job.job_id
+
+    def get(self, job_id: str) -> BatchJob | None:
+        with self.__lock:
+            return self.__jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> None:
+        """Cancels a job: a queued job never starts, a running one stops at its next report."""
+        with self.__lock:  # the job cannot start between the check and the change
+            job: BatchJob | None = self.__jobs.get(job_id)
+            if job is None:
+                return
+            job.cancel()
+            if job.status == BatchJob.QUEUED:
+                job.status = BatchJob.CANCELLED
+
+
+BATCH_JOBS: BatchJobManager = BatchJobManager()  # shared by every session of the app
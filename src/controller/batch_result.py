@@ -0,0 +1,238 @@
+from typing import ClassVar
+
+from numpy import (
+    asarray,
+    bincount,
+    ceil,
+    clip,
+    float32,
+    float64,
+    int64,
+    intp,
+    nan,
+    ndarray,
+    zeros,
+)
+from numpy.random import Generator, default_rng
+from pandas import Categorical, DataFrame, concat
+
+from src.service.drift_monitor_service import DriftSketches
+from src.service.prediction_service import PredictionService
+from src.service.shadow_scoring_service import ShadowReport
+from src.service.transformations import remove_outliers
+
+
+class BatchResult:
+    """Statistics of a scored batch, accumulated in one pass as its chunks are scored.
+
+    Every chunk is scored once: the approval score of every row is kept next to its label,
+    so labels, approval rate and plot can be derived again for another `threshold` without
+    running the model. Scores are counted in a fixed histogram and offered to two bounded
+    uniform samples: the rows shown as a preview and the credit amounts the stats plot is
+    drawn from. Each sampled row carries a random key and only the smallest keys are kept,
+    so results of different chunks (or workers) can be merged into the result of the whole
+    batch in any order.
+    """
+
+    CREDIT_REQUEST_COL: ClassVar[str] = "Credit Request"
+    CREDIT_REQUEST_MAPPINGS: ClassVar[dict[int, str]] = {
+        0: "Credit Not Approved",
+        1: "Credit Approved",
+    }
+    SCORE_COL: ClassVar[str] = "Approval score"
+    CONTRIBUTION_COL: ClassVar[str] = "{} contribution"  # to the log-odds of approval
+    PLOT_COLUMNS: ClassVar[list[str]] = ["Credit amount", CREDIT_REQUEST_COL]
+    SAMPLE_KEY_COL: ClassVar[str] = "__sample_key"
+    # approval rates are exact for thresholds on the 1 / SCORE_BINS grid
+    SCORE_BINS: ClassVar[int] = 10_000
+
+    def __init__(
+        self,
+        preview_size: int = 7,
+        plot_sample_size: int = 10_000,
+        keep_rows: bool = False,
+        threshold: float = PredictionService.DEFAULT_THRESHOLD,
+    ):
+        """Initializes an empty result.
+
+        Args:
+            preview_size (int, optional): Rows kept for the preview. Defaults to 7.
+            plot_sample_size (int, optional): Credit amounts kept for the stats plot.
+                Defaults to 10_000.
+            keep_rows (bool, optional): If True, every labelled row is kept so the whole
+                batch can be exported. Defaults to False.
+            threshold (float, optional): Score above which a request is approved, it can be
+                changed at any time. Defaults to PredictionService.DEFAULT_THRESHOLD.
+        """
+        self.threshold: float = threshold
+        self.total: int = 0
+        self.shadow: ShadowReport | None = None  # comparison with a candidate model, if any
+        self.drift: DriftSketches | None = None  # feature sketches, if drift is monitored
+        self.__histogram: ndarray = zeros(self.SCORE_BINS, dtype=int64)  # bins (k/N, (k+1)/N]
+        self.__preview_size: int = preview_size
+        self.__plot_sample_size: int = plot_sample_size
+        self.__keep_rows: bool = keep_rows
+        self.__preview: DataFrame | None = None
+        self.__plot_sample: DataFrame | None = None
+        self.__rows: list[DataFrame] = []
+        self.__rows_threshold: float = threshold  # threshold the rows of `add` are labelled with
+        self.__rng: Generator = default_rng()
+
+    def __labels(self, scores: ndarray) -> Categorical:
+        return Categorical.from_codes(
+            PredictionService.label(scores, self.threshold),
+            categories=list(self.CREDIT_REQUEST_MAPPINGS.values()),
+        )
+
+    def __sample(self, sample: DataFrame | None, rows: DataFrame, size: int) -> DataFrame:
+        """Merges a keyed sample with new rows, keeping the `size` rows with smallest keys."""
+        if self.SAMPLE_KEY_COL not in rows.columns:
+            rows = rows.assign(**{self.SAMPLE_KEY_COL: self.__rng.random(len(rows))})
+        candidates: DataFrame = rows if sample is None else concat([sample, rows])
+        return candidates.nsmallest(size, self.SAMPLE_KEY_COL)
+
+    def add(
+        self,
+        data: DataFrame,
+        preprocessed: DataFrame,
+        scores: ndarray,
+        contributions: DataFrame | None = None,
+    ) -> DataFrame:
+        """Accumulates a scored chunk.
+
+        Args:
+            data (DataFrame): Raw rows of the chunk, aligned with the scores. The contribution,
+                score and label columns are appended to it in place.
+            preprocessed (DataFrame): The chunk as preprocessed for the model.
+            scores (ndarray): Approval probability of every row.
+            contributions (DataFrame | None, optional): Contribution of every feature to the
+                score of every row, from `ExplanationService`. Defaults to None.
+
+        Returns:
+            DataFrame: `data` with the contribution, score and label columns appended.
+        """
+        if contributions is not None:
+            for feature, values in contributions.items():
+                data[self.CONTRIBUTION_COL.format(feature)] = values.to_numpy(dtype=float32)
+        scores = asarray(scores, dtype=float64)
+        data[self.SCORE_COL] = scores
+        data[self.CREDIT_REQUEST_COL] = self.__labels(scores)
+
+        bins: ndarray = clip(ceil(scores * self.SCORE_BINS).astype(intp) - 1, 0, None)
+        self.__histogram += bincount(bins, minlength=self.SCORE_BINS)
+        self.total += len(scores)
+        plot_rows: DataFrame = DataFrame(
+            {
+                self.PLOT_COLUMNS[0]: preprocessed[self.PLOT_COLUMNS[0]].to_numpy(
+                    dtype=float64, na_value=nan
+                ),
+                self.SCORE_COL: scores,
+            }
+        )
+        self.__plot_sample = self.__sample(self.__plot_sample, plot_rows, self.__plot_sample_size)
+        self.__preview = self.__sample(self.__preview, data, self.__preview_size)
+        if self.__keep_rows:
+            self.__rows.append(data)
+        return data
+
+    def merge(self, other: "BatchResult") -> "BatchResult":
+        """Adds the chunks accumulated by another result to this one.
+
+        Args:
+            other (BatchResult): Result of other chunks of the same batch.
+
+        Returns:
+            BatchResult: This result, updated.
+        """
+        self.__histogram += other.__histogram
+        self.total += other.total
+        if other.__plot_sample is not None:
+            self.__plot_sample = self.__sample(
+                self.__plot_sample, other.__plot_sample, self.__plot_sample_size
+            )
+        if other.__preview is not None:
+            self.__preview = self.__sample(self.__preview, other.__preview, self.__preview_size)
+        self.__rows += other.__rows
+        if other.shadow is not None:
+            self.shadow = (self.shadow or ShadowReport(self.threshold)).merge(other.shadow)
+        if other.drift is not None:
+            self.drift = (self.drift or DriftSketches()).merge(other.drift)
+        return self
+
+    @property
+    def approved(self) -> int:
+        """Requests scored above `threshold`, counted from the score histogram."""
+        # rounded: 0.57 * 10_000 is 5699.999...
+        first: int = min(max(round(self.threshold * self.SCORE_BINS), 0), self.SCORE_BINS)
+        return int(self.__histogram[first:].sum())
+
+    @property
+    def approval_rate(self) -> float:
+        """Percentage of credit requests that were approved."""
+        assert self.total, "No rows have been scored"
+        return self.approved / self.total * 100
+
+    @property
+    def rejection_rate(self) -> float:
+        return 100 - self.approval_rate
+
+    @property
+    def preview(self) -> DataFrame:
+        """Uniform sample of the labelled rows."""
+        assert self.__preview is not None, "No rows have been scored"
+        return (
+            self.__preview.drop(columns=self.SAMPLE_KEY_COL)
+            .assign(**{self.CREDIT_REQUEST_COL: self.__labels(self.__preview[self.SCORE_COL])})
+            .reset_index(drop=True)
+        )
+
+    @property
+    def plot_data(self) -> DataFrame:
+        """Sampled credit amounts and labels, without negative amounts and outliers."""
+        assert self.__plot_sample is not None, "No rows have been scored"
+        sample: DataFrame = self.__plot_sample[
+            self.__plot_sample[self.PLOT_COLUMNS[0]] > 0  # filter negative credit amounts
+        ]
+        plot_data: DataFrame = DataFrame(
+            {
+                self.PLOT_COLUMNS[0]: remove_outliers(sample[[self.PLOT_COLUMNS[0]]])[
+                    self.PLOT_COLUMNS[0]
+                ],
+                self.PLOT_COLUMNS[1]: self.__labels(sample[self.SCORE_COL].to_numpy()),
+            },
+            index=sample.index,
+        )
+        return plot_data.dropna()  # remove outliers inplaced with NA
+
+    @property
+    def rows_threshold(self) -> float:
+        """Threshold the rows returned by `add` were last labelled with."""
+        return self.__rows_threshold
+
+    def relabel(self, rows: DataFrame) -> DataFrame:
+        """Labels rows returned by `add`, possibly written out and read back, with `threshold`.
+
+        Args:
+            rows (DataFrame): Rows with the score column.
+
+        Returns:
+            DataFrame: `rows`, relabelled in place.
+        """
+        rows[self.CREDIT_REQUEST_COL] = self.__labels(
+            rows[self.SCORE_COL].to_numpy(dtype=float64, na_value=nan)
+        )
+        return rows
+
+    @property
+    def rows(self) -> DataFrame:
+        """Every labelled row, only available if the result was created with `keep_rows`.
+
+        Rows are relabelled in place when `threshold` has changed since they were labelled.
+        """
+        assert self.__keep_rows, "Rows were not kept for this result"
+        assert self.__rows, "No rows have been scored"
+        if self.threshold != self.__rows_threshold:
+            for data in self.__rows:
+                self.relabel(data)
+            self.__rows_threshold = self.threshold
+        return concat(self.__rows) if len(self.__rows) > 1 else self.__rows[0]
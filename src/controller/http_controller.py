@@ -0,0 +1,42 @@
+from typing import Any, ClassVar
+
+from numpy import ndarray
+
+from src.controller.base_controller import BaseController
+from src.controller.batch_result import BatchResult
+from src.service.prediction_service import PredictionService
+
+
+class HttpController(BaseController):
+    """Controller for handling predictions requested over HTTP."""
+
+    REQUIRED_FIELDS_ERROR: ClassVar[str] = "Missing required fields: {}"
+    INVALID_REQUEST_ERROR: ClassVar[str] = "Request body must be a JSON object"
+
+    # @override
+    def handle_prediction(self, data: Any) -> dict[str, Any]:
+        """Processes a single prediction request.
+
+        Args:
+            data (Any): Decoded JSON body with the applicant features.
+
+        Raises:
+            ValueError: If the body is not an object or misses any of the expected fields.
+
+        Returns:
+            dict[str, Any]: The raw prediction and its human-readable label.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(self.INVALID_REQUEST_ERROR)  # noqa: TRY004
+        missing_fields: list[str] = [
+            field for field in PredictionService.EXPECTED_COLUMNS if field not in data
+        ]
+        if missing_fields:
+            raise ValueError(self.REQUIRED_FIELDS_ERROR.format(missing_fields))
+
+        predictions: ndarray = self.service.execute(data)
+        prediction: int = int(predictions[0])
+        return {
+            "prediction": prediction,
+            BatchResult.CREDIT_REQUEST_COL: BatchResult.CREDIT_REQUEST_MAPPINGS[prediction],
+        }
@@ -1,39 +1,131 @@
+from collections.abc import Callable, Iterator
 from io import BytesIO
-from typing import Any, ClassVar
+from os.path import basename
+from tempfile import TemporaryFile
+from time import perf_counter
+from typing import Any, ClassVar, TextIO
+from uuid import uuid4
 
 from numpy import ndarray
-from pandas import DataFrame, read_csv
+from pandas import Categorical, DataFrame, Series, read_csv
+from pyarrow import Table
 
 from src.controller.base_batch_controller import BaseBatchController
 from src.controller.base_controller import BaseController
+from src.controller.batch_jobs import BATCH_JOBS, BatchJob, BatchOutput
+from src.controller.batch_result import BatchResult
+from src.controller.upload_cache import PARSED_UPLOADS, ParsedUpload
+from src.service.arrow_preprocessing_service import ArrowPreprocessingService
 from src.service.base_service import BaseService
-from src.service.transformations import remove_outliers
+from src.service.cached_prediction_service import CachedPredictionService
+from src.service.drift_monitor_service import DriftMonitorService, DriftSketches
+from src.service.explanation_service import ExplanationService
+from src.service.metrics import METRICS
+from src.service.model_registry import ModelRegistry
+from src.service.prediction_log_service import PredictionLogService
+from src.service.prediction_service import PredictionService
+from src.service.seen_rows import SeenRows
+from src.service.shadow_scoring_service import ShadowReport, ShadowScores, ShadowScoringService
+
+ChunkCallback = Callable[[int, float], None]  # rows scored so far, fraction of the file read
 
 
 class StreamlitController(BaseController, BaseBatchController):
     """Controller for handling predictions in a Streamlit-based application."""
 
     FILE_INGESTION_ERROR: str = "Failed to ingest file: the file may be empty or malformed."
+    NO_REGISTRY: ClassVar[str] = "Model versions are only served from a ModelRegistry"
+
+    CREDIT_REQUEST_COL: ClassVar[str] = BatchResult.CREDIT_REQUEST_COL
+    CREDIT_REQUEST_MAPPINGS: ClassVar[dict[int, str]] = BatchResult.CREDIT_REQUEST_MAPPINGS
+    PLOT_COLUMNS: ClassVar[list[str]] = BatchResult.PLOT_COLUMNS
 
-    CREDIT_REQUEST_COL: ClassVar[str] = "Credit Request"
-    CREDIT_REQUEST_MAPPINGS: ClassVar[dict[int, str]] = {
-        0: "Credit Not Approved",
-        1: "Credit Approved",
-    }
-    PLOT_COLUMNS: ClassVar[list[str]] = ["Credit amount", CREDIT_REQUEST_COL]
+    CHUNK_SIZE: ClassVar[int] = 100_000  # rows read, preprocessed and scored at a time
+    PREVIEW_SIZE: ClassVar[int] = 7
+    PLOT_SAMPLE_SIZE: ClassVar[int] = 10_000  # bounded sample kept for the stats plot
+    # progress reported by `handle_batch_prediction` once parsed, preprocessed and scored
+    BATCH_PROGRESS: ClassVar[tuple[float, float, float]] = (0.1, 0.2, 0.8)
+    READ_CSV_STAGE: ClassVar[str] = "StreamlitController.read_csv"
 
-    def __init__(self, service: BaseService, preprocessing: BaseService):
+    def __init__(  # noqa: PLR0913
+        self,
+        service: PredictionService | ModelRegistry | CachedPredictionService,
+        preprocessing: BaseService,
+        explanation: ExplanationService | None = None,
+        shadow: ShadowScoringService | None = None,
+        drift: DriftMonitorService | None = None,
+        prediction_log: PredictionLogService | None = None,
+        registry: ModelRegistry | None = None,
+    ):
         """Initializes the Streamlit controller with a service.
 
         Args:
-            service (BaseService): The service responsible for executing predictions.
+            service (PredictionService | ModelRegistry | CachedPredictionService): The service
+                responsible for executing predictions, batches are scored through its
+                `execute_scores`.
+            preprocessing (BaseService): The service preparing batches for the model. An
+                `ArrowPreprocessingService` also parses the uploads, with Arrow's CSV reader.
+            explanation (ExplanationService | None, optional): If given, predictions come with
+                the contribution of every feature. Defaults to None.
+            shadow (ShadowScoringService | None, optional): If given, batches are also scored
+                by its candidate model and compared in `BatchResult.shadow`. Defaults to None.
+            drift (DriftMonitorService | None, optional): If given, preprocessed batches are
+                sketched in `BatchResult.drift` to be compared with the training data.
+                Defaults to None.
+            prediction_log (PredictionLogService | None, optional): If given, every form and
+                batch decision is handed to it. Defaults to None.
+            registry (ModelRegistry | None, optional): Registry `service` serves from, when it
+                wraps one, so versions can be swapped with `activate_model`. Defaults to
+                `service` itself if it is a ModelRegistry.
         """
         super().__init__(service)
+        self.service: PredictionService | ModelRegistry | CachedPredictionService = service
         self.preprocessing = preprocessing
-        self.plot_data: None | DataFrame = None
+        self.__reader: ArrowPreprocessingService | None = (
+            preprocessing if isinstance(preprocessing, ArrowPreprocessingService) else None
+        )
+        self.explanation: ExplanationService | None = explanation
+        self.shadow: ShadowScoringService | None = shadow
+        self.drift: DriftMonitorService | None = drift
+        self.prediction_log: PredictionLogService | None = prediction_log
+        self.registry: ModelRegistry | None = (
+            service if registry is None and isinstance(service, ModelRegistry) else registry
+        )
+        if self.registry is not None:
+            self.registry.subscribe(self.__on_activate)
+
+    def __on_activate(self, _: int, service: PredictionService) -> None:
+        """Explains with the newly activated model, requests already running keep the old."""
+        if self.explanation is not None:
+            self.explanation = self.explanation.with_model(service.model)
 
-    def __ingest_file(self, file: BytesIO) -> DataFrame:
-        """Reads a CSV file into a pandas DataFrame.
+    def model_versions(self) -> tuple[list[int], int | None]:
+        """Rescans the registry for new model versions.
+
+        Returns:
+            tuple[list[int], int | None]: The available versions, oldest first, and the
+                active one. No versions without a registry.
+        """
+        if self.registry is None:
+            return [], None
+        return self.registry.refresh(), self.registry.active_version
+
+    def activate_model(self, version: int) -> None:
+        """Serves another model version from now on, without restarting.
+
+        Args:
+            version (int): Version to activate, see `model_versions`.
+
+        Raises:
+            ValueError: If there is no registry or the version is not found.
+        """
+        if self.registry is None:
+            raise ValueError(self.NO_REGISTRY)
+        self.registry.activate(version)
+
+    def __ingest_file(self, file: BytesIO) -> ParsedUpload:
+        """Returns the parsed CSV file, parsing it only if the same content has not been
+        parsed before: reruns and repeated predictions of an upload reuse one parse.
 
         Args:
             file (BytesIO): A CSV file-like object containing input data.
@@ -42,46 +134,82 @@ class StreamlitController(BaseController, BaseBatchController):
             ValueError: If the file cannot be read properly.
 
         Returns:
-            DataFrame: Parsed data from the input file.
+            ParsedUpload: Parsed data from the input file, a frame being safe to dedup and
+                add columns to.
         """
-        try:
-            data: DataFrame = read_csv(file)
+        return PARSED_UPLOADS.get(file, self.__parse_file)
+
+    def __parse_file(self, file: BytesIO) -> ParsedUpload:
+        """Reads a CSV file, into an Arrow table if the preprocessing can read it itself.
+
+        Args:
+            file (BytesIO): A CSV file-like object containing input data.
+
+        Raises:
+            ValueError: If the file cannot be read properly.
+
+        Returns:
+            ParsedUpload: Parsed data from the input file.
+        """
+        if self.__reader is not None:
+            self.__reader.columns(file)  # missing columns are reported as such
+        start: float = perf_counter()
+        try:  # low_memory parses large files in pieces, typing a column differently in each
+            data: ParsedUpload = (
+                read_csv(file, low_memory=False)
+                if self.__reader is None
+                else self.__reader.read(file, True)
+            )
         except Exception as err:
             raise ValueError(self.FILE_INGESTION_ERROR) from err
         else:
+            if METRICS.enabled:
+                METRICS.observe(self.READ_CSV_STAGE, perf_counter() - start, len(data))
             return data
 
-    def __get_mapped_predictions(self, data: DataFrame, predictions: ndarray) -> DataFrame:
-        """Adds a prediction column to the input DataFrame with human-readable labels.
+    def __ingest_chunks(self, file: BytesIO, chunk_size: int) -> Iterator[ParsedUpload]:
+        """Reads a CSV file lazily, `chunk_size` rows at a time.
 
         Args:
-            data (DataFrame): Original data without mapped predictions.
-            predictions (ndarray): Raw prediction results.
+            file (BytesIO): A CSV file-like object containing input data.
+            chunk_size (int): Number of rows per chunk.
 
-        Returns:
-            DataFrame: Updated DataFrame with mapped prediction labels.
+        Raises:
+            ValueError: If the file cannot be read properly.
+
+        Yields:
+            ParsedUpload: Parsed chunks of the input file.
         """
-        temp_data: DataFrame = data.copy()
-        temp_data[self.CREDIT_REQUEST_COL] = predictions
-        temp_data[self.CREDIT_REQUEST_COL] = temp_data[self.CREDIT_REQUEST_COL].map(
-            self.CREDIT_REQUEST_MAPPINGS
-        )
-        return temp_data
+        if self.__reader is not None:
+            self.__reader.columns(file)  # missing columns are reported as such
+        try:
+            chunks: Iterator[ParsedUpload] = (
+                read_csv(file, chunksize=chunk_size, low_memory=False)
+                if self.__reader is None
+                else self.__reader.read_chunks(file, chunk_size, True)
+            )
+            start: float = perf_counter()
+            for chunk in chunks:
+                if METRICS.enabled:
+                    METRICS.observe(self.READ_CSV_STAGE, perf_counter() - start, len(chunk))
+                yield chunk
+                start = perf_counter()
+        except Exception as err:
+            raise ValueError(self.FILE_INGESTION_ERROR) from err
 
-    def get_plot_data(self) -> DataFrame:
-        """Prepares and filters the data for plotting, removing negative values and outliers.
+    def __preprocess(self, data: ParsedUpload) -> tuple[DataFrame, DataFrame]:
+        """Preprocesses parsed rows.
 
         Returns:
-            DataFrame: Cleaned DataFrame suitable for plotting.
+            tuple[DataFrame, DataFrame]: The raw rows preprocessing kept, and the rows as
+                preprocessed, both with the same index.
         """
-        assert isinstance(self.plot_data, DataFrame)
-        plot_data: DataFrame = self.plot_data[self.PLOT_COLUMNS][
-            self.plot_data[self.PLOT_COLUMNS[0]] > 0  # filter negative credit amounts
-        ]
-        plot_data[self.PLOT_COLUMNS[0]] = remove_outliers(plot_data[[self.PLOT_COLUMNS[0]]])
-        return plot_data.dropna()  # remove outliers inplaced with NA
+        preprocessed: DataFrame = self.preprocessing.execute(data)  # dedups a frame inplace
+        if isinstance(data, Table):
+            assert self.__reader is not None
+            return self.__reader.rows(data, preprocessed), preprocessed
+        return data, preprocessed
 
-    # @override
     def get_file_preview(self, file: BytesIO) -> DataFrame:
         """Returns a preview of the uploaded file for display in the UI.
 
@@ -89,11 +217,16 @@ class StreamlitController(BaseController, BaseBatchController):
             file (BytesIO): A CSV file-like object containing input data.
 
         Returns:
-            DataFrame: First few rows of the uploaded data.
+            DataFrame: First few rows of the uploaded data, the rest of the file is not read.
         """
         file.seek(0)  # reset file pointer
-        data: DataFrame = self.__ingest_file(file)
-        return data.head(7)
+        try:
+            preview: DataFrame = read_csv(file, nrows=self.PREVIEW_SIZE)  # no full parse
+        except Exception as err:
+            raise ValueError(self.FILE_INGESTION_ERROR) from err
+        finally:
+            file.seek(0)  # the upload is read again by later reruns
+        return preview
 
     # @override
     def handle_prediction(self, data: dict[str, Any]) -> int | Any:
@@ -105,45 +238,218 @@ class StreamlitController(BaseController, BaseBatchController):
         Returns:
             int | Any: The prediction result.
         """
-        return self.service.execute(data)
+        predictions: Any = self.service.execute(data)
+        if self.prediction_log is not None:
+            prediction: int = int(predictions[0])
+            self.prediction_log.execute(
+                {
+                    **self.__log_fields("form", None, PredictionService.DEFAULT_THRESHOLD),
+                    **{col: data.get(col) for col in PredictionService.EXPECTED_COLUMNS},
+                    "score": None,
+                    "prediction": prediction,
+                    self.CREDIT_REQUEST_COL: self.CREDIT_REQUEST_MAPPINGS[prediction],
+                }
+            )
+        return predictions
+
+    def __log_fields(self, source: str, batch_id: str | None, threshold: float) -> dict[str, Any]:
+        return {
+            "timestamp": PredictionLogService.now(),
+            "source": source,
+            "batch_id": batch_id,
+            "model": basename(self.service.model_path),
+            "threshold": threshold,
+        }
+
+    def __log_batch(
+        self, batch_id: str, preprocessed: DataFrame, scores: ndarray, result: BatchResult
+    ) -> None:
+        """Hands the decisions of a scored frame to the prediction log, if there is one."""
+        if self.prediction_log is None:
+            return
+        predictions: ndarray = PredictionService.label(scores, result.threshold)
+        self.prediction_log.execute(
+            preprocessed[PredictionService.EXPECTED_COLUMNS].assign(
+                **self.__log_fields("batch", batch_id, result.threshold),
+                score=scores,
+                prediction=predictions,
+                **{
+                    self.CREDIT_REQUEST_COL: Categorical.from_codes(
+                        predictions, categories=list(self.CREDIT_REQUEST_MAPPINGS.values())
+                    )
+                },
+            )
+        )
+
+    def handle_explanation(self, data: dict[str, Any]) -> Series | None:
+        """Explains a single prediction request.
+
+        Args:
+            data (dict[str, Any]): The input data for prediction.
+
+        Returns:
+            Series | None: Contribution of every feature to the log-odds of approval, None
+                without an explanation service.
+        """
+        if self.explanation is None:
+            return None
+        contributions: Series = self.explanation.execute(data).iloc[0]
+        return contributions
+
+    def __explain(self, preprocessed: DataFrame) -> DataFrame | None:
+        return None if self.explanation is None else self.explanation.execute(preprocessed)
+
+    def __monitor(self, preprocessed: DataFrame, result: BatchResult) -> None:
+        if self.drift is not None:
+            sketches: DriftSketches = self.drift.execute(preprocessed)
+            result.drift = sketches if result.drift is None else result.drift.merge(sketches)
+
+    def __score(self, preprocessed: DataFrame, result: BatchResult) -> ndarray:
+        """Scores with the served model, and with the shadow candidate in the background."""
+        if self.shadow is None:
+            return self.service.execute_scores(preprocessed)
+
+        if result.shadow is None:
+            result.shadow = ShadowReport(result.threshold)
+        start: float = perf_counter()
+        scores: ndarray = self.service.execute_scores(preprocessed)
+        served: ShadowScores = (scores, perf_counter() - start)
+        # submitted once the served scores are in, so the candidate never competes with them
+        self.shadow.compare(self.shadow.execute(preprocessed), served, result.shadow)
+        return scores
 
     # @override
     def handle_batch_prediction(
         self,
         file: BytesIO,
-    ) -> DataFrame:
+        on_chunk: ChunkCallback | None = None,
+    ) -> BatchResult:
         """Processes batch predictions from a CSV file and prepares data for visualization.
 
         Args:
             file (BytesIO): A CSV file-like object containing multiple prediction inputs.
+            on_chunk (ChunkCallback | None, optional): Called with no rows scored and an
+                estimate of the progress once the batch is parsed, preprocessed and scored,
+                then with every row once it is labelled. It may stop the batch by raising.
+                Defaults to None.
 
         Returns:
-            DataFrame: DataFrame with predictions appended and formatted.
+            BatchResult: Labelled rows of the batch, with its approval counts and the samples
+                shown in the batch tab.
         """
         file.seek(0)  # reset file pointer
-        data: DataFrame = self.__ingest_file(file)
-        preprocessed: DataFrame = self.preprocessing.execute(data)
-        predictions: ndarray = self.service.execute(preprocessed)
+        report: ChunkCallback = on_chunk or (lambda rows, progress: None)
+        METRICS.start_run()
+        upload: ParsedUpload = self.__ingest_file(file)
+        report(0, self.BATCH_PROGRESS[0])
+        data, preprocessed = self.__preprocess(upload)
+        report(0, self.BATCH_PROGRESS[1])
+        result: BatchResult = BatchResult(self.PREVIEW_SIZE, self.PLOT_SAMPLE_SIZE, keep_rows=True)
+        self.__monitor(preprocessed, result)
+        scores: ndarray = self.__score(preprocessed, result)
+        report(0, self.BATCH_PROGRESS[2])
+        self.__log_batch(uuid4().hex, preprocessed, scores, result)
+        result.add(data, preprocessed, scores, self.__explain(preprocessed))
+        report(result.total, 1.0)
+        return result
 
-        self.plot_data = self.__get_mapped_predictions(preprocessed, predictions)
-        return self.__get_mapped_predictions(data, predictions)
+    # @override
+    def handle_batch_prediction_stream(
+        self,
+        file: BytesIO,
+        sink: TextIO,
+        chunk_size: int = CHUNK_SIZE,
+        on_chunk: ChunkCallback | None = None,
+    ) -> BatchResult:
+        """Processes batch predictions chunk by chunk, writing the labelled rows to `sink`.
 
-    def get_approval_rate(self, predictions: DataFrame) -> float:
-        """Calculates the approval rate from the predictions.
+        Only one chunk is held in memory at a time: every chunk is accumulated into the
+        result, which keeps the approval counts and bounded samples for the preview and the
+        plot, then written out. Rows already seen in earlier chunks are dropped, as
+        `handle_batch_prediction` dedups the whole upload. Outlier bounds are computed per
+        chunk, so rows near the bounds can be scored differently than with
+        `handle_batch_prediction`.
 
         Args:
-            predictions (DataFrame): DataFrame containing prediction results with mapped labels.
+            file (BytesIO): A CSV file-like object containing multiple prediction inputs.
+            sink (TextIO): Text stream that receives the labelled rows as CSV.
+            chunk_size (int, optional): Rows per chunk. Defaults to CHUNK_SIZE.
+            on_chunk (ChunkCallback | None, optional): Called after every chunk with the rows
+                scored so far and the fraction of the file consumed. Defaults to None.
+
+        Raises:
+            ValueError: If the file cannot be read properly or has no rows.
 
         Returns:
-            float: Percentage of credit requests that were approved.
+            BatchResult: Approval counts and samples of the batch, without its rows.
         """
-        approval_rate: float = (
-            len(
-                predictions[
-                    predictions[self.CREDIT_REQUEST_COL]
-                    == self.CREDIT_REQUEST_MAPPINGS[1]  # mappings under approved
-                ]
+        file.seek(0)  # reset file pointer
+        METRICS.start_run()
+        result: BatchResult = BatchResult(self.PREVIEW_SIZE, self.PLOT_SAMPLE_SIZE)
+        size: int = max(file.getbuffer().nbytes, 1)
+        batch_id: str = uuid4().hex  # shared by the logged decisions of every chunk
+        seen: SeenRows = SeenRows()
+
+        for parsed in self.__ingest_chunks(file, chunk_size):
+            unseen: ParsedUpload = seen.drop(parsed)
+            if not len(unseen):  # duplicates of earlier chunks only
+                if on_chunk is not None:
+                    on_chunk(result.total, file.tell() / size)
+                continue
+            chunk, preprocessed = self.__preprocess(unseen)
+            self.__monitor(preprocessed, result)
+            scores: ndarray = self.__score(preprocessed, result)
+            self.__log_batch(batch_id, preprocessed, scores, result)
+            header: bool = not result.total
+            result.add(chunk, preprocessed, scores, self.__explain(preprocessed)).to_csv(
+                sink, index=False, header=header
             )
-            / len(predictions[self.CREDIT_REQUEST_COL])
-        ) * 100
-        return approval_rate
+            if on_chunk is not None:
+                on_chunk(result.total, file.tell() / size)  # parser read-ahead, approximate
+
+        if not result.total:
+            raise ValueError(self.FILE_INGESTION_ERROR)
+        return result
+
+    def __run_job(self, job: BatchJob, file: BytesIO, stream: bool) -> BatchOutput:
+        if not stream:
+            result: BatchResult = self.handle_batch_prediction(file, job.report)
+            job.last_run = METRICS.last_run() if METRICS.enabled else None
+            return result, result.rows
+
+        # closed with the job, once it is evicted from the manager
+        sink: TextIO = TemporaryFile(mode="w+", newline="")  # noqa: SIM115
+        try:
+            result = self.handle_batch_prediction_stream(file, sink, on_chunk=job.report)
+        except BaseException:
+            sink.close()
+            raise
+        job.last_run = METRICS.last_run() if METRICS.enabled else None
+        return result, sink
+
+    # @override
+    def submit_batch_prediction(self, file: BytesIO, stream: bool = False) -> str:
+        """Queues the batch prediction of a CSV file as a background job.
+
+        Args:
+            file (BytesIO): A CSV file-like object containing multiple prediction inputs. Its
+                bytes are read once, here, and the job parses its own file object over them:
+                the upload stays owned by the session, which may rerun, read it or submit it
+                again while the job runs.
+            stream (bool, optional): Scores the file chunk by chunk with
+                `handle_batch_prediction_stream`, its labelled rows being kept in a temporary
+                file instead of memory. Defaults to False.
+
+        Returns:
+            str: Id of the job, to poll with `get_batch_job`.
+        """
+        content: bytes = file.getvalue()  # the whole buffer, wherever the position is
+        return BATCH_JOBS.submit(lambda job: self.__run_job(job, BytesIO(content), stream))
+
+    # @override
+    def get_batch_job(self, job_id: str) -> BatchJob | None:
+        return BATCH_JOBS.get(job_id)
+
+    # @override
+    def cancel_batch_job(self, job_id: str) -> None:
+        BATCH_JOBS.cancel(job_id)
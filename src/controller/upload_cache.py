@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from hashlib import blake2b
+from io import BytesIO
+from threading import Lock
+from typing import TypeAlias
+
+from pandas import DataFrame
+from pyarrow import Table
+
+ParsedUpload: TypeAlias = (
+    DataFrame | Table
+)  # parsed by pandas, or by ArrowPreprocessingService.read
+
+
+class UploadCache:
+    """Parsed CSV uploads, keyed by a hash of their content.
+
+    Streamlit hands every rerun a fresh upload object, so the same file is recognized by its
+    bytes rather than by identity. Hashing an upload is much cheaper than parsing it. The
+    least recently used frames are dropped past `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 4):
+        assert max_entries > 0
+
+        self.__max_entries: int = max_entries
+        self.__frames: OrderedDict[str, ParsedUpload] = OrderedDict()
+        self.__lock: Lock = Lock()
+
+    @staticmethod
+    def key(file: BytesIO) -> str:
+        with file.getbuffer() as content:
+            return blake2b(content, digest_size=16).hexdigest()
+
+    def get(self, file: BytesIO, parse: Callable[[BytesIO], ParsedUpload]) -> ParsedUpload:
+        """Returns the parsed upload, parsing it only the first time its content is seen.
+
+        Args:
+            file (BytesIO): The uploaded CSV file.
+            parse (Callable[[BytesIO], ParsedUpload]): Parses the file on a cache miss.
+
+        Returns:
+            ParsedUpload: A shallow copy of the cached frame, dropping rows or adding columns
+                on it leaves the cache untouched, writing into its columns does not. Tables
+                are immutable and returned as cached.
+        """
+        key: str = self.key(file)
+        with self.__lock:
+            data: ParsedUpload | None = self.__frames.get(key)
+            if data is not None:
+                self.__frames.move_to_end(key)
+        if data is None:  # parsed outside the lock, other uploads are not kept waiting
+            data = parse(file)
+            with self.__lock:
+                self.__frames[key] = data
+                while len(self.__frames) > self.__max_entries:
+                    self.__frames.popitem(last=False)
+        if isinstance(data, Table):
+            return data
+        shallow: DataFrame = data.copy(deep=False)
+        return shallow
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__frames.clear()
+
+
+PARSED_UPLOADS: UploadCache = UploadCache()  # shared by every session of the app
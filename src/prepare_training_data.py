@@ -0,0 +1,137 @@
+from argparse import ArgumentParser, Namespace
+from hashlib import sha256
+from pathlib import Path
+
+from numpy import nan
+from pandas import Categorical, CategoricalDtype, DataFrame, read_csv, read_parquet
+
+RAW_DATA_PATH: str = r"data/raw_german_credit_data.csv"
+SNAPSHOTS_DIR: str = r"data/snapshots"
+# bump whenever `prepare` changes, so snapshots written by the previous version are not reused
+PREPARATION_VERSION: int = 1
+
+SELECTED_FEATURES: list[str] = [
+    "Credit amount",
+    "Purpose",
+    "Job",
+    "Sex",
+    "Saving accounts",
+    "Housing",
+    "Risk",
+    "Age",
+    "Duration",
+    "Unnamed: 0",  # this column contains indexes for duplicated data
+]
+
+CATEGORICAL_COLS: dict[str, list | None] = {
+    "Purpose": None,
+    "Job": [0, 1, 2, 3],
+    "Sex": None,
+    "Saving accounts": ["little", "quite rich", "rich"],
+    "Housing": None,
+    "Risk": ["good", "bad"],
+}
+
+NUMERIC_COLS: dict[str, str] = {
+    "Duration": "Int64",  # has to be base 64 so it can be nullable
+    "Credit amount": "Int64",
+    "Age": "Int64",
+}
+
+
+def prepare(data: DataFrame) -> DataFrame:
+    """
+    Cleans the raw credit data: selects the features, removes the duplicated requests,
+    casts the categorical columns and replaces the weird values of the numeric columns
+    with NA before casting them to nullable integers.
+
+    Args:
+        data (DataFrame): Raw data as read from the CSV file.
+
+    Returns:
+        DataFrame: The cleaned and typed dataset.
+    """
+    dataset: DataFrame = data[SELECTED_FEATURES]
+    dataset = dataset.drop_duplicates(subset=["Unnamed: 0"])
+    dataset = dataset.drop(columns=["Unnamed: 0"])
+
+    dataset[list(CATEGORICAL_COLS.keys())] = dataset[list(CATEGORICAL_COLS.keys())].astype(
+        "category"
+    )
+    for col, categories in CATEGORICAL_COLS.items():
+        if categories:
+            dataset[col] = Categorical(dataset[col], categories=categories, ordered=True)
+
+    checking_df: DataFrame = dataset.copy()
+    for col in NUMERIC_COLS:
+        checking_df[col] = checking_df[col].astype(str)  # convert to string temporarily
+        mask = ~checking_df[col].str.match(
+            r"^-?\d+\.?\d*$", na=True
+        )  # detecting weird values inside numerical columns
+        print(f"Invalid values found for column {col}:", dataset[mask][col].unique())
+        dataset.loc[mask, col] = nan
+
+    return dataset.astype(NUMERIC_COLS)
+
+
+def snapshot_path(raw_data_path: str = RAW_DATA_PATH, snapshots_dir: str = SNAPSHOTS_DIR) -> Path:
+    """
+    Returns where the snapshot of a raw file is stored, named after the hash of the file
+    content and of the preparation version.
+
+    Args:
+        raw_data_path (str, optional): Raw CSV file. Defaults to RAW_DATA_PATH.
+        snapshots_dir (str, optional): Directory of the snapshots. Defaults to SNAPSHOTS_DIR.
+
+    Returns:
+        Path: Path of the Parquet snapshot, which may not exist yet.
+    """
+    digest = sha256(f"v{PREPARATION_VERSION}:".encode())
+    with open(raw_data_path, "rb") as file:
+        for block in iter(lambda: file.read(1024**2), b""):
+            digest.update(block)
+    return Path(snapshots_dir) / f"training_data-{digest.hexdigest()[:16]}.parquet"
+
+
+def load_snapshot(
+    raw_data_path: str = RAW_DATA_PATH, snapshots_dir: str = SNAPSHOTS_DIR
+) -> DataFrame:
+    """
+    Loads the cleaned dataset from its Parquet snapshot, preparing and writing the snapshot
+    first if the raw file has changed since it was taken. Categorical (with their ordering)
+    and nullable integer dtypes are kept by the snapshot.
+
+    Args:
+        raw_data_path (str, optional): Raw CSV file. Defaults to RAW_DATA_PATH.
+        snapshots_dir (str, optional): Directory of the snapshots. Defaults to SNAPSHOTS_DIR.
+
+    Returns:
+        DataFrame: The cleaned and typed dataset.
+    """
+    path: Path = snapshot_path(raw_data_path, snapshots_dir)
+    if path.exists():
+        dataset: DataFrame = read_parquet(path)
+        for col, categories in CATEGORICAL_COLS.items():
+            if categories and not isinstance(dataset[col].dtype, CategoricalDtype):
+                # Parquet only keeps dictionaries of strings, e.g. Job is read back as numbers
+                dataset[col] = Categorical(dataset[col], categories=categories, ordered=True)
+        return dataset
+
+    dataset = prepare(read_csv(raw_data_path, low_memory=False))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial: Path = path.with_suffix(".tmp")  # renamed once complete, never read half written
+    dataset.to_parquet(partial)
+    partial.replace(path)
+    return dataset
+
+
+if __name__ == "__main__":
+    parser: ArgumentParser = ArgumentParser(
+        description="Write the typed Parquet snapshot of the training data."
+    )
+    parser.add_argument("--data", default=RAW_DATA_PATH, help="raw CSV file")
+    parser.add_argument("--snapshots-dir", default=SNAPSHOTS_DIR)
+    args: Namespace = parser.parse_args()
+
+    load_snapshot(args.data, args.snapshots_dir)
+    print(f"Snapshot written to {snapshot_path(args.data, args.snapshots_dir)}")
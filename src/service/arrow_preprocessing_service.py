@@ -0,0 +1,308 @@
+from collections.abc import Iterator
+from csv import reader
+from time import perf_counter
+from typing import Any, BinaryIO, ClassVar
+
+from numpy import arange, full, ndarray, sort
+from pandas import Categorical, CategoricalDtype, DataFrame, Index, Series, StringDtype
+from pandas.api.extensions import ExtensionArray
+from pandas.api.types import pandas_dtype
+from pyarrow import (
+    Array,
+    ArrowInvalid,
+    ArrowTypeError,
+    ChunkedArray,
+    RecordBatch,
+    Table,
+    array,
+    float64,
+    from_numpy_dtype,
+    int64,
+    null,
+    scalar,
+    string,
+)
+from pyarrow import compute as pc
+from pyarrow import types as pa_types
+from pyarrow.csv import ConvertOptions, CSVStreamingReader, open_csv, read_csv
+
+from src.service.metrics import METRICS
+from src.service.preprocessing_service import PreprocessingService
+
+
+class ArrowPreprocessingService(PreprocessingService):
+    """Preprocessing built on pyarrow.csv and Arrow compute kernels.
+
+    Produces the same frame as `PreprocessingService.execute`, but numeric validation runs as
+    a vectorized regex over the parsed text, numerics are cast without going through Python
+    strings and categoricals are coded against the fixed categories of the schema with
+    `index_in` instead of going through Python objects.
+    """
+
+    DUPLICATES_KEY: ClassVar[str] = "Unnamed: 0"  # contains indexes for duplicated data
+    NUMERIC_PATTERN: ClassVar[str] = r"^-?\d+\.?\d*$"
+    # pandas' default NA markers, Arrow's default list lacks "None" and "<NA>"
+    NA_VALUES: ClassVar[list[str]] = [
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    ]
+    # floats whose repr matches NUMERIC_PATTERN, outside it the repr uses scientific notation
+    MAX_PLAIN_FLOAT: ClassVar[float] = 1e16
+    MIN_PLAIN_FLOAT: ClassVar[float] = 1e-4
+    READ_CSV_STAGE: ClassVar[str] = "ArrowPreprocessingService.read_csv"
+    # pandas dtypes of the columns `rows` returns, Arrow backed instead of Python objects
+    TEXT_DTYPES: ClassVar[dict[Any, StringDtype]] = {string(): StringDtype("pyarrow")}
+
+    def __check_columns(self, columns: list[str]) -> None:
+        missing_fields: list[str] = [
+            field for field in self.EXPECTED_COLUMNS if field not in columns
+        ]
+        if missing_fields:
+            raise ValueError(self.REQUIRED_FIELDS_ERROR.format(missing_fields))
+
+    def columns(self, file: BinaryIO, all_columns: bool = False) -> list[str]:
+        """Checks the header of a CSV file and returns the columns `read` keeps.
+
+        Raises:
+            ValueError: If any of the expected columns is missing.
+        """
+        file.seek(0)  # reset file pointer
+        header: list[str] = next(reader([file.readline().decode("utf-8-sig")]), [])
+        file.seek(0)
+        self.__check_columns(header)
+
+        columns: list[str] = (
+            [*self.EXPECTED_COLUMNS, self.DUPLICATES_KEY]
+            if self.DUPLICATES_KEY in header and not all_columns
+            else header
+        )
+        return columns
+
+    def __convert_options(self, columns: list[str]) -> ConvertOptions:
+        return ConvertOptions(
+            include_columns=columns,
+            column_types=dict.fromkeys(columns, string()),
+            null_values=self.NA_VALUES,
+            strings_can_be_null=True,
+        )
+
+    def read(self, file: BinaryIO, all_columns: bool = False) -> Table:
+        """Parses a CSV file into an Arrow table, keeping only the columns preprocessing needs.
+
+        Every column is read as text so dirty values anywhere in the file cannot break type
+        inference; they are validated and cast by `execute`. When the file has no
+        `DUPLICATES_KEY` column all columns are kept, since duplicates are then full rows.
+
+        Args:
+            file (BinaryIO): A CSV file-like object containing input data.
+            all_columns (bool, optional): Keep every column, e.g. to write the rows back out
+                with their labels. Defaults to False.
+
+        Raises:
+            ValueError: If any of the expected columns is missing.
+
+        Returns:
+            Table: The parsed columns.
+        """
+        columns: list[str] = self.columns(file, all_columns)
+        start: float = perf_counter()
+        table: Table = read_csv(file, convert_options=self.__convert_options(columns))
+        if METRICS.enabled:  # rows are only known once parsed
+            METRICS.observe(self.READ_CSV_STAGE, perf_counter() - start, len(table))
+        return table
+
+    def read_chunks(
+        self, file: BinaryIO, chunk_size: int, all_columns: bool = False
+    ) -> Iterator[Table]:
+        """Parses a CSV file lazily, `chunk_size` rows at a time, like `read` does.
+
+        Args:
+            file (BinaryIO): A CSV file-like object containing input data.
+            chunk_size (int): Number of rows per chunk.
+            all_columns (bool, optional): Keep every column. Defaults to False.
+
+        Raises:
+            ValueError: If any of the expected columns is missing.
+
+        Yields:
+            Table: Parsed chunks of the input file.
+        """
+        assert chunk_size > 0
+
+        columns: list[str] = self.columns(file, all_columns)
+        start: float = perf_counter()
+        batches: CSVStreamingReader = open_csv(
+            file, convert_options=self.__convert_options(columns)
+        )
+        pending: list[RecordBatch] = []
+        rows: int = 0
+        for batch in batches:  # blocks of the file, whatever their number of rows
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= chunk_size:
+                buffered: Table = Table.from_batches(pending)
+                chunk: Table = buffered.slice(0, chunk_size)
+                if METRICS.enabled:
+                    METRICS.observe(self.READ_CSV_STAGE, perf_counter() - start, len(chunk))
+                yield chunk
+                start = perf_counter()
+                rest: Table = buffered.slice(chunk_size)
+                pending = rest.to_batches()
+                rows = rest.num_rows
+        if rows:
+            last: Table = Table.from_batches(pending)
+            if METRICS.enabled:
+                METRICS.observe(self.READ_CSV_STAGE, perf_counter() - start, len(last))
+            yield last
+
+    @classmethod
+    def rows(cls, table: Table, preprocessed: DataFrame) -> DataFrame:
+        """Rows of a table that `execute` kept, aligned with its result.
+
+        Text columns are backed by Arrow strings rather than Python objects.
+
+        Args:
+            table (Table): Table read by `read` or `read_chunks`.
+            preprocessed (DataFrame): What `execute` returned for the table.
+
+        Returns:
+            DataFrame: The kept rows, indexed like `preprocessed`.
+        """
+        rows: DataFrame = table.take(preprocessed.index.to_numpy()).to_pandas(
+            types_mapper=cls.TEXT_DTYPES.get
+        )
+        rows.index = preprocessed.index
+        return rows
+
+    @staticmethod
+    def __from_pandas(data: DataFrame) -> Table:
+        """Converts a DataFrame to Arrow, as text any object column mixing strings and numbers.
+
+        pandas leaves such columns as objects (e.g. a CSV read in chunks whose chunks inferred
+        different types), which Arrow refuses to convert. Their values become strings the way
+        `PreprocessingService` sees them, with `astype(str)`, missing values staying missing.
+        """
+        try:
+            return Table.from_pandas(data, preserve_index=False)
+        except (ArrowInvalid, ArrowTypeError):
+            texts: dict[str, Series] = {
+                col: data[col].astype(str).where(data[col].notna())
+                for col in data.columns
+                if data[col].dtype == object
+            }
+            return Table.from_pandas(data.assign(**texts), preserve_index=False)
+
+    def __unique_rows(self, table: Table) -> ndarray:
+        """Positions of the first occurrence of every row, like `drop_duplicates(keep="first")`."""
+        keys: list[str] = (
+            [self.DUPLICATES_KEY]
+            if self.DUPLICATES_KEY in table.column_names
+            else table.column_names
+        )
+        rows: Table = table.select(keys).append_column("__row", array(arange(table.num_rows)))
+        first: ChunkedArray = rows.group_by(keys).aggregate([("__row", "min")])["__row_min"]
+        return sort(first.to_numpy())
+
+    def __parse_numbers(self, column: Array) -> Array:
+        """Casts a column to float64, nulling out values that fail NUMERIC_PATTERN."""
+        if pa_types.is_string(column.type) or pa_types.is_large_string(column.type):
+            valid: Array = pc.match_substring_regex(column, self.NUMERIC_PATTERN)
+            return pc.if_else(valid, column, scalar(None, column.type)).cast(float64())
+        if pa_types.is_floating(column.type):
+            magnitude: Array = pc.abs(column)
+            valid = pc.and_(
+                pc.and_(pc.is_finite(column), pc.less(magnitude, self.MAX_PLAIN_FLOAT)),
+                pc.or_(pc.equal(column, 0), pc.greater_equal(magnitude, self.MIN_PLAIN_FLOAT)),
+            )
+            return pc.if_else(valid, column, scalar(None, column.type))
+        return column.cast(float64())
+
+    def __to_integer(self, column: Array, dtype: str) -> ExtensionArray:
+        # safe cast, fractional values raise like `astype("Int64")` does
+        integers: Array = self.__parse_numbers(column).cast(int64())
+        if dtype != self.WIDE_INTEGER:
+            bounds: Any = self.bounds(dtype)
+            in_range: Array = pc.and_(
+                pc.greater_equal(integers, bounds.min), pc.less_equal(integers, bounds.max)
+            )
+            integers = pc.if_else(in_range, integers, scalar(None, int64())).cast(
+                from_numpy_dtype(pandas_dtype(dtype).numpy_dtype)
+            )
+        extension: ExtensionArray = pandas_dtype(dtype).__from_arrow__(integers)
+        return extension
+
+    def __to_categorical(self, column: Array, dtype: CategoricalDtype) -> Categorical:
+        """Codes of the column values within the fixed categories, -1 (NA) for the rest."""
+        value_set: Array = array(dtype.categories.to_list())
+        if pa_types.is_string(value_set.type):
+            codes: ndarray = (
+                pc.fill_null(pc.index_in(column, value_set=value_set), -1).to_numpy()
+                if pa_types.is_string(column.type) or pa_types.is_large_string(column.type)
+                else full(len(column), -1)
+            )
+        else:
+            codes = pc.fill_null(
+                pc.index_in(self.__parse_numbers(column), value_set=value_set.cast(float64())),
+                -1,
+            ).to_numpy()
+        return Categorical.from_codes(codes, dtype=dtype)
+
+    # @override
+    def execute(self, data: DataFrame | Table) -> DataFrame:
+        """Preprocesses a batch read by pandas or by `read`.
+
+        A DataFrame is deduplicated in place, like `PreprocessingService.execute` does, so
+        callers can keep aligning it with the result. For a Table the result is indexed by the
+        positions of the kept rows.
+
+        Args:
+            data (DataFrame | Table): Raw batch containing at least the expected columns.
+
+        Raises:
+            ValueError: If any of the expected columns is missing.
+
+        Returns:
+            DataFrame: The expected columns with nullable integer and categorical dtypes.
+        """
+        if isinstance(data, DataFrame):
+            self.__check_columns(list(data.columns))
+            data.drop_duplicates(
+                subset=[self.DUPLICATES_KEY], inplace=True
+            ) if self.DUPLICATES_KEY in data.columns else data.drop_duplicates(inplace=True)
+            index: Index = data.index
+            table: Table = self.__from_pandas(data[self.EXPECTED_COLUMNS])
+        else:
+            self.__check_columns(data.column_names)
+            positions: ndarray = self.__unique_rows(data)
+            index = Index(positions)
+            table = data.select(self.EXPECTED_COLUMNS).take(positions)
+
+        columns: dict[str, ExtensionArray | Categorical] = {}
+        for col in self.EXPECTED_COLUMNS:
+            column: ChunkedArray = table[col]
+            merged: Array = column.combine_chunks() if column.num_chunks else array([], null())
+            dtype: str | CategoricalDtype = self.COMPACT_SCHEMA[col]
+            if isinstance(dtype, CategoricalDtype):
+                with METRICS.timed("ArrowPreprocessingService.categorical", len(merged)):
+                    columns[col] = self.__to_categorical(merged, dtype)
+            else:
+                with METRICS.timed("ArrowPreprocessingService.numeric_validation", len(merged)):
+                    columns[col] = self.__to_integer(merged, dtype)
+        return DataFrame(columns, index=index)
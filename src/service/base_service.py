@@ -3,14 +3,26 @@ from typing import Any
 
 from pandas import DataFrame
 
+from src.service.metrics import METRICS
+
 
 class BaseService(ABC):
     """Abstract base class for services that process data.
 
     This class defines a standard interface for executing services
     with a given input data dictionary.
+
+    The `execute` of every subclass is recorded in the shared `METRICS` registry as
+    `<ClassName>.execute` with the rows it received, once recording has been enabled.
     """
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "execute" in cls.__dict__:
+            cls.execute = METRICS.timed_call(  # type: ignore[method-assign]
+                cls.__dict__["execute"], f"{cls.__name__}.execute", batch_arg=1
+            )
+
     @abstractmethod
     def execute(self, data: dict[Any, Any] | DataFrame) -> Any:
         """Executes the service with the provided data.
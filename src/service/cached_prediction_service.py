@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from os import stat
+from threading import Lock
+from typing import Any, ClassVar, NamedTuple
+
+from numpy import float64, nan, ndarray
+from pandas import DataFrame, Series
+from pandas.util import hash_pandas_object
+
+from src.service.base_service import BaseService
+from src.service.model_registry import ModelRegistry
+from src.service.prediction_service import PredictionService
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class CachedPredictionService(BaseService):
+    """LRU cache of scores in front of a PredictionService or a ModelRegistry.
+
+    The pipeline computes its outlier bounds over the whole batch, so a row only scores the
+    same when it arrives with the same batch: entries are whole batches, keyed by a 128-bit
+    digest of the canonicalized EXPECTED_COLUMNS values of every row, in order, and of the
+    identity of the served model file (path, size and modification time), so a retrained or
+    swapped model never serves stale scores. A form request is a batch of one row, so
+    resubmits hit, as do reruns and re-uploads of a file. A miss is scored in one
+    `execute_scores` call, exactly like an uncached batch.
+    """
+
+    NUMERIC_COLUMNS: ClassVar[list[str]] = ["Credit amount", "Age", "Duration", "Job"]
+
+    def __init__(self, service: PredictionService | ModelRegistry, maxsize: int = 1_000_000):
+        """Initializes the cache.
+
+        Args:
+            service (PredictionService | ModelRegistry): The service that scores the batches
+                missing from the cache.
+            maxsize (int, optional): Maximum number of cached rows, least recently used
+                batches are evicted first. Defaults to 1_000_000.
+        """
+        assert maxsize > 0
+
+        self.__service: PredictionService | ModelRegistry = service
+        self.__maxsize: int = maxsize
+        self.__cache: OrderedDict[str, ndarray] = OrderedDict()
+        self.__rows: int = 0
+        self.__lock: Lock = Lock()
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    @property
+    def model_path(self) -> str:
+        """Absolute path of the served model file."""
+        return self.__service.model_path
+
+    @staticmethod
+    def __identity(model_path: str) -> bytes:
+        model_stat: Any = stat(model_path)
+        identity: bytes = f"{model_path}:{model_stat.st_size}:{model_stat.st_mtime_ns}".encode()
+        return blake2b(identity, digest_size=32).digest()
+
+    def __key(self, data: DataFrame) -> str:
+        """Digests the rows, giving equal keys to equal values whatever their dtypes."""
+        canonical: DataFrame = DataFrame(
+            {
+                col: (
+                    data[col].to_numpy(dtype=float64, na_value=nan)
+                    if col in self.NUMERIC_COLUMNS
+                    else Series(data[col].to_numpy(dtype=object)).where(data[col].notna().values)
+                )
+                for col in PredictionService.EXPECTED_COLUMNS
+            }
+        )
+        hashes: ndarray = hash_pandas_object(canonical, index=False).to_numpy()
+        return blake2b(
+            hashes.tobytes(), digest_size=16, key=self.__identity(self.model_path)
+        ).hexdigest()
+
+    def cache_info(self) -> CacheInfo:
+        """Hit and miss counters, like `functools.lru_cache` reports them."""
+        with self.__lock:
+            return CacheInfo(self.__hits, self.__misses, self.__maxsize, self.__rows)
+
+    def cache_clear(self) -> None:
+        with self.__lock:
+            self.__cache.clear()
+            self.__rows = self.__hits = self.__misses = 0
+
+    def execute_scores(self, data: DataFrame) -> ndarray:
+        """Scores a batch, unless the same batch was scored by the same model before.
+
+        Args:
+            data: DataFrame of requests
+
+        Returns:
+            ndarray: Probability of approval, one per row
+        """
+        key: str = self.__key(data)
+        with self.__lock:
+            cached: ndarray | None = self.__cache.get(key)
+            if cached is not None:
+                self.__cache.move_to_end(key)
+                self.__hits += len(cached)
+                return cached.copy()  # callers may write into the scores
+            self.__misses += len(data)
+
+        scores: ndarray = self.__service.execute_scores(data)
+        if len(scores) <= self.__maxsize:
+            with self.__lock:
+                if key not in self.__cache:
+                    self.__cache[key] = scores.copy()
+                    self.__rows += len(scores)
+                while self.__rows > self.__maxsize:
+                    self.__rows -= len(self.__cache.popitem(last=False)[1])
+        return scores
+
+    # @override
+    def execute(self, data: dict[str, Any] | DataFrame) -> ndarray:
+        """Execute prediction on input data, through the cached scores.
+
+        Args:
+            data: Dictionary containing features of one request, or a DataFrame of requests
+
+        Returns:
+            ndarray: Prediction results, one per row
+        """
+        df: DataFrame = (
+            DataFrame.from_dict(data, orient="index").T if isinstance(data, dict) else data
+        )
+        predictions: ndarray = PredictionService.label(self.execute_scores(df))
+        return predictions
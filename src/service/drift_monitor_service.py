@@ -0,0 +1,295 @@
+from threading import Lock
+from typing import Any, ClassVar
+
+from numpy import (
+    bincount,
+    ceil,
+    clip,
+    cumsum,
+    float64,
+    inf,
+    int64,
+    intp,
+    isnan,
+    log,
+    maximum,
+    nan,
+    ndarray,
+    searchsorted,
+    zeros,
+)
+from pandas import CategoricalDtype, DataFrame
+
+from src.service.base_service import BaseService
+from src.service.preprocessing_service import PreprocessingService
+
+
+class QuantileSketch:
+    """Fixed-size, mergeable sketch of a numeric feature, with quantiles within 1%.
+
+    Positive values are counted in logarithmic buckets: bucket `i` holds the values in
+    `(gamma^(i-1), gamma^i]`, so any value is recovered within `RELATIVE_ACCURACY` of itself,
+    as in DDSketch. The buckets span `[MIN_VALUE, MAX_VALUE]` once and for all, values below
+    (zero, negatives) and above fall in an underflow and an overflow bucket, whose quantiles
+    are reported as the exact minimum and maximum. Two sketches always share the same
+    buckets, so merging them is an addition.
+    """
+
+    RELATIVE_ACCURACY: ClassVar[float] = 0.01
+    MIN_VALUE: ClassVar[float] = 1.0
+    MAX_VALUE: ClassVar[float] = 1e15  # raw requests hold absurd amounts, they overflow
+    GAMMA: ClassVar[float] = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    # log buckets covering [MIN_VALUE, MAX_VALUE], plus the underflow and overflow buckets
+    BUCKETS: ClassVar[int] = int(ceil(log(MAX_VALUE / MIN_VALUE) / log(GAMMA))) + 3
+
+    def __init__(self) -> None:
+        self.counts: ndarray = zeros(self.BUCKETS, dtype=int64)
+        self.missing: int = 0
+        self.min: float = inf
+        self.max: float = -inf
+
+    @property
+    def count(self) -> int:
+        """Values counted, missing ones left out."""
+        return int(self.counts.sum())
+
+    def add(self, values: ndarray) -> None:
+        """Counts a batch of values, NaN being missing."""
+        present: ndarray = values[~isnan(values)]
+        self.missing += len(values) - len(present)
+        if not len(present):
+            return
+        # bucket 0 underflows, bucket i + 1 holds (gamma^(i-1), gamma^i], the last overflows
+        exponents: ndarray = ceil(
+            log(maximum(present, self.MIN_VALUE) / self.MIN_VALUE) / log(self.GAMMA)
+        )
+        indices: ndarray = clip(exponents.astype(intp) + 1, 1, self.BUCKETS - 2)
+        indices[present < self.MIN_VALUE] = 0
+        indices[present > self.MAX_VALUE] = self.BUCKETS - 1
+        self.counts += bincount(indices, minlength=self.BUCKETS)
+        self.min = min(self.min, float(present.min()))
+        self.max = max(self.max, float(present.max()))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        self.counts += other.counts
+        self.missing += other.missing
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def cdf(self) -> ndarray:
+        """Fraction of the values up to every bucket."""
+        assert self.count, "No values have been counted"
+        cdf: ndarray = cumsum(self.counts) / self.count
+        return cdf
+
+    def quantile(self, q: float) -> float:
+        """Value below which a fraction `q` of the values lie, within RELATIVE_ACCURACY."""
+        bucket: int = int(searchsorted(self.cdf(), q))
+        if bucket == 0:
+            return self.min
+        if bucket == self.BUCKETS - 1:
+            return self.max
+        # midpoint, in relative terms, of the values the bucket holds
+        value: float = 2 * self.MIN_VALUE * self.GAMMA ** (bucket - 1) / (self.GAMMA + 1)
+        return min(max(value, self.min), self.max)
+
+
+class FrequencySketch:
+    """Counts of every category of a categorical feature, plus the missing values."""
+
+    def __init__(self, categories: list[Any]):
+        self.categories: list[Any] = categories
+        self.counts: ndarray = zeros(len(categories), dtype=int64)
+        self.missing: int = 0
+
+    @property
+    def count(self) -> int:
+        """Values counted, missing ones left out."""
+        return int(self.counts.sum())
+
+    def add(self, codes: ndarray) -> None:
+        """Counts a batch of category codes, -1 being missing."""
+        counts: ndarray = bincount(codes + 1, minlength=len(self.categories) + 1)
+        self.missing += int(counts[0])
+        self.counts += counts[1:]
+
+    def merge(self, other: "FrequencySketch") -> "FrequencySketch":
+        assert self.categories == other.categories
+        self.counts += other.counts
+        self.missing += other.missing
+        return self
+
+    def frequencies(self) -> ndarray:
+        """Share of every category and, last, of the missing values."""
+        counts: ndarray = zeros(len(self.categories) + 1, dtype=float64)
+        counts[:-1] = self.counts
+        counts[-1] = self.missing
+        assert counts.sum(), "No values have been counted"
+        frequencies: ndarray = counts / counts.sum()
+        return frequencies
+
+
+FeatureSketch = QuantileSketch | FrequencySketch
+
+
+class DriftSketches:
+    """One fixed-size sketch per monitored feature of preprocessed batches.
+
+    The memory taken does not depend on the rows seen, and sketches of different batches
+    (or chunks, or workers) merge into the sketches of their union.
+    """
+
+    QUANTILE_FEATURES: ClassVar[list[str]] = ["Credit amount", "Age", "Duration"]
+    FREQUENCY_FEATURES: ClassVar[list[str]] = [
+        "Purpose",
+        "Sex",
+        "Housing",
+        "Job",
+        "Saving accounts",
+    ]
+
+    def __init__(self) -> None:
+        self.rows: int = 0
+        self.sketches: dict[str, FeatureSketch] = {
+            feature: QuantileSketch() for feature in self.QUANTILE_FEATURES
+        }
+        for feature in self.FREQUENCY_FEATURES:
+            dtype: Any = PreprocessingService.COMPACT_SCHEMA[feature]
+            assert isinstance(dtype, CategoricalDtype)
+            self.sketches[feature] = FrequencySketch(list(dtype.categories))
+
+    def add(self, data: DataFrame) -> "DriftSketches":
+        """Counts a batch as preprocessed by `PreprocessingService`.
+
+        Args:
+            data (DataFrame): Preprocessed batch, categorical features with the compact
+                schema categories.
+
+        Returns:
+            DriftSketches: These sketches, updated.
+        """
+        self.rows += len(data)
+        for feature, sketch in self.sketches.items():
+            if isinstance(sketch, QuantileSketch):
+                sketch.add(data[feature].to_numpy(dtype=float64, na_value=nan))
+            else:
+                sketch.add(data[feature].cat.codes.to_numpy(dtype=intp))
+        return self
+
+    def merge(self, other: "DriftSketches") -> "DriftSketches":
+        self.rows += other.rows
+        for feature, sketch in self.sketches.items():
+            sketch.merge(other.sketches[feature])  # type: ignore[arg-type]
+        return self
+
+    @property
+    def nbytes(self) -> int:
+        return sum(sketch.counts.nbytes for sketch in self.sketches.values())
+
+
+class DriftMonitorService(BaseService):
+    """Compares the batches being scored with the training data, in bounded memory.
+
+    Every preprocessed batch passed to `execute` is sketched, and its sketches are merged
+    into the sketches of every batch seen by the process. `compare` checks any sketches
+    against the reference: numeric features by the Kolmogorov-Smirnov distance of their
+    distributions (computed on the shared sketch buckets), categorical ones by the
+    population stability index of their frequencies, missing values included.
+    """
+
+    KS_THRESHOLD: ClassVar[float] = 0.1
+    PSI_THRESHOLD: ClassVar[float] = 0.2  # the usual "significant shift" rule of thumb
+    PSI_FLOOR: ClassVar[float] = 1e-4  # frequency of categories never seen on one side
+    QUANTILES: ClassVar[list[float]] = [0.1, 0.5, 0.9]
+    REPORT_COLUMNS: ClassVar[list[str]] = [
+        "feature",
+        "statistic",
+        "value",
+        "drifted",
+        "reference",
+        "observed",
+    ]
+
+    def __init__(self, reference: DataFrame):
+        """Sketches the reference.
+
+        Args:
+            reference (DataFrame): Training requests as preprocessed by
+                `PreprocessingService`, e.g. data/raw_german_credit_data.csv.
+        """
+        self.reference: DriftSketches = DriftSketches().add(reference)
+        self.observed: DriftSketches = DriftSketches()
+        self.__lock: Lock = Lock()
+
+    # @override
+    def execute(self, data: dict[str, Any] | DataFrame) -> DriftSketches:
+        """Sketches a preprocessed batch, merging it into the batches observed so far.
+
+        Args:
+            data: DataFrame of preprocessed requests
+
+        Returns:
+            DriftSketches: Sketches of this batch alone.
+        """
+        assert isinstance(data, DataFrame)
+
+        sketches: DriftSketches = DriftSketches().add(data)
+        with self.__lock:
+            self.observed.merge(sketches)
+        return sketches
+
+    def __summary(self, sketch: FeatureSketch) -> str:
+        if not sketch.count:
+            return "-"
+        if isinstance(sketch, QuantileSketch):
+            return " · ".join(f"p{q * 100:.0f} {sketch.quantile(q):,.0f}" for q in self.QUANTILES)
+        top: int = int(sketch.counts.argmax())
+        return f"{sketch.categories[top]} ({sketch.counts[top] / sketch.count:.0%})"
+
+    def __statistic(self, reference: FeatureSketch, observed: FeatureSketch) -> tuple[str, float]:
+        if isinstance(reference, QuantileSketch):
+            assert isinstance(observed, QuantileSketch)
+            return "KS", float(abs(reference.cdf() - observed.cdf()).max())
+        assert isinstance(observed, FrequencySketch)
+        expected: ndarray = maximum(reference.frequencies(), self.PSI_FLOOR)
+        actual: ndarray = maximum(observed.frequencies(), self.PSI_FLOOR)
+        return "PSI", float(((actual - expected) * log(actual / expected)).sum())
+
+    def compare(self, sketches: DriftSketches | None = None) -> DataFrame:
+        """Compares sketches with the reference, feature by feature.
+
+        Args:
+            sketches (DriftSketches | None, optional): Sketches of a batch, every batch
+                observed so far if None. Defaults to None.
+
+        Returns:
+            DataFrame: One row per feature with its statistic, whether it exceeds the
+                threshold, and a summary of the reference and observed distributions.
+        """
+        if sketches is None:
+            with self.__lock:
+                sketches = DriftSketches().merge(self.observed)
+
+        rows: list[dict[str, Any]] = []
+        for feature, reference in self.reference.sketches.items():
+            observed: FeatureSketch = sketches.sketches[feature]
+            statistic: str
+            value: float = nan
+            if observed.count:
+                statistic, value = self.__statistic(reference, observed)
+            else:
+                statistic = "KS" if isinstance(reference, QuantileSketch) else "PSI"
+            threshold: float = self.KS_THRESHOLD if statistic == "KS" else self.PSI_THRESHOLD
+            rows.append(
+                {
+                    "feature": feature,
+                    "statistic": statistic,
+                    "value": value,
+                    "drifted": bool(value > threshold),
+                    "reference": self.__summary(reference),
+                    "observed": self.__summary(observed),
+                }
+            )
+        report: DataFrame = DataFrame(rows, columns=self.REPORT_COLUMNS)
+        return report
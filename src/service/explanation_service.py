@@ -0,0 +1,77 @@
+from typing import Any
+
+from imblearn.pipeline import Pipeline as ImbPipeline
+from numpy import dot, float64, ndarray, zeros
+from pandas import DataFrame
+
+from src.service.base_service import BaseService
+from src.service.metrics import METRICS
+from src.service.scoring_plan import ScoringPlan
+
+
+class ExplanationService(BaseService):
+    """Exact per-feature contributions to the log-odds of approval of every request.
+
+    The model is a LogisticRegression over the preprocessor output, so the log-odds of a row
+    are `intercept + coef . x`. The contribution of an input column is the sum of
+    `coef_k * (x_k - baseline_k)` over the features `k` computed from it (the one-hot columns
+    of a category, or the numeric value itself): the linear SHAP values of the model, with
+    the background mean as baseline. The preprocessor runs through the compiled
+    `ScoringPlan`, and the contributions of a whole batch come out of one matrix product.
+
+    Contributions plus `expected_value` add up to the log-odds the model scores the row with.
+    """
+
+    def __init__(self, model: ImbPipeline, background: DataFrame | None = None):
+        """Compiles the model and computes the baseline.
+
+        Args:
+            model (ImbPipeline): Fitted preprocessor + LogisticRegression pipeline.
+            background (DataFrame | None, optional): Preprocessed requests whose mean
+                transformed row is the baseline, e.g. the training data. Without it the
+                baseline is the all-zero row and `expected_value` is the intercept.
+                Defaults to None.
+
+        Raises:
+            TypeError: If the pipeline cannot be compiled into a `ScoringPlan`.
+        """
+        self.__plan: ScoringPlan = ScoringPlan(model)
+        self.__background: DataFrame | None = background
+        self.features: list[str] = list(dict.fromkeys(self.__plan.feature_columns))
+        coef: ndarray = self.__plan.coef.ravel()
+        # weights[k, j] = coef_k when feature k is computed from input column j
+        self.__weights: ndarray = zeros((self.__plan.n_features, len(self.features)))
+        for k, column in enumerate(self.__plan.feature_columns):
+            self.__weights[k, self.features.index(column)] = coef[k]
+
+        self.__baseline: ndarray = (
+            zeros(self.__plan.n_features, dtype=float64)
+            if background is None
+            else self.__plan.transform(background).mean(axis=0)
+        )
+        self.expected_value: float = float(self.__plan.intercept[0] + dot(coef, self.__baseline))
+
+    def with_model(self, model: ImbPipeline) -> "ExplanationService":
+        """Explainer of another model, e.g. a newly activated version, with this background."""
+        return ExplanationService(model, background=self.__background)
+
+    # @override
+    def execute(self, data: dict[str, Any] | DataFrame) -> DataFrame:
+        """Explains a batch, or the single request of a form.
+
+        Args:
+            data: Dictionary containing features of one request, or a preprocessed DataFrame
+                of requests
+
+        Returns:
+            DataFrame: Contribution of every input column (columns) to the log-odds of
+                approval of every request (rows), indexed like `data`.
+        """
+        df: DataFrame = (
+            DataFrame.from_dict(data, orient="index").T if isinstance(data, dict) else data
+        )
+        X: ndarray = self.__plan.transform(df)
+        with METRICS.timed("ExplanationService.contributions", len(X)):
+            X -= self.__baseline
+            contributions: ndarray = X @ self.__weights
+        return DataFrame(contributions, columns=self.features, index=df.index)
@@ -0,0 +1,209 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Any, ClassVar
+
+from pandas import DataFrame
+
+
+class _StageStats:
+    def __init__(self, buckets: int):
+        self.calls: int = 0
+        self.seconds: float = 0.0
+        self.rows: int = 0
+        self.bucket_counts: list[int] = [0] * buckets  # non-cumulative, one per upper bound
+
+
+class MetricsRegistry:
+    """In-process registry of stage latencies and row counts.
+
+    Recording is opt-in: until `enable` is called every instrumented stage only pays for a
+    boolean check. Totals accumulate for the life of the process and are exported in the
+    Prometheus text format, while the stages recorded since the last `start_run` are kept
+    apart so the latest batch can be inspected on its own. The registry is shared by every
+    thread, but each run is kept in a context variable: runs of different threads (e.g.
+    concurrent batch jobs) never see each other's stages, and work a run hands to another
+    thread is only counted in the totals.
+    """
+
+    BUCKETS: ClassVar[list[float]] = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0]
+    METRIC_PREFIX: ClassVar[str] = "german_credit_stage"
+    INSTRUMENTED_METHODS: ClassVar[list[str]] = [
+        "transform",
+        "predict",
+        "predict_proba",
+        "decision_function",
+    ]
+    LAST_RUN_COLUMNS: ClassVar[list[str]] = ["stage", "calls", "seconds", "rows"]
+
+    def __init__(self, enabled: bool = False):
+        self.enabled: bool = enabled
+        self.__lock: Lock = Lock()
+        self.__totals: dict[str, _StageStats] = {}
+        self.__run: ContextVar[dict[str, _StageStats] | None] = ContextVar(
+            "metrics_run", default=None
+        )
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def observe(self, stage: str, seconds: float, rows: int) -> None:
+        """Records one execution of a stage.
+
+        Args:
+            stage (str): Dotted name of the stage.
+            seconds (float): Wall time the execution took.
+            rows (int): Rows the stage received.
+        """
+        bucket: int = next(
+            (i for i, bound in enumerate(self.BUCKETS) if seconds <= bound), len(self.BUCKETS)
+        )
+        run: dict[str, _StageStats] | None = self.__run.get()
+        with self.__lock:
+            for stats in (self.__totals,) if run is None else (self.__totals, run):
+                stage_stats: _StageStats = stats.setdefault(
+                    stage, _StageStats(len(self.BUCKETS) + 1)
+                )
+                stage_stats.calls += 1
+                stage_stats.seconds += seconds
+                stage_stats.rows += rows
+                stage_stats.bucket_counts[bucket] += 1
+
+    @contextmanager
+    def timed(self, stage: str, rows: int) -> Iterator[None]:
+        """Times the enclosed block as one execution of `stage`, if recording is enabled."""
+        if not self.enabled:
+            yield
+            return
+        start: float = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, perf_counter() - start, rows)
+
+    def timed_call(
+        self, function: Callable[..., Any], stage: str, batch_arg: int = 0
+    ) -> Callable[..., Any]:
+        """Wraps `function` so every call is recorded as `stage`, with the rows of its batch.
+
+        Args:
+            function (Callable[..., Any]): Function receiving a batch (a DataFrame, an array or
+                a dict holding a single request).
+            stage (str): Dotted name of the stage.
+            batch_arg (int, optional): Position of the batch among the positional arguments,
+                1 to wrap an unbound method. Defaults to 0.
+
+        Returns:
+            Callable[..., Any]: The wrapped function.
+        """
+
+        @wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not self.enabled:
+                return function(*args, **kwargs)
+            data: Any = args[batch_arg] if len(args) > batch_arg else None
+            rows: int = len(data) if hasattr(data, "__len__") and not isinstance(data, dict) else 1
+            with self.timed(stage, rows):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def instrument(self, estimator: Any, stage: str) -> None:
+        """Records the inference methods of a fitted estimator and of every step inside it.
+
+        Pipeline steps and ColumnTransformer branches are instrumented recursively under
+        `<stage>.<step name>`, so a slow batch can be traced to the imputer or the encoder
+        responsible. Methods are replaced on the instances, the estimator classes are not
+        modified.
+
+        Args:
+            estimator (Any): Fitted sklearn (or imblearn) estimator.
+            stage (str): Dotted name of the estimator.
+        """
+        from sklearn.compose import ColumnTransformer  # sklearn only loads with a model
+        from sklearn.pipeline import Pipeline
+
+        if isinstance(estimator, Pipeline):
+            for name, step in estimator.steps:
+                self.instrument(step, f"{stage}.{name}")
+        elif isinstance(estimator, ColumnTransformer):
+            for name, transformer, _ in estimator.transformers_:
+                if not isinstance(transformer, str):  # "drop" and "passthrough"
+                    self.instrument(transformer, f"{stage}.{name}")
+
+        for method in self.INSTRUMENTED_METHODS:
+            if hasattr(estimator, method):
+                setattr(
+                    estimator,
+                    method,
+                    self.timed_call(getattr(estimator, method), f"{stage}.{method}"),
+                )
+
+    def start_run(self) -> None:
+        """Starts a new run in the current context, replacing its previous run.
+
+        `last_run` only reports the stages recorded from now on, by this thread (or task).
+        """
+        self.__run.set({})
+
+    def last_run(self) -> DataFrame:
+        """Stages recorded since the last `start_run` of the current context, in the order
+        they first ran.
+
+        Returns:
+            DataFrame: Calls, total seconds and total rows of every stage.
+        """
+        run: dict[str, _StageStats] = self.__run.get() or {}
+        with self.__lock:
+            return DataFrame(
+                [(stage, stats.calls, stats.seconds, stats.rows) for stage, stats in run.items()],
+                columns=self.LAST_RUN_COLUMNS,
+            )
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__totals = {}
+        self.__run.set(None)
+
+    @staticmethod
+    def __label(stage: str) -> str:
+        escaped: str = stage.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+        return f'stage="{escaped}"'
+
+    def to_prometheus(self) -> str:
+        """Dumps the totals in the Prometheus text exposition format.
+
+        Returns:
+            str: A latency histogram and a rows counter per stage.
+        """
+        seconds: str = f"{self.METRIC_PREFIX}_duration_seconds"
+        rows: str = f"{self.METRIC_PREFIX}_rows_total"
+        lines: list[str] = [
+            f"# HELP {seconds} Wall time spent in each stage.",
+            f"# TYPE {seconds} histogram",
+        ]
+        with self.__lock:
+            totals: list[tuple[str, _StageStats]] = sorted(self.__totals.items())
+            for stage, stats in totals:
+                label: str = self.__label(stage)
+                cumulative: int = 0
+                for bound, count in zip(
+                    [*map(str, self.BUCKETS), "+Inf"], stats.bucket_counts, strict=True
+                ):
+                    cumulative += count
+                    lines.append(f'{seconds}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f"{seconds}_sum{{{label}}} {stats.seconds}")
+                lines.append(f"{seconds}_count{{{label}}} {stats.calls}")
+
+            lines += [f"# HELP {rows} Rows received by each stage.", f"# TYPE {rows} counter"]
+            lines += [f"{rows}{{{self.__label(stage)}}} {stats.rows}" for stage, stats in totals]
+        return "\n".join(lines) + "\n"
+
+
+METRICS: MetricsRegistry = MetricsRegistry()  # registry shared by every service
@@ -0,0 +1,126 @@
+from concurrent.futures import Future
+from queue import Empty, Queue
+from threading import Thread
+from time import monotonic
+from typing import Any, ClassVar
+
+from numpy import ndarray
+from pandas import DataFrame
+
+from src.service.base_service import BaseService
+from src.service.prediction_service import PredictionService
+
+
+class MicroBatchingService(BaseService):
+    """Collects concurrent single-applicant requests and scores them in one model call.
+
+    Callers block in `execute` while a background thread gathers every request that arrives
+    within `window_ms` of the first one (up to `max_batch_size`), scores them together with
+    `PredictionService.execute_rows` and hands each caller its own result.
+    """
+
+    SERVICE_CLOSED: ClassVar[str] = "Micro-batching service has been closed"
+
+    def __init__(
+        self,
+        service: PredictionService,
+        window_ms: float = 5.0,
+        max_batch_size: int = 256,
+    ):
+        """Initializes the service and starts the batching thread.
+
+        Args:
+            service (PredictionService): The service that scores the collected batches.
+            window_ms (float, optional): How long to wait for more requests after the first
+                one of a batch, in milliseconds. Defaults to 5.0.
+            max_batch_size (int, optional): Maximum requests scored together. Defaults to 256.
+        """
+        assert window_ms >= 0
+        assert max_batch_size > 0
+
+        self.__service: PredictionService = service
+        self.__window: float = window_ms / 1000
+        self.__max_batch_size: int = max_batch_size
+        self.__queue: Queue[tuple[dict[str, Any], Future[ndarray]] | None] = Queue()
+        self.__closed: bool = False
+        self.__thread: Thread = Thread(target=self.__run, name="micro-batching", daemon=True)
+        self.__thread.start()
+
+    def __collect(self) -> list[tuple[dict[str, Any], Future[ndarray]]] | None:
+        """Blocks for the first request, then gathers more until the window closes.
+
+        Returns:
+            list | None: The batch, or None once the service has been closed.
+        """
+        first: tuple[dict[str, Any], Future[ndarray]] | None = self.__queue.get()
+        if first is None:
+            return None
+
+        batch: list[tuple[dict[str, Any], Future[ndarray]]] = [first]
+        deadline: float = monotonic() + self.__window
+        while len(batch) < self.__max_batch_size:
+            remaining: float = deadline - monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request: tuple[dict[str, Any], Future[ndarray]] | None = self.__queue.get(
+                    timeout=remaining
+                )
+            except Empty:
+                break
+            if request is None:
+                self.__queue.put(None)  # score what was gathered, stop on the next collect
+                break
+            batch.append(request)
+        return batch
+
+    def __score(self, batch: list[tuple[dict[str, Any], Future[ndarray]]]) -> None:
+        try:
+            predictions: ndarray = self.__service.execute_rows(
+                DataFrame([data for data, _ in batch])
+            )
+        except Exception:
+            # one bad request must not fail the others, find it by scoring them one by one
+            for data, future in batch:
+                try:
+                    future.set_result(self.__service.execute_rows(DataFrame([data])))
+                except Exception as err:
+                    future.set_exception(err)
+        else:
+            for row, (_, future) in enumerate(batch):
+                future.set_result(predictions[row : row + 1])
+
+    def __run(self) -> None:
+        while (batch := self.__collect()) is not None:
+            self.__score(batch)
+        while not self.__queue.empty():  # requests that raced with `close`
+            request: tuple[dict[str, Any], Future[ndarray]] | None = self.__queue.get()
+            if request is not None:
+                request[1].set_exception(RuntimeError(self.SERVICE_CLOSED))
+
+    # @override
+    def execute(self, data: dict[str, Any] | DataFrame) -> ndarray:
+        """Scores one applicant, sharing the model call with concurrent requests.
+
+        Args:
+            data: Dictionary containing the features of a single applicant
+
+        Raises:
+            RuntimeError: If the service has been closed.
+
+        Returns:
+            ndarray: Prediction result, same shape as `PredictionService.execute` gives
+        """
+        assert isinstance(data, dict)
+        if self.__closed:
+            raise RuntimeError(self.SERVICE_CLOSED)
+
+        future: Future[ndarray] = Future()
+        self.__queue.put((data, future))
+        return future.result()
+
+    def close(self) -> None:
+        """Scores the requests already queued and stops the batching thread."""
+        self.__closed = True
+        self.__queue.put(None)
+        self.__thread.join()
@@ -0,0 +1,180 @@
+from collections.abc import Callable
+from pathlib import Path
+from re import Pattern, compile
+from threading import Lock
+from time import perf_counter
+from typing import Any, ClassVar
+
+from numpy import ndarray
+from pandas import DataFrame
+
+from src.service.base_service import BaseService
+from src.service.prediction_service import PredictionService
+
+ActivationCallback = Callable[[int, PredictionService], None]  # new version and its service
+
+
+class ModelRegistry(BaseService):
+    """Discovers versioned model artifacts and serves predictions from the active one.
+
+    Artifacts named `<name>-v<version>.joblib` are discovered in `models_dir`. Versions are
+    loaded on first use, memory-mapped so several processes loading the same file share its
+    arrays, and kept loaded so switching back is instant.
+
+    `activate` loads the new version before swapping a single reference, so requests already
+    running keep the service they started with and none are dropped. Subscribers are then
+    told, to rebuild whatever they derived from the previous model.
+    """
+
+    ARTIFACT_PATTERN: ClassVar[Pattern[str]] = compile(r"^(?P<name>.+)-v(?P<version>\d+)\.joblib$")
+    VERSION_NOT_FOUND: ClassVar[str] = "Model version {} not found in {}"
+    NO_ACTIVE_VERSION: ClassVar[str] = "No model version has been activated"
+    NO_VERSIONS: ClassVar[str] = "No model version other than {} found in {}"
+
+    def __init__(
+        self,
+        models_dir: str = "models",
+        name: str = "credit_classification-logistic_regression",
+        compiled: bool = False,
+        mmap_mode: str | None = "r",
+    ):
+        """Initializes the registry and discovers the available versions.
+
+        Args:
+            models_dir (str, optional): Directory holding the artifacts. Defaults to "models".
+            name (str, optional): Model name the artifacts start with.
+                Defaults to "credit_classification-logistic_regression".
+            compiled (bool, optional): Passed to every PredictionService. Defaults to False.
+            mmap_mode (str | None, optional): Passed to every PredictionService.
+                Defaults to "r".
+        """
+        self.__models_dir: Path = Path(models_dir)
+        self.__name: str = name
+        self.__compiled: bool = compiled
+        self.__mmap_mode: str | None = mmap_mode
+        self.__paths: dict[int, Path] = {}
+        self.__services: dict[int, PredictionService] = {}
+        self.load_times: dict[int, float] = {}  # seconds it took to load every version
+        self.__lock: Lock = Lock()
+        self.__active: tuple[int, PredictionService] | None = None
+        self.__subscribers: list[ActivationCallback] = []
+        self.refresh()
+
+    def refresh(self) -> list[int]:
+        """Rescans the models directory for new artifacts.
+
+        Returns:
+            list[int]: The available versions, oldest first.
+        """
+        paths: dict[int, Path] = {}
+        for path in self.__models_dir.glob("*.joblib"):
+            match: Any = self.ARTIFACT_PATTERN.match(path.name)
+            if match and match["name"] == self.__name:
+                paths[int(match["version"])] = path
+        with self.__lock:
+            self.__paths = paths
+        return self.versions
+
+    @property
+    def versions(self) -> list[int]:
+        return sorted(self.__paths)
+
+    @property
+    def active_version(self) -> int | None:
+        active: tuple[int, PredictionService] | None = self.__active
+        return active[0] if active else None
+
+    def get(self, version: int) -> PredictionService:
+        """Returns the service for a version, loading it on first use.
+
+        Args:
+            version (int): Version to load.
+
+        Raises:
+            ValueError: If the version has not been discovered.
+
+        Returns:
+            PredictionService: The service scoring with that version.
+        """
+        with self.__lock:
+            if version in self.__services:
+                return self.__services[version]
+            if version not in self.__paths:
+                raise ValueError(self.VERSION_NOT_FOUND.format(version, self.__models_dir))
+
+            start: float = perf_counter()
+            service: PredictionService = PredictionService(
+                str(self.__paths[version]), compiled=self.__compiled, mmap_mode=self.__mmap_mode
+            )
+            self.load_times[version] = perf_counter() - start
+            self.__services[version] = service
+            return service
+
+    def activate(self, version: int | None = None) -> PredictionService:
+        """Makes a version the one serving predictions.
+
+        Args:
+            version (int | None, optional): Version to activate, the latest if None.
+                Defaults to None.
+
+        Raises:
+            ValueError: If the version has not been discovered.
+
+        Returns:
+            PredictionService: The newly active service.
+        """
+        if version is None:
+            if not self.__paths:
+                raise ValueError(self.VERSION_NOT_FOUND.format("latest", self.__models_dir))
+            version = self.versions[-1]
+        service: PredictionService = self.get(version)  # loaded before the swap
+        self.__active = (version, service)
+        for callback in list(self.__subscribers):
+            callback(version, service)
+        return service
+
+    def latest(self, excluding: int | None = None) -> int:
+        """Latest version discovered, besides `excluding` (e.g. a candidate being shadowed).
+
+        Raises:
+            ValueError: If there is no such version.
+        """
+        versions: list[int] = [version for version in self.versions if version != excluding]
+        if not versions:
+            raise ValueError(self.NO_VERSIONS.format(excluding, self.__models_dir))
+        return versions[-1]
+
+    def subscribe(self, callback: ActivationCallback) -> None:
+        """Calls `callback` with the version and its service after every activation."""
+        with self.__lock:
+            self.__subscribers.append(callback)
+
+    @property
+    def active(self) -> PredictionService:
+        active: tuple[int, PredictionService] | None = self.__active
+        assert active, self.NO_ACTIVE_VERSION
+        return active[1]
+
+    @property
+    def model_path(self) -> str:
+        return self.active.model_path
+
+    # @override
+    def execute(self, data: dict[str, Any] | DataFrame) -> int | Any:
+        """Execute prediction with the active version.
+
+        Args:
+            data: Dictionary containing features, or a DataFrame of requests
+
+        Returns:
+            int: Prediction result
+        """
+        return self.active.execute(data)
+
+    def execute_rows(self, data: DataFrame) -> ndarray:
+        """Same as `PredictionService.execute_rows`, with the active version."""
+        return self.active.execute_rows(data)
+
+    def execute_scores(self, data: DataFrame) -> ndarray:
+        """Same as `PredictionService.execute_scores`, with the active version."""
+        return self.active.execute_scores(data)
@@ -0,0 +1,353 @@
+from datetime import datetime, timezone
+from gzip import open as gzip_open
+from io import BytesIO
+from json import dumps
+from math import isnan
+from pathlib import Path
+from queue import Empty, Full, Queue
+from shutil import copyfileobj
+from threading import Lock, Thread
+from time import monotonic
+from typing import Any, ClassVar, TypeAlias
+
+from pandas import CategoricalDtype, DataFrame, Series
+from pandas.api.types import is_float_dtype, is_integer_dtype
+from pyarrow import Table, concat_tables, field, float64, int64, schema, string
+from pyarrow import json as pa_json
+from pyarrow import types as pa_types
+
+from src.service.base_service import BaseService
+
+LogRecords: TypeAlias = dict[str, Any] | DataFrame  # one decision, or a frame of them
+
+
+class PredictionLogService(BaseService):
+    """Audit trail of the decisions taken, written as JSONL by a background thread.
+
+    `execute` only puts the records on a bounded queue, so the request path pays for an
+    enqueue, never for serializing or writing. When the writer falls behind and the queue
+    is full, `execute` blocks up to `PUT_TIMEOUT` (back-pressure) and then drops the records,
+    counting them in `dropped`: an audit log must not take the app down with it. The writer
+    gathers records until `flush_rows` rows or `FLUSH_INTERVAL` seconds, writes them in one
+    call and flushes. Past `max_bytes` the file is rotated to `<name>.1` (optionally
+    gzipped), older rotations shifting up to `BACKUPS`. A failed write is counted in `failed`
+    and kept in `error`, and the writer goes on with the next records.
+    """
+
+    SERVICE_CLOSED: ClassVar[str] = "Prediction log has been closed"
+    PUT_TIMEOUT: ClassVar[float] = 0.05  # seconds a full queue holds up the request path
+    CLOSE_TIMEOUT: ClassVar[float] = 10.0  # seconds `close` waits for the queued records
+    FLUSH_INTERVAL: ClassVar[float] = 1.0  # seconds gathered records wait to be written
+    BACKUPS: ClassVar[int] = 5  # rotated files kept
+    # every record has these fields, a frame's columns are the same names
+    SCHEMA: ClassVar[Any] = schema(
+        [
+            field("timestamp", string()),
+            field("source", string()),
+            field("batch_id", string()),
+            field("model", string()),
+            field("threshold", float64()),
+            field("Credit amount", int64()),
+            field("Purpose", string()),
+            field("Job", int64()),
+            field("Sex", string()),
+            field("Saving accounts", string()),
+            field("Housing", string()),
+            field("Age", int64()),
+            field("Duration", int64()),
+            field("score", float64()),
+            field("prediction", int64()),
+            field("Credit Request", string()),
+        ]
+    )
+    INTEGER_FIELDS: ClassVar[frozenset[str]] = frozenset(
+        item.name for item in SCHEMA if pa_types.is_integer(item.type)
+    )
+
+    def __init__(
+        self,
+        path: str = r"logs/predictions.jsonl",
+        max_queue: int = 64,
+        flush_rows: int = 10_000,
+        max_bytes: int = 64 * 1024**2,
+        compress: bool = True,
+    ):
+        """Initializes the log and starts the writer thread.
+
+        Args:
+            path (str, optional): JSONL file the records are appended to.
+                Defaults to "logs/predictions.jsonl".
+            max_queue (int, optional): Record sets waiting for the writer, frames are split
+                into sets of at most `flush_rows` rows. Defaults to 64.
+            flush_rows (int, optional): Rows gathered before a write. Defaults to 10_000.
+            max_bytes (int, optional): Size past which the file is rotated.
+                Defaults to 64 MiB.
+            compress (bool, optional): Gzip rotated files. Defaults to True.
+        """
+        assert max_queue > 0
+        assert flush_rows > 0
+        assert max_bytes > 0
+
+        self.path: Path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.__flush_rows: int = flush_rows
+        self.__max_bytes: int = max_bytes
+        self.__compress: bool = compress
+        self.__queue: Queue[LogRecords | None] = Queue(maxsize=max_queue)
+        self.__closed: bool = False
+        self.written: int = 0
+        self.dropped: int = 0
+        self.failed: int = 0  # rows the writer could not write
+        self.error: Exception | None = None  # last write or rotation error
+        self.__lock: Lock = Lock()  # callers drop records concurrently
+        self.__thread: Thread = Thread(target=self.__run, name="prediction-log", daemon=True)
+        self.__thread.start()
+
+    @staticmethod
+    def __size(records: LogRecords) -> int:
+        return len(records) if isinstance(records, DataFrame) else 1
+
+    @classmethod
+    def __conform(cls, record: dict[str, Any]) -> dict[str, Any]:
+        """Rounds floats given for integer SCHEMA fields, e.g. amounts from `number_input`.
+
+        Arrow rejects a whole log when one line holds 1000.0 for an int64 field, frames get
+        the same rounding in `__serialize`.
+        """
+        return {
+            key: (
+                (None if isnan(value) else round(value))
+                if isinstance(value, float) and key in cls.INTEGER_FIELDS
+                else value
+            )
+            for key, value in record.items()
+        }
+
+    @classmethod
+    def __serialize(cls, records: LogRecords) -> str:
+        if isinstance(records, DataFrame):
+            # integer categories holding missing values would be written as floats
+            integers: dict[str, str] = {
+                col: "Int64"
+                for col, dtype in records.dtypes.items()
+                if isinstance(dtype, CategoricalDtype) and is_integer_dtype(dtype.categories)
+            }
+            rounded: dict[str, Series] = {
+                col: records[col].round().astype("Int64")
+                for col, dtype in records.dtypes.items()
+                if col in cls.INTEGER_FIELDS and is_float_dtype(dtype)
+            }
+            lines: str = (
+                records.assign(**rounded)
+                .astype(integers)
+                .to_json(orient="records", lines=True, force_ascii=False)
+            )
+            return lines if lines.endswith("\n") else lines + "\n"
+        return dumps(cls.__conform(records), ensure_ascii=False, default=str) + "\n"
+
+    def __collect(self) -> tuple[list[LogRecords], bool]:
+        """Blocks for the first records, then gathers more until enough rows or time passed.
+
+        Returns:
+            tuple[list[LogRecords], bool]: The records, and whether the log was closed.
+        """
+        first: LogRecords | None = self.__queue.get()
+        if first is None:
+            return [], True
+
+        batch: list[LogRecords] = [first]
+        rows: int = self.__size(first)
+        deadline: float = monotonic() + self.FLUSH_INTERVAL
+        while rows < self.__flush_rows:
+            remaining: float = deadline - monotonic()
+            if remaining <= 0:
+                break
+            try:
+                records: LogRecords | None = self.__queue.get(timeout=remaining)
+            except Empty:
+                break
+            if records is None:
+                return batch, True
+            batch.append(records)
+            rows += self.__size(records)
+        return batch, False
+
+    def __rotate(self) -> None:
+        suffix: str = ".gz" if self.__compress else ""
+        oldest: Path = self.path.with_name(f"{self.path.name}.{self.BACKUPS}{suffix}")
+        oldest.unlink(missing_ok=True)
+        for index in range(self.BACKUPS - 1, 0, -1):
+            rotated: Path = self.path.with_name(f"{self.path.name}.{index}{suffix}")
+            if rotated.exists():
+                rotated.rename(self.path.with_name(f"{self.path.name}.{index + 1}{suffix}"))
+        if not self.BACKUPS:
+            self.path.unlink()
+        elif self.__compress:
+            with self.path.open("rb") as source, gzip_open(f"{self.path}.1.gz", "wb") as target:
+                copyfileobj(source, target)
+            self.path.unlink()
+        else:
+            self.path.rename(self.path.with_name(f"{self.path.name}.1"))
+
+    def __write(self, batch: list[LogRecords]) -> None:
+        rows: int = sum(self.__size(records) for records in batch)
+        try:
+            with self.path.open("a", encoding="utf-8") as file:
+                file.write("".join(self.__serialize(records) for records in batch))
+        except Exception as err:  # a full disk or a bad record must not stop the writer
+            self.failed += rows
+            self.error = err
+            return
+        self.written += rows
+        try:
+            if self.path.stat().st_size >= self.__max_bytes:
+                self.__rotate()
+        except Exception as err:  # retried after the next write
+            self.error = err
+
+    def __run(self) -> None:
+        closed: bool = False
+        while not closed:
+            batch, closed = self.__collect()
+            if batch:
+                self.__write(batch)
+
+    # @override
+    def execute(self, data: dict[str, Any] | DataFrame) -> bool:
+        """Hands decisions to the writer.
+
+        Args:
+            data: One decision as a dictionary, or a DataFrame of them, with SCHEMA fields.
+                Neither may be modified afterwards.
+
+        Raises:
+            RuntimeError: If the log has been closed.
+
+        Returns:
+            bool: False if the queue stayed full and (some of) the records were dropped.
+        """
+        if self.__closed:
+            raise RuntimeError(self.SERVICE_CLOSED)
+        if not self.__thread.is_alive():  # nothing would ever take the records
+            with self.__lock:
+                self.dropped += self.__size(data)
+            return False
+
+        accepted: bool = True
+        parts: list[LogRecords] = (
+            [
+                data[start : start + self.__flush_rows]
+                for start in range(0, len(data), self.__flush_rows)
+            ]
+            if isinstance(data, DataFrame)
+            else [data]
+        )
+        for records in parts:
+            try:
+                self.__queue.put(records, timeout=self.PUT_TIMEOUT)
+            except Full:
+                with self.__lock:
+                    self.dropped += self.__size(records)
+                accepted = False
+        return accepted
+
+    def close(self) -> None:
+        """Writes the queued records and stops the writer.
+
+        Waits at most `CLOSE_TIMEOUT` seconds, so a stuck writer cannot hold up the exit of
+        the process: the records it has not written by then are lost.
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+        deadline: float = monotonic() + self.CLOSE_TIMEOUT
+        while self.__thread.is_alive():
+            try:
+                self.__queue.put(None, timeout=self.PUT_TIMEOUT)
+            except Full:
+                if monotonic() >= deadline:
+                    return
+                continue
+            self.__thread.join(max(deadline - monotonic(), 0))
+            return
+
+    @staticmethod
+    def now() -> str:
+        return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+    @classmethod
+    def read(cls, path: str = r"logs/predictions.jsonl") -> DataFrame:
+        """Loads a log and its rotated files back, oldest records first.
+
+        Files are parsed by Arrow's multithreaded JSON reader against SCHEMA, gzipped
+        rotations are decompressed in memory.
+
+        Args:
+            path (str, optional): Path of the log, as given to the writer.
+                Defaults to "logs/predictions.jsonl".
+
+        Returns:
+            DataFrame: One row per decision, with the SCHEMA columns.
+        """
+        current: Path = Path(path)
+        rotated: list[Path] = sorted(
+            current.parent.glob(f"{current.name}.*"),
+            key=lambda file: int(file.name[len(current.name) + 1 :].split(".")[0]),
+            reverse=True,
+        )
+        options: Any = pa_json.ParseOptions(
+            explicit_schema=cls.SCHEMA, unexpected_field_behavior="ignore"
+        )
+        tables: list[Table] = []
+        for file in [*rotated, current]:
+            if not file.exists() or not file.stat().st_size:
+                continue
+            source: Any = file
+            if file.suffix == ".gz":
+                with gzip_open(file, "rb") as compressed:
+                    source = BytesIO(compressed.read())
+            tables.append(pa_json.read_json(source, parse_options=options))
+        if not tables:
+            return cls.SCHEMA.empty_table().to_pandas()
+        log: DataFrame = concat_tables(tables).to_pandas()
+        return log
+
+
+if __name__ == "__main__":
+    from tempfile import TemporaryDirectory
+
+    # a form decision, as StreamlitController.handle_prediction logs it, then a batch one
+    FORM_RECORD: dict[str, Any] = {
+        "timestamp": PredictionLogService.now(),
+        "source": "form",
+        "batch_id": None,
+        "model": "model.joblib",
+        "threshold": 0.5,
+        "Credit amount": 1000.0,
+        "Purpose": "car",
+        "Job": 2,
+        "Sex": "male",
+        "Saving accounts": "little",
+        "Housing": "own",
+        "Age": 30,
+        "Duration": 12,
+        "score": None,
+        "prediction": 1,
+        "Credit Request": "Credit Approved",
+    }
+    BATCH_RECORDS: DataFrame = DataFrame([{**FORM_RECORD, "source": "batch", "score": 0.7}])
+
+    with TemporaryDirectory() as directory:
+        log: PredictionLogService = PredictionLogService(f"{directory}/predictions.jsonl")
+        log.execute(FORM_RECORD)
+        log.execute(BATCH_RECORDS)
+        log.close()
+        read: DataFrame = PredictionLogService.read(f"{directory}/predictions.jsonl")
+    ok: bool = (
+        log.failed == 0
+        and read["source"].tolist() == ["form", "batch"]
+        and read["Credit amount"].tolist() == [1000, 1000]
+    )
+    print(f"round trip: {len(read)} of 2 records read back, {log.failed} failed")
+    if not ok:
+        raise SystemExit(1)
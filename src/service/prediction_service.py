@@ -3,9 +3,16 @@ from typing import Any, ClassVar
 
 from imblearn.pipeline import Pipeline as ImbPipeline
 from joblib import load
+from numpy import concatenate, int8, ndarray
 from pandas import DataFrame
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
 
 from src.service.base_service import BaseService
+from src.service.metrics import METRICS
+from src.service.scoring_plan import ScoringPlan
+from src.service.transformations import IndexedKNNImputer
 
 
 class PredictionService(BaseService):
@@ -27,12 +34,19 @@ class PredictionService(BaseService):
         "Age",
         "Duration",
     ]
+    POSITIVE_CLASS: ClassVar[int] = 1  # credit approved
+    DEFAULT_THRESHOLD: ClassVar[float] = 0.5  # cutoff `model.predict` decides with
 
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, compiled: bool = False, mmap_mode: str | None = None):
         """Initializes the PredictionService by loading a model from disk.
 
         Args:
             model_path (str): The file path to the trained model.
+            compiled (bool, optional): If True, scores through a NumPy `ScoringPlan` compiled
+                from the fitted pipeline instead of the sklearn object graph. Defaults to False.
+            mmap_mode (str | None, optional): joblib memory-map mode for the numpy arrays of the
+                model, e.g. "r" so processes loading the same file share its pages.
+                Defaults to None.
 
         Raises:
             AssertionError: If the model file does not exist.
@@ -41,7 +55,22 @@ class PredictionService(BaseService):
 
         self.__model_path: str = abspath(model_path)
         self.__model: ImbPipeline | None = None
+        self.__plan: ScoringPlan | None = None
+        self.__mmap_mode: str | None = mmap_mode
         self.__load_model()
+        if compiled:
+            self.__plan = ScoringPlan(self.__model)
+
+    @property
+    def model_path(self) -> str:
+        """Absolute path of the loaded model file."""
+        return self.__model_path
+
+    @property
+    def model(self) -> ImbPipeline:
+        """The loaded pipeline."""
+        assert self.__model, self.MODEL_NOT_LOADED
+        return self.__model
 
     def __load_model(self) -> "PredictionService":
         """Load the model from disk.
@@ -52,9 +81,25 @@ class PredictionService(BaseService):
         Raises:
             RuntimeError: If model loading fails
         """
-        self.__model = load(self.__model_path)
+        self.__model = load(self.__model_path, mmap_mode=self.__mmap_mode)
+        self.__index_imputers(self.__model)
+        METRICS.instrument(self.__model, "pipeline")  # steps are only timed once enabled
         return self
 
+    @classmethod
+    def __index_imputers(cls, estimator: Any) -> None:
+        """Swaps every fitted KNNImputer of the pipeline for an IndexedKNNImputer, in place."""
+        steps: list[tuple[str, Any, Any]] = []
+        if isinstance(estimator, Pipeline):
+            steps = estimator.steps
+        elif isinstance(estimator, ColumnTransformer):
+            steps = estimator.transformers_
+        for position, (name, step, *rest) in enumerate(steps):
+            if type(step) is KNNImputer:
+                steps[position] = (name, IndexedKNNImputer.from_imputer(step), *rest)
+            else:
+                cls.__index_imputers(step)
+
     # @override
     def execute(self, data: dict[str, Any] | DataFrame) -> int | Any:
         """Execute prediction on input data.
@@ -71,4 +116,56 @@ class PredictionService(BaseService):
             DataFrame.from_dict(data, orient="index").T if isinstance(data, dict) else data
         )
         df = df[self.EXPECTED_COLUMNS]
+        if self.__plan is not None:
+            return self.__plan.predict(df)
         return self.__model.predict(df)
+
+    def execute_scores(self, data: DataFrame) -> ndarray:
+        """Scores a batch once, returning the probability of approval of every row.
+
+        Labels for any cutoff can then be derived with `label` without running the model
+        again.
+
+        Args:
+            data: DataFrame of requests
+
+        Returns:
+            ndarray: Probability of `POSITIVE_CLASS`, one per row
+        """
+        assert self.__model, self.MODEL_NOT_LOADED
+
+        df: DataFrame = data[self.EXPECTED_COLUMNS]
+        if self.__plan is not None:
+            return self.__plan.predict_proba(df)
+        column: int = list(self.__model.classes_).index(self.POSITIVE_CLASS)
+        scores: ndarray = self.__model.predict_proba(df)[:, column]
+        return scores
+
+    @staticmethod
+    def label(scores: ndarray, threshold: float = DEFAULT_THRESHOLD) -> ndarray:
+        """Approves (1) the rows scored above `threshold` and denies (0) the rest.
+
+        With the default threshold the labels are the ones `execute` predicts.
+        """
+        labels: ndarray = (scores > threshold).astype(int8)
+        return labels
+
+    def execute_rows(self, data: DataFrame) -> ndarray:
+        """Scores every row as if it had been sent to `execute` on its own.
+
+        The pipeline computes outlier bounds over the whole batch, so scoring independent
+        requests together would let them influence each other. The compiled plan scores the
+        rows independently in one call, otherwise the rows are scored one at a time.
+
+        Args:
+            data: DataFrame with one independent request per row
+
+        Returns:
+            ndarray: Prediction results, one per row
+        """
+        assert self.__model, self.MODEL_NOT_LOADED
+
+        df: DataFrame = data[self.EXPECTED_COLUMNS]
+        if self.__plan is not None:
+            return self.__plan.predict(df, row_wise=True)
+        return concatenate([self.__model.predict(df.iloc[[row]]) for row in range(len(df))])
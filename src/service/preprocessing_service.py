@@ -1,9 +1,11 @@
 from typing import ClassVar
 
-from numpy import nan
-from pandas import Categorical, DataFrame
+from numpy import iinfo
+from pandas import Categorical, CategoricalDtype, DataFrame, Series, to_numeric
+from pandas.api.types import pandas_dtype
 
 from src.service.base_service import BaseService
+from src.service.metrics import METRICS
 
 
 class PreprocessingService(BaseService):
@@ -20,50 +22,72 @@ class PreprocessingService(BaseService):
         "Duration",
     ]
 
-    CATEGORICAL_MAPPINGS: ClassVar[dict[str, list | None]] = {
-        "Purpose": None,
-        "Job": [0, 1, 2, 3],
-        "Sex": None,
-        "Saving accounts": ["little", "quite rich", "rich"],
-        "Housing": None,
-    }
-
-    NUMERICAL_MAPPINGS: ClassVar[dict[str, str]] = {
-        "Duration": "Int64",  # has to be base 64 so it can be nullable
-        "Credit amount": "Int64",
-        "Age": "Int64",
+    NUMERIC_PATTERN: ClassVar[str] = r"^-?\d+\.?\d*$"
+    # Compact dtypes of the preprocessed batch, the same for every batch and chunk: nullable
+    # integers as narrow as the domain of real requests allows (values out of their range are
+    # NA, like text), and categories fixed to the values the model knows (anything else is
+    # NA, as `clean_features` would make it), so every batch shares the same dictionaries
+    COMPACT_SCHEMA: ClassVar[dict[str, str | CategoricalDtype]] = {
+        "Credit amount": "Int64",  # raw requests hold amounts far past 32 bits
+        "Purpose": CategoricalDtype(
+            [
+                "car",
+                "radio/TV",
+                "furniture/equipment",
+                "business",
+                "education",
+                "repairs",
+                "domestic appliances",
+                "vacation/others",
+            ]
+        ),
+        "Job": CategoricalDtype([0, 1, 2, 3], ordered=True),
+        "Sex": CategoricalDtype(["male", "female"]),
+        "Saving accounts": CategoricalDtype(["little", "quite rich", "rich"], ordered=True),
+        "Housing": CategoricalDtype(["own", "rent", "free"]),
+        "Age": "Int16",  # requests are validated to 19-75 years
+        "Duration": "Int16",  # and to 4-72 months
     }
+    WIDE_INTEGER: ClassVar[str] = "Int64"  # values are parsed this wide, then narrowed
 
     @staticmethod
-    def __convert_to_categorical(
-        data: DataFrame, categorical_mappings: dict[str, None | list]
-    ) -> DataFrame:
-        temp_data: DataFrame = data.copy()
-        temp_data[list(categorical_mappings.keys())] = temp_data[
-            list(categorical_mappings.keys())
-        ].astype("category")
-        for col, categories in categorical_mappings.items():
-            if categories:
-                temp_data[col] = Categorical(temp_data[col], categories=categories, ordered=True)
-        return temp_data
+    def bounds(dtype: str) -> iinfo:
+        """Smallest and largest values of an integer schema dtype."""
+        return iinfo(pandas_dtype(dtype).numpy_dtype)
+
+    def __to_integer(self, column: Series, dtype: str) -> Series:
+        # weird values (text, scientific notation...) are NA, fractional values raise
+        valid: Series = column.astype(str).str.match(self.NUMERIC_PATTERN, na=True)
+        numbers: Series = column.where(valid)
+        if numbers.dtype == object:  # numbers and numeric text, which astype cannot mix
+            numbers = to_numeric(numbers)
+        integers: Series = numbers.astype(self.WIDE_INTEGER)
+        if dtype == self.WIDE_INTEGER:
+            return integers
+        bounds: iinfo = self.bounds(dtype)
+        in_range: Series = integers.between(bounds.min, bounds.max).fillna(False)
+        return integers.where(in_range).astype(dtype)
 
     @staticmethod
-    def __convert_to_numerical(data: DataFrame, numerical_mappings: dict[str, str]) -> DataFrame:
-        validation_df: DataFrame = data.copy()
-        temp_data: DataFrame = data.copy()
-        for col in numerical_mappings:
-            validation_df[col] = validation_df[col].astype(
-                str
-            )  # convert to string temporarily for checking
-            mask = ~validation_df[col].str.match(
-                r"^-?\d+\.?\d*$", na=True
-            )  # detecting weird values inside numerical columns
-            temp_data.loc[mask, col] = nan
+    def memory_report(data: DataFrame) -> DataFrame:
+        """Bytes held by every column of a batch, object columns counted with their strings.
+
+        Args:
+            data (DataFrame): Any batch, raw or preprocessed.
 
-        temp_data = temp_data.astype(
-            {col: num_type for col, num_type in numerical_mappings.items()}
+        Returns:
+            DataFrame: Dtype, bytes and bytes per row of every column, then their total.
+        """
+        usage: Series = data.memory_usage(index=False, deep=True)
+        report: DataFrame = DataFrame(
+            {
+                "dtype": [*data.dtypes.astype(str), ""],
+                "bytes": [*usage, usage.sum()],
+            },
+            index=[*data.columns, "total"],
         )
-        return temp_data
+        report["bytes_per_row"] = report["bytes"] / max(len(data), 1)
+        return report
 
     # @override
     def execute(self, data: DataFrame) -> DataFrame:
@@ -75,10 +99,18 @@ class PreprocessingService(BaseService):
             ]
             raise ValueError(self.REQUIRED_FIELDS_ERROR.format(missing_fields)) from err
         else:
-            data.drop_duplicates(
-                subset=["Unnamed: 0"], inplace=True
-            ) if "Unnamed: 0" in data.columns else data.drop_duplicates(inplace=True)
-            data = data[self.EXPECTED_COLUMNS]
-            data = self.__convert_to_categorical(data, self.CATEGORICAL_MAPPINGS)
-            data = self.__convert_to_numerical(data, self.NUMERICAL_MAPPINGS)
-            return data
+            with METRICS.timed("PreprocessingService.drop_duplicates", len(data)):
+                data.drop_duplicates(
+                    subset=["Unnamed: 0"], inplace=True
+                ) if "Unnamed: 0" in data.columns else data.drop_duplicates(inplace=True)
+            # built column by column, so no copy of the raw (object) columns is kept around
+            columns: dict[str, Series | Categorical] = {}
+            for col in self.EXPECTED_COLUMNS:
+                dtype: str | CategoricalDtype = self.COMPACT_SCHEMA[col]
+                if isinstance(dtype, CategoricalDtype):
+                    with METRICS.timed("PreprocessingService.categorical", len(data)):
+                        columns[col] = Categorical(data[col], dtype=dtype)
+                else:
+                    with METRICS.timed("PreprocessingService.numeric_validation", len(data)):
+                        columns[col] = self.__to_integer(data[col], dtype)
+            return DataFrame(columns, index=data.index)
@@ -0,0 +1,382 @@
+from typing import Any, ClassVar
+from warnings import catch_warnings, simplefilter
+
+from imblearn.pipeline import Pipeline as ImbPipeline
+from numpy import (
+    arange,
+    argpartition,
+    asarray,
+    clip,
+    dot,
+    einsum,
+    empty,
+    flatnonzero,
+    float64,
+    intp,
+    isnan,
+    maximum,
+    nan,
+    nanquantile,
+    ndarray,
+    ones_like,
+    sqrt,
+    where,
+    zeros,
+)
+from pandas import Categorical, DataFrame, Series
+from pandas.api.types import is_extension_array_dtype
+from scipy.special import expit
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import KNNImputer, SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, OrdinalEncoder
+
+from src.service.metrics import METRICS
+
+
+class _NumericBranch:
+    """Outlier removal followed by KNN imputation over a block of numeric columns."""
+
+    DISTANCE_CHUNK_SIZE: ClassVar[int] = 1024
+
+    def __init__(self, columns: list[str], threshold: float | None, imputer: KNNImputer):
+        assert imputer.weights == "uniform" and imputer.metric == "nan_euclidean"
+        assert imputer._valid_mask.all()  # no column was fully missing at fit time
+
+        self.columns: list[str] = columns
+        self.threshold: float | None = threshold
+        self.n_neighbors: int = imputer.n_neighbors
+        self.fit_X: ndarray = asarray(imputer._fit_X, dtype=float64)
+        self.mask_fit_X: ndarray = asarray(imputer._mask_fit_X)
+        self.col_means: ndarray = asarray(  # same as the masked mean sklearn falls back to
+            [
+                where(self.mask_fit_X[:, col], 0, self.fit_X[:, col]).sum()
+                / (~self.mask_fit_X[:, col]).sum()
+                for col in range(self.fit_X.shape[1])
+            ]
+        )
+
+    @property
+    def width(self) -> int:
+        return len(self.columns)
+
+    @property
+    def feature_columns(self) -> list[str]:
+        """Input column every output feature is computed from."""
+        return self.columns
+
+    def __remove_outliers(self, data: DataFrame, row_wise: bool) -> ndarray:
+        """Mirrors `remove_outliers`, including the pandas NA semantics of nullable columns.
+
+        With `row_wise` every row gets its own quartiles, as if it were scored on its own.
+        """
+        X: ndarray = data.to_numpy(dtype=float64, na_value=nan)
+        if self.threshold is None:
+            return X
+
+        if row_wise:
+            Q1, Q3 = X, X
+        else:
+            with catch_warnings():
+                simplefilter("ignore", RuntimeWarning)  # all-NaN column, pandas returns NaN
+                Q1, Q3 = nanquantile(X, 0.25, axis=0), nanquantile(X, 0.75, axis=0)
+        IQR: ndarray = Q3 - Q1
+        inside: ndarray = ((Q1 - self.threshold * IQR) <= X) & ((Q3 + self.threshold * IQR) >= X)
+        # nullable (Int64) columns propagate NA through the comparison and `all` skips it
+        nullable: ndarray = asarray([is_extension_array_dtype(dtype) for dtype in data.dtypes])
+        inside |= isnan(X) & nullable
+        X[~inside.all(axis=1)] = nan
+        return X
+
+    def __nan_euclidean(self, X: ndarray) -> ndarray:
+        """Same operation order as sklearn's `nan_euclidean_distances` for bitwise parity."""
+        Y: ndarray = self.fit_X.copy()
+        missing_X: ndarray = isnan(X)
+        missing_Y: ndarray = self.mask_fit_X
+        X = where(missing_X, 0, X)
+        Y[missing_Y] = 0
+
+        distances: ndarray = -2 * dot(X, Y.T)
+        distances += einsum("ij,ij->i", X, X)[:, None]
+        distances += einsum("ij,ij->i", Y, Y)[None, :]
+        maximum(distances, 0, out=distances)
+        distances -= dot(X * X, missing_Y.T)
+        distances -= dot(missing_X, (Y * Y).T)
+        clip(distances, 0, None, out=distances)
+
+        present_count: ndarray = dot(1 - missing_X, (~missing_Y).T)
+        distances[present_count == 0] = nan
+        present_count = maximum(1, present_count)
+        distances /= present_count
+        distances *= X.shape[1]
+        sqrt(distances, out=distances)
+        return distances
+
+    def __impute(self, X: ndarray) -> ndarray:
+        """Mirrors `KNNImputer.transform` with uniform weights."""
+        mask: ndarray = isnan(X)
+        row_missing_idx: ndarray = flatnonzero(mask.any(axis=1))
+        for start in range(0, len(row_missing_idx), self.DISTANCE_CHUNK_SIZE):
+            chunk_idx: ndarray = row_missing_idx[start : start + self.DISTANCE_CHUNK_SIZE]
+            distances: ndarray = self.__nan_euclidean(X[chunk_idx])
+            chunk_mask: ndarray = mask[chunk_idx]
+            for col in range(X.shape[1]):
+                receivers: ndarray = flatnonzero(chunk_mask[:, col])
+                if not receivers.size:
+                    continue
+                donors_idx: ndarray = flatnonzero(~self.mask_fit_X[:, col])
+                dist: ndarray = distances[receivers][:, donors_idx]
+
+                all_nan: ndarray = isnan(dist).all(axis=1)
+                X[chunk_idx[receivers[all_nan]], col] = self.col_means[col]
+                receivers, dist = receivers[~all_nan], dist[~all_nan]
+                if not receivers.size:
+                    continue
+
+                n_neighbors: int = min(self.n_neighbors, len(donors_idx))
+                nearest: ndarray = argpartition(dist, n_neighbors - 1, axis=1)[:, :n_neighbors]
+                nearest_dist: ndarray = dist[arange(nearest.shape[0])[:, None], nearest]
+                weights: ndarray = ones_like(nearest_dist)
+                weights[isnan(nearest_dist)] = 0.0
+                donors: ndarray = self.fit_X[donors_idx, col].take(nearest)
+                X[chunk_idx[receivers], col] = (donors * weights).sum(axis=1) / weights.sum(axis=1)
+        return X
+
+    def transform(self, data: DataFrame, row_wise: bool = False) -> ndarray:
+        return self.__impute(self.__remove_outliers(data[self.columns], row_wise))
+
+
+class _CategoricalBranch:
+    """Category cleaning, most-frequent imputation and one-hot or ordinal encoding."""
+
+    UNKNOWN_CATEGORIES: ClassVar[str] = "Found unknown categories {} in column {} during transform"
+
+    def __init__(
+        self,
+        columns: list[str],
+        allowed: dict[str, list],
+        imputer: SimpleImputer,
+        encoder: OneHotEncoder | OrdinalEncoder,
+    ):
+        assert imputer.strategy in ("most_frequent", "constant")
+        assert encoder.handle_unknown == "error"
+
+        self.columns: list[str] = columns
+        self.allowed: list[list | None] = [allowed.get(col) for col in columns]
+        self.categories: list[ndarray] = list(encoder.categories_)
+        self.fill_codes: list[int] = [
+            list(categories).index(statistic)
+            for categories, statistic in zip(self.categories, imputer.statistics_, strict=True)
+        ]
+        self.one_hot: bool = isinstance(encoder, OneHotEncoder)
+        self.drop_idx: list[int | None] = (
+            [None] * len(columns)
+            if not self.one_hot or encoder.drop_idx_ is None
+            else [None if idx is None else int(idx) for idx in encoder.drop_idx_]
+        )
+
+    @property
+    def width(self) -> int:
+        if not self.one_hot:
+            return len(self.columns)
+        return sum(
+            len(categories) - (drop is not None)
+            for categories, drop in zip(self.categories, self.drop_idx, strict=True)
+        )
+
+    @property
+    def feature_columns(self) -> list[str]:
+        """Input column every output feature is computed from, one per one-hot category."""
+        if not self.one_hot:
+            return self.columns
+        return [
+            name
+            for name, categories, drop in zip(
+                self.columns, self.categories, self.drop_idx, strict=True
+            )
+            for _ in range(len(categories) - (drop is not None))
+        ]
+
+    def __encode(self, values: Series, col: int) -> ndarray:
+        missing: ndarray = values.isna().to_numpy()
+        if self.allowed[col] is not None:
+            missing |= ~values.isin(self.allowed[col]).to_numpy()
+        codes: ndarray = Categorical(values, categories=self.categories[col]).codes.astype(intp)
+        unknown: ndarray = (codes == -1) & ~missing
+        if unknown.any():
+            raise ValueError(
+                self.UNKNOWN_CATEGORIES.format(values[unknown].unique().tolist(), self.columns[col])
+            )
+        codes[missing] = self.fill_codes[col]
+        return codes
+
+    def transform(self, data: DataFrame, row_wise: bool = False) -> ndarray:
+        output: ndarray = zeros((len(data), self.width), dtype=float64)
+        offset: int = 0
+        for col, name in enumerate(self.columns):
+            codes: ndarray = self.__encode(data[name], col)
+            if not self.one_hot:
+                output[:, offset] = codes
+                offset += 1
+                continue
+
+            drop: int | None = self.drop_idx[col]
+            width: int = len(self.categories[col]) - (drop is not None)
+            kept: ndarray = arange(len(codes)) if drop is None else flatnonzero(codes != drop)
+            positions: ndarray = codes[kept] if drop is None else codes[kept] - (codes[kept] > drop)
+            output[kept, offset + positions] = 1.0
+            offset += width
+        return output
+
+
+class ScoringPlan:
+    """Pure NumPy replica of the fitted credit classification pipeline.
+
+    The plan is compiled once from the fitted `ImbPipeline` (encoder vocabularies, imputer
+    state and the LogisticRegression coefficients) and scores a batch with a few vectorized
+    operations instead of walking the sklearn object graph.
+    """
+
+    UNSUPPORTED_STEP: ClassVar[str] = "Cannot compile pipeline step: {}"
+
+    def __init__(self, model: ImbPipeline):
+        """Compiles the fitted pipeline.
+
+        Args:
+            model (ImbPipeline): Fitted preprocessor + LogisticRegression pipeline.
+
+        Raises:
+            TypeError: If the pipeline contains a step the plan does not know how to replicate.
+        """
+        preprocessor: Any = model.named_steps.get("preprocessor")
+        classifier: Any = model.steps[-1][1]
+        if not isinstance(preprocessor, ColumnTransformer):
+            raise TypeError(self.UNSUPPORTED_STEP.format(preprocessor))
+        if not isinstance(classifier, LogisticRegression) or len(classifier.classes_) != 2:  # noqa: PLR2004
+            raise TypeError(self.UNSUPPORTED_STEP.format(classifier))
+
+        compiled: list[tuple[str, _NumericBranch | _CategoricalBranch]] = [
+            (name, self.__compile_branch(transformer, list(columns)))
+            for name, transformer, columns in preprocessor.transformers_
+            if name != "remainder" and transformer != "drop"
+        ]
+        self.branch_names: list[str] = [name for name, _ in compiled]
+        self.branches: list[_NumericBranch | _CategoricalBranch] = [
+            branch for _, branch in compiled
+        ]
+        self.n_features: int = sum(branch.width for branch in self.branches)
+        self.feature_columns: list[str] = [
+            name for branch in self.branches for name in branch.feature_columns
+        ]
+        self.coef: ndarray = classifier.coef_.T.copy()
+        self.intercept: ndarray = classifier.intercept_.copy()
+        self.classes: ndarray = classifier.classes_.copy()
+        assert self.coef.shape[0] == self.n_features
+
+    def __compile_branch(
+        self, transformer: Any, columns: list[str]
+    ) -> _NumericBranch | _CategoricalBranch:
+        steps: list[Any] = (
+            [step for _, step in transformer.steps]
+            if isinstance(transformer, Pipeline)
+            else [transformer]
+        )
+        threshold: float | None = None
+        allowed: dict[str, list] = {}
+        while steps and isinstance(steps[0], FunctionTransformer):
+            function: FunctionTransformer = steps.pop(0)
+            kw_args: dict[str, Any] = function.kw_args or {}
+            if function.func.__name__ == "remove_outliers":
+                threshold = kw_args.get("threshold", 1.5)
+            elif function.func.__name__ == "clean_features" and kw_args.get("expected", True):
+                allowed = kw_args["values"]
+            else:
+                raise TypeError(self.UNSUPPORTED_STEP.format(function))
+
+        match steps:
+            case [KNNImputer() as imputer] if not allowed:
+                return _NumericBranch(columns, threshold, imputer)
+            case [SimpleImputer() as imputer, OneHotEncoder() | OrdinalEncoder() as encoder] if (
+                threshold is None
+            ):
+                return _CategoricalBranch(columns, allowed, imputer, encoder)
+        raise TypeError(self.UNSUPPORTED_STEP.format(transformer))
+
+    def transform(self, data: DataFrame, row_wise: bool = False) -> ndarray:
+        """Builds the model input matrix, equivalent to the fitted preprocessor output.
+
+        Args:
+            data (DataFrame): Batch with the columns the model expects.
+            row_wise (bool, optional): If True, every row is transformed as if it were the only
+                row of its batch. The fitted pipeline computes outlier bounds over the whole
+                batch, so this is what scoring the rows one by one would give.
+                Defaults to False.
+
+        Returns:
+            ndarray: The model input matrix.
+        """
+        X: ndarray = empty((len(data), self.n_features), dtype=float64)
+        offset: int = 0
+        for name, branch in zip(self.branch_names, self.branches, strict=True):
+            with METRICS.timed(f"ScoringPlan.{name}", len(data)):
+                X[:, offset : offset + branch.width] = branch.transform(data, row_wise)
+            offset += branch.width
+        return X
+
+    def decision_function(self, data: DataFrame, row_wise: bool = False) -> ndarray:
+        """Signed distance to the LogisticRegression decision boundary for every row."""
+        X: ndarray = self.transform(data, row_wise)
+        with METRICS.timed("ScoringPlan.model", len(X)):
+            scores: ndarray = dot(X, self.coef) + self.intercept
+        return scores.ravel()
+
+    def predict_proba(self, data: DataFrame, row_wise: bool = False) -> ndarray:
+        """Probability of `classes[1]` for every row, same as `model.predict_proba[:, 1]`."""
+        probabilities: ndarray = expit(self.decision_function(data, row_wise))
+        return probabilities
+
+    def predict(self, data: DataFrame, row_wise: bool = False) -> ndarray:
+        """Predicted class for every row, same labels as `model.predict`."""
+        labels: ndarray = self.classes[(self.decision_function(data, row_wise) > 0).astype(int)]
+        return labels
+
+
+def check_parity(model: ImbPipeline, plan: ScoringPlan, data: DataFrame) -> int:
+    """Counts the rows where the compiled plan disagrees with the fitted pipeline.
+
+    Args:
+        model (ImbPipeline): The fitted pipeline the plan was compiled from.
+        plan (ScoringPlan): The compiled plan.
+        data (DataFrame): Batch to score with both, with the columns the model expects.
+
+    Returns:
+        int: Number of mismatching predictions, 0 when both paths agree.
+    """
+    return int((model.predict(data) != plan.predict(data)).sum())
+
+
+if __name__ == "__main__":
+    from joblib import load
+    from pandas import read_csv
+
+    from src.service.prediction_service import PredictionService
+    from src.service.preprocessing_service import PreprocessingService
+    from src.service.transformations import (
+        clean_features,  # noqa
+        get_features_names,  # noqa
+        remove_outliers,  # noqa
+    )
+
+    MODEL_PATH: str = r"models/credit_classification-logistic_regression-v2.joblib"
+    DATA_PATH: str = r"data/raw_german_credit_data.csv"
+
+    fitted: ImbPipeline = load(MODEL_PATH)
+    compiled: ScoringPlan = ScoringPlan(fitted)
+    batch: DataFrame = PreprocessingService().execute(read_csv(DATA_PATH))[
+        PredictionService.EXPECTED_COLUMNS
+    ]
+    mismatches: int = check_parity(fitted, compiled, batch)
+    print(f"parity check: {mismatches} mismatches over {len(batch)} rows")
+    if mismatches:
+        raise SystemExit(1)
@@ -0,0 +1,74 @@
+from typing import TypeVar
+
+from numpy import float64, ndarray
+from pandas import DataFrame, Series, to_numeric
+from pandas.api.types import is_numeric_dtype
+from pandas.util import hash_pandas_object
+from pyarrow import Table, array
+
+from src.service.arrow_preprocessing_service import ArrowPreprocessingService
+
+Chunk = TypeVar("Chunk", DataFrame, Table)
+
+
+class SeenRows:
+    """Drops the rows of a file already seen in its earlier chunks, before they are scored.
+
+    Preprocessing only deduplicates the chunk it receives, so a file read chunk by chunk
+    would keep the duplicates spread across chunks. Rows are identified by DUPLICATES_KEY, or
+    by all their values without it, like preprocessing identifies them. Only a 64-bit hash of
+    every distinct row is kept, so one instance per file is enough for any file size.
+    """
+
+    DUPLICATES_KEY: str = ArrowPreprocessingService.DUPLICATES_KEY
+
+    def __init__(self) -> None:
+        self.__seen: set[int] = set()
+
+    @staticmethod
+    def __canonical(column: Series) -> Series:
+        """Gives equal values equal hashes whatever dtype the chunk was parsed with.
+
+        pandas types every chunk on its own, so 1000 can be an int in one chunk, a float or
+        the text "1000" in another. Arrow chunks are all text and hashed as they are.
+        """
+        numbers: Series = (
+            column.astype(float64)
+            if is_numeric_dtype(column.dtype)
+            else to_numeric(column, errors="coerce")
+        )
+        # object either way, pandas hashes floats in an object column by their text
+        return numbers.astype(object).where(numbers.notna(), column.astype(object))
+
+    def __hashes(self, chunk: DataFrame | Table) -> ndarray:
+        columns: list[str] = (
+            chunk.column_names if isinstance(chunk, Table) else chunk.columns.tolist()
+        )
+        keys: list[str] = [self.DUPLICATES_KEY] if self.DUPLICATES_KEY in columns else columns
+        rows: DataFrame = (
+            chunk.select(keys).to_pandas()
+            if isinstance(chunk, Table)
+            else DataFrame({key: self.__canonical(chunk[key]) for key in keys})
+        )
+        hashes: ndarray = hash_pandas_object(rows, index=False).to_numpy()
+        return hashes
+
+    def drop(self, chunk: Chunk) -> Chunk:
+        """Drops the rows of `chunk` seen before, and remembers the others.
+
+        Duplicates within the chunk are left to preprocessing.
+
+        Args:
+            chunk (DataFrame | Table): The next chunk of the file.
+
+        Returns:
+            DataFrame | Table: The chunk without the rows of earlier chunks.
+        """
+        hashes: list[int] = self.__hashes(chunk).tolist()
+        unseen: list[bool] = [key not in self.__seen for key in hashes]
+        self.__seen.update(hashes)
+        if all(unseen):
+            return chunk
+        if isinstance(chunk, Table):
+            return chunk.filter(array(unseen))
+        return chunk[unseen].copy()  # preprocessing dedups its input inplace
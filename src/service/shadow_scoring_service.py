@@ -0,0 +1,220 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+from typing import Any
+
+from numpy import count_nonzero, ndarray
+from pandas import DataFrame
+
+from src.service.base_service import BaseService
+from src.service.model_registry import ModelRegistry
+from src.service.prediction_service import PredictionService
+
+ShadowScores = tuple[ndarray, float]  # scores of a model and the seconds they took
+
+
+class ShadowReport:
+    """How a candidate model compares with the served one over a batch.
+
+    Chunks are compared as their candidate scores come in, possibly after the batch result
+    has been shown, so the report fills in over time: `pending` chunks are still being scored
+    and `skipped` rows were not shadowed because the candidate fell too far behind. A report
+    merged into another keeps it up to date with the chunks it was still waiting for.
+    """
+
+    def __init__(self, threshold: float = PredictionService.DEFAULT_THRESHOLD):
+        """Initializes an empty report.
+
+        Args:
+            threshold (float, optional): Score above which both models approve a request.
+                Defaults to PredictionService.DEFAULT_THRESHOLD.
+        """
+        self.threshold: float = threshold
+        self.rows: int = 0
+        self.agreed: int = 0
+        self.served_approved: int = 0
+        self.candidate_approved: int = 0
+        self.served_seconds: float = 0.0
+        self.candidate_seconds: float = 0.0
+        self.pending: int = 0
+        self.skipped: int = 0
+        self.error: Exception | None = None
+        self.__lock: Lock = Lock()
+        self.__merged_into: list[ShadowReport] = []  # reports told about later updates
+
+    def expect(self) -> None:
+        with self.__lock:
+            self.pending += 1
+            for report in self.__merged_into:
+                report.expect()
+
+    def skip(self, rows: int) -> None:
+        with self.__lock:
+            self.skipped += rows
+            for report in self.__merged_into:
+                report.skip(rows)
+
+    def add(self, served: ShadowScores, candidate: ShadowScores) -> None:
+        """Compares the labels both models give to the rows of one chunk.
+
+        Args:
+            served (ShadowScores): Scores of the served model and the seconds they took.
+            candidate (ShadowScores): Scores of the candidate and the seconds they took.
+        """
+        served_labels: ndarray = PredictionService.label(served[0], self.threshold)
+        candidate_labels: ndarray = PredictionService.label(candidate[0], self.threshold)
+        with self.__lock:
+            self.pending -= 1
+            self.rows += len(served_labels)
+            self.agreed += int(count_nonzero(served_labels == candidate_labels))
+            self.served_approved += int(count_nonzero(served_labels))
+            self.candidate_approved += int(count_nonzero(candidate_labels))
+            self.served_seconds += served[1]
+            self.candidate_seconds += candidate[1]
+            for report in self.__merged_into:
+                report.add(served, candidate)
+
+    def fail(self, error: Exception) -> None:
+        with self.__lock:
+            self.pending -= 1
+            self.error = error
+            for report in self.__merged_into:
+                report.fail(error)
+
+    def merge(self, other: "ShadowReport") -> "ShadowReport":
+        """Adds the comparisons of another report, and those it records from now on.
+
+        Args:
+            other (ShadowReport): Report of other chunks of the same batch.
+
+        Returns:
+            ShadowReport: This report, updated.
+        """
+        with other.__lock, self.__lock:  # nothing recorded between the sums and the forwarding
+            self.rows += other.rows
+            self.agreed += other.agreed
+            self.served_approved += other.served_approved
+            self.candidate_approved += other.candidate_approved
+            self.served_seconds += other.served_seconds
+            self.candidate_seconds += other.candidate_seconds
+            self.pending += other.pending
+            self.skipped += other.skipped
+            self.error = self.error or other.error
+            other.__merged_into.append(self)
+        return self
+
+    @property
+    def finished(self) -> bool:
+        return not self.pending
+
+    @property
+    def agreement_rate(self) -> float:
+        """Percentage of shadowed requests both models label alike."""
+        assert self.rows, "No rows have been shadowed"
+        return self.agreed / self.rows * 100
+
+    @property
+    def approval_rate_change(self) -> float:
+        """Approval rate of the candidate minus the served one, in percentage points."""
+        assert self.rows, "No rows have been shadowed"
+        return (self.candidate_approved - self.served_approved) / self.rows * 100
+
+    @property
+    def extra_latency(self) -> float:
+        """Seconds the candidate took beyond the served model, had it been served instead."""
+        return self.candidate_seconds - self.served_seconds
+
+
+class ShadowScoringService(BaseService):
+    """Scores a candidate model over the batches the served model scores, off the hot path.
+
+    `execute` hands the preprocessed frame to a small thread pool and returns at once, so the
+    candidate scores while the served batch is labelled, explained and written out, and
+    `compare` records the agreement once the candidate is done without waiting for it. At
+    most `max_pending` frames wait for the candidate: past that, frames are skipped rather
+    than queued, bounding both the memory held for the shadow and the CPU it takes from the
+    served batches.
+    """
+
+    def __init__(
+        self,
+        candidate: PredictionService | ModelRegistry,
+        max_workers: int = 1,
+        max_pending: int = 2,
+    ):
+        """Initializes the service and its pool.
+
+        Args:
+            candidate (PredictionService | ModelRegistry): The model being evaluated.
+            max_workers (int, optional): Frames scored by the candidate at the same time.
+                Defaults to 1.
+            max_pending (int, optional): Frames queued or being scored by the candidate.
+                Defaults to 2.
+        """
+        assert max_workers > 0
+        assert max_pending >= max_workers
+
+        self.candidate: PredictionService | ModelRegistry = candidate
+        self.__pool: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="shadow-scoring"
+        )
+        self.__max_pending: int = max_pending
+        self.__pending: int = 0
+        self.__lock: Lock = Lock()
+
+    def __score(self, data: DataFrame) -> ShadowScores:
+        try:
+            start: float = perf_counter()
+            scores: ndarray = self.candidate.execute_scores(data)
+            return scores, perf_counter() - start
+        finally:
+            with self.__lock:
+                self.__pending -= 1
+
+    # @override
+    def execute(self, data: dict[str, Any] | DataFrame) -> Future[ShadowScores] | None:
+        """Starts scoring a preprocessed frame with the candidate.
+
+        Args:
+            data: DataFrame of preprocessed requests, it must not be modified until the
+                candidate is done with it
+
+        Returns:
+            Future[ShadowScores] | None: The candidate scores and the seconds they took, None
+                if the candidate is too far behind and the frame is skipped.
+        """
+        assert isinstance(data, DataFrame)
+
+        with self.__lock:
+            if self.__pending >= self.__max_pending:
+                return None
+            self.__pending += 1
+        future: Future[ShadowScores] = self.__pool.submit(self.__score, data)
+        return future
+
+    @staticmethod
+    def compare(
+        future: Future[ShadowScores] | None,
+        served: ShadowScores,
+        report: ShadowReport,
+    ) -> None:
+        """Records the comparison of a frame in `report` once the candidate is done with it.
+
+        Args:
+            future (Future[ShadowScores] | None): What `execute` returned for the frame.
+            served (ShadowScores): Scores of the served model and the seconds they took.
+            report (ShadowReport): Report of the batch the frame belongs to.
+        """
+        if future is None:
+            report.skip(len(served[0]))
+            return
+
+        def record(done: Future[ShadowScores]) -> None:
+            error: BaseException | None = done.exception()
+            if error is None:
+                report.add(served, done.result())
+            else:
+                report.fail(error if isinstance(error, Exception) else Exception(error))
+
+        report.expect()
+        future.add_done_callback(record)
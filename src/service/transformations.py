@@ -1,8 +1,12 @@
 from collections.abc import Callable
-from typing import Any
+from typing import Any, ClassVar
+from warnings import catch_warnings, simplefilter
 
-from numpy import nan, ndarray
+from numpy import asarray, empty, flatnonzero, isnan, nan, ndarray, ones, unique, where, zeros
 from pandas import DataFrame
+from sklearn.impute import KNNImputer
+from sklearn.neighbors import KDTree
+from sklearn.utils.validation import FLOAT_DTYPES, check_is_fitted, validate_data
 
 
 def get_features_names(_: Any, feature_names: ndarray) -> ndarray:
@@ -61,3 +65,155 @@ def remove_outliers(input_data: DataFrame, threshold: float = 1.5) -> DataFrame:
     ).all(axis=1)
     temp_df.loc[mask] = nan
     return temp_df
+
+
+class IndexedKNNImputer(KNNImputer):
+    """KNNImputer answering the neighbour queries through KD-trees over the fitted data.
+
+    `KNNImputer.transform` computes the distance from every incomplete row to every fitted
+    row. Here a KD-tree is built once per imputed column and set of observed columns, over
+    the fitted rows usable as donors, and every distinct incomplete row is queried once.
+
+    Imputed values are the ones KNNImputer gives: when the k-th and (k+1)-th nearest donors
+    are tied, the donors KNNImputer keeps depend on the order `argpartition` leaves them in,
+    so those rows (and rows whose donors miss some of their observed columns) are imputed by
+    `KNNImputer.transform` itself. Only the defaults, uniform weights over the nan_euclidean
+    metric without missing indicators, are indexed; any other setting falls back entirely.
+    """
+
+    TIE_TOLERANCE: ClassVar[float] = 1e-12  # relative to the squared norms, see nan_euclidean
+
+    @classmethod
+    def from_imputer(cls, imputer: KNNImputer) -> "IndexedKNNImputer":
+        """Indexes an already fitted KNNImputer, e.g. the one inside a loaded pipeline.
+
+        Args:
+            imputer (KNNImputer): Fitted imputer.
+
+        Returns:
+            IndexedKNNImputer: Imputer with the same parameters and fitted data.
+        """
+        check_is_fitted(imputer)
+        indexed: IndexedKNNImputer = cls(**imputer.get_params())
+        indexed.__dict__.update(imputer.__dict__)
+        indexed.__trees = {}
+        return indexed
+
+    def fit(self, X: Any, y: Any = None) -> "IndexedKNNImputer":
+        super().fit(X, y)
+        self.__trees: dict[tuple[int, tuple[int, ...]], tuple[KDTree, ndarray, float] | None] = {}
+        return self
+
+    def __indexable(self) -> bool:
+        return (
+            self.weights == "uniform"
+            and self.metric == "nan_euclidean"
+            and not self.add_indicator
+            and bool(self._valid_mask.all())
+            and isinstance(self.missing_values, float)
+            and isnan(self.missing_values)
+        )
+
+    def __tree(self, col: int, observed: ndarray) -> tuple[KDTree, ndarray, float] | None:
+        """KD-tree over the donors of `col` observing every column in `observed`.
+
+        Returns:
+            tuple[KDTree, ndarray, float] | None: The tree, the donor values and the largest
+                squared norm of the donors, or None if the index cannot reproduce KNNImputer:
+                fewer than k donors, or donors whose distance is measured over fewer columns.
+        """
+        key: tuple[int, tuple[int, ...]] = (col, tuple(observed.tolist()))
+        if key not in self.__trees:
+            present: ndarray = ~self._mask_fit_X[:, observed]
+            donors: ndarray = ~self._mask_fit_X[:, col]
+            complete: ndarray = donors & present.all(axis=1)
+            partial: ndarray = donors & present.any(axis=1) & ~complete
+            if partial.any() or complete.sum() < self.n_neighbors:
+                self.__trees[key] = None
+            else:
+                points: ndarray = self._fit_X[complete][:, observed]
+                self.__trees[key] = (
+                    KDTree(points),
+                    self._fit_X[complete, col],
+                    float((points**2).sum(axis=1).max()),
+                )
+        return self.__trees[key]
+
+    def __query(self, col: int, observed: ndarray, points: ndarray) -> tuple[ndarray, ndarray]:
+        """Imputes `col` for distinct points through the index.
+
+        Returns:
+            tuple[ndarray, ndarray]: The imputed values and a mask of the points whose nearest
+                donors are tied, which the index cannot impute like KNNImputer.
+        """
+        index: tuple[KDTree, ndarray, float] | None = self.__tree(col, observed)
+        if index is None:
+            return empty(len(points)), ones(len(points), dtype=bool)
+        tree, values, max_norm = index
+        k: int = self.n_neighbors
+        distances, neighbours = tree.query(points, k=min(k + 1, len(values)))
+        imputed: ndarray = values[neighbours[:, :k]].sum(axis=1) / k
+        if distances.shape[1] == k:
+            return imputed, zeros(len(points), dtype=bool)
+        squared: ndarray = distances**2
+        tolerance: ndarray = self.TIE_TOLERANCE * ((points**2).sum(axis=1) + max_norm)
+        return imputed, squared[:, k] - squared[:, k - 1] <= tolerance
+
+    def transform(self, X: Any) -> ndarray:
+        """Impute all missing values in X, with the same values as `KNNImputer.transform`.
+
+        Args:
+            X (Any): The input data to complete.
+
+        Returns:
+            ndarray: The imputed dataset.
+        """
+        if not self.__indexable():
+            transformed: ndarray = super().transform(X)
+            return transformed
+        check_is_fitted(self)
+        X = validate_data(
+            self,
+            X,
+            accept_sparse=False,
+            dtype=FLOAT_DTYPES,
+            force_writeable=True,
+            ensure_all_finite="allow-nan",
+            copy=self.copy,
+            reset=False,
+        )
+        mask: ndarray = isnan(X)
+        rows: ndarray = flatnonzero(mask.any(axis=1))
+        if not rows.size:
+            return asarray(X)
+
+        patterns, groups = unique(mask[rows], axis=0, return_inverse=True)
+        for group, pattern in enumerate(patterns):
+            receivers: ndarray = rows[groups.reshape(-1) == group]
+            observed: ndarray = flatnonzero(~pattern)
+            missing: ndarray = flatnonzero(pattern)
+            if not observed.size:  # no distance to any donor, KNNImputer uses the mean
+                for col in missing:
+                    X[receivers, col] = (
+                        where(self._mask_fit_X[:, col], 0, self._fit_X[:, col]).sum()
+                        / (~self._mask_fit_X[:, col]).sum()
+                    )
+                continue
+
+            # receivers observing the same values share their donors
+            points, first, inverse = unique(
+                X[receivers][:, observed], axis=0, return_index=True, return_inverse=True
+            )
+            inverse = inverse.reshape(-1)
+            imputed: ndarray = empty((len(points), len(missing)), dtype=X.dtype)
+            fallback: ndarray = zeros(len(points), dtype=bool)
+            for position, col in enumerate(missing):
+                imputed[:, position], tied = self.__query(col, observed, points)
+                fallback |= tied
+            if fallback.any():
+                with catch_warnings():
+                    simplefilter("ignore", UserWarning)  # fitted with feature names
+                    exact: ndarray = asarray(super().transform(X[receivers[first[fallback]]]))
+                imputed[fallback] = exact[:, missing]
+            X[receivers[:, None], missing] = imputed[inverse]
+        return asarray(X)
@@ -1,11 +1,14 @@
-from collections.abc import Callable
-from typing import Any
+from argparse import ArgumentParser, Namespace
+from collections.abc import Iterator
+from contextlib import contextmanager
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import perf_counter
 
 from imblearn.pipeline import Pipeline as ImbPipeline
 from imblearn.under_sampling import RandomUnderSampler
-from joblib import dump
-from numpy import nan, ndarray
-from pandas import Categorical, DataFrame, Series, read_csv
+from joblib import Memory, dump
+from pandas import DataFrame, Series
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import KNNImputer, SimpleImputer
 from sklearn.linear_model import LogisticRegression
@@ -14,129 +17,47 @@ from sklearn.model_selection import GridSearchCV, train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, OrdinalEncoder
 
+from src.prepare_training_data import RAW_DATA_PATH, SNAPSHOTS_DIR, load_snapshot
 
-def get_features_names(_: Any, feature_names: ndarray) -> ndarray:
-    """
-    Returns the provided feature names.
-
-    Args:
-        _ (Any): Placeholder argument, not used.
-        feature_names (ndarray): Array of feature names.
+# imported rather than defined here so the fitted steps can be hashed by the preprocessing cache
+# inside the search workers, which cannot import functions from this script's __main__
+from src.service.transformations import clean_features, get_features_names, remove_outliers
 
-    Returns:
-        ndarray: The input array of feature names.
-    """
-    return feature_names
-
-
-def clean_features(X: DataFrame, values: dict[str, list], expected: bool = True) -> DataFrame:
-    """
-    Cleans the input DataFrame by filtering values in specific categorical columns.
+phase_times: dict[str, float] = {}
 
-    If `expected` is True, it keeps only the expected values defined in the `values` dict.
-    If `expected` is False, it removes the values defined in `values`.
 
-    Args:
-        X (DataFrame): Input DataFrame to be cleaned.
-        values (dict[str, list[str]] | None, optional):
-            Dictionary mapping column names to lists of allowed (or disallowed) values.
-            If None and `expected` is True, a default dictionary is used. Defaults to None.
-        expected (bool, optional):
-            If True, keeps only the expected values in each column.
-            If False, removes those values. Defaults to True.
-
-    Returns:
-        DataFrame: The cleaned DataFrame with filtered categorical values.
+@contextmanager
+def phase(name: str) -> Iterator[None]:
     """
-    assert isinstance(X, DataFrame)
-    assert isinstance(values, dict) or values is None
-
-    categories_to_review: list[str] = list(set(X.columns).intersection(set(values.keys())))
-    if len(categories_to_review) == 0:
-        return X
-
-    X[categories_to_review] = (
-        X[categories_to_review].apply(lambda x: x.where(x.isin(values[x.name])))
-        if expected
-        else X[categories_to_review].apply(lambda x: x.where(~x.isin(values[x.name])))
-    )
-    return X
+    Measures the wall time of a training phase and prints it once the phase ends.
 
-
-def remove_outliers(X: DataFrame, threshold: float = 1.5) -> DataFrame:
-    """
-    Replace outliers from numeric columns given a certain treshold with NAN.
     Args:
-        threshold (float, optional): Treshold for removing minor (1.5) or extreme outliers (3.0).
-        Defaults to 1.5.
+        name (str): Name the phase is reported under.
     """
-    MIN_OUTLIER_THRESHOLD: float = 1.5
-    MAX_OUTLIER_THRESHOLD: float = 3.0
-
-    assert isinstance(X, DataFrame)
-    assert MIN_OUTLIER_THRESHOLD <= threshold <= MAX_OUTLIER_THRESHOLD
-    Q1, Q3 = X.quantile(0.25), X.quantile(0.75)
-    IQR: float = Q3 - Q1
-    mask: Callable = ~(((Q1 - threshold * IQR) <= X) & ((Q3 + threshold * IQR) >= X)).all(axis=1)
-    X.loc[mask] = nan
-    return X
-
-
-DATA_URL: str = "https://github.com/JoseRZapata/Data_analysis_notebooks/raw/refs/heads/main/data/datasets/datos_credito_alemania_data.csv"
-data: DataFrame = read_csv(DATA_URL, low_memory=False)
-
-selected_features = [
-    "Credit amount",
-    "Purpose",
-    "Job",
-    "Sex",
-    "Saving accounts",
-    "Housing",
-    "Risk",
-    "Age",
-    "Duration",
-    "Unnamed: 0",  # this column contains indexes for duplicated data
-]
-
-dataset: DataFrame = data[selected_features]
-
-dataset = dataset.drop_duplicates(subset=["Unnamed: 0"])
-
-dataset = dataset.drop(columns=["Unnamed: 0"])
-
-categorical_cols = {
-    "Purpose": None,
-    "Job": [0, 1, 2, 3],
-    "Sex": None,
-    "Saving accounts": ["little", "quite rich", "rich"],
-    "Housing": None,
-    "Risk": ["good", "bad"],
-}
-
-dataset[list(categorical_cols.keys())] = dataset[list(categorical_cols.keys())].astype("category")
-
-for col, categories in categorical_cols.items():
-    if categories:
-        dataset[col] = Categorical(dataset[col], categories=categories, ordered=True)
-
-
-numeric_cols = {
-    "Duration": "Int64",  # has to be base 64 so it can be nullable
-    "Credit amount": "Int64",
-    "Age": "Int64",
-}
-
-checking_df = dataset.copy()
-for col in numeric_cols:
-    checking_df[col] = checking_df[col].astype(str)  # convert to string temporarily for checking
-    mask = ~checking_df[col].str.match(
-        r"^-?\d+\.?\d*$", na=True
-    )  # detecting weird values inside numerical columns
-    print(f"Invalid values found for column {col}:", dataset[mask][col].unique())
-    dataset.loc[mask, col] = nan
-
-dataset = dataset.astype({col: num_type for col, num_type in numeric_cols.items()})
+    start: float = perf_counter()
+    yield
+    phase_times[name] = perf_counter() - start
+    print(f"[{name}] {phase_times[name]:.2f}s")
+
+
+parser: ArgumentParser = ArgumentParser(description="Train the credit classification model.")
+parser.add_argument("--n-jobs", type=int, default=8, help="grid search workers, -1 uses every core")
+parser.add_argument(
+    "--cache-dir",
+    default=None,
+    help="directory the fitted preprocessing is cached in, a temporary one by default",
+)
+parser.add_argument(
+    "--no-cache", action="store_true", help="refit the preprocessing for every combination"
+)
+parser.add_argument(
+    "--data", default=RAW_DATA_PATH, help="raw CSV file, prepared once into a Parquet snapshot"
+)
+parser.add_argument("--snapshots-dir", default=SNAPSHOTS_DIR)
+args: Namespace = parser.parse_args()
 
+with phase("load snapshot"):
+    dataset: DataFrame = load_snapshot(args.data, args.snapshots_dir)
 
 num_cols = ["Credit amount", "Age"]
 cat_cols = ["Purpose", "Housing", "Sex"]
@@ -225,12 +146,18 @@ preprocessor = ColumnTransformer(
     ]
 )
 
+# Only the model hyperparameters are searched, so the preprocessor and undersampler fitted on
+# a fold are identical for every combination: with a memory they are fitted once per fold and
+# loaded from the cache afterwards. The cache lives on disk, so it is shared by the workers.
+cache_dir: str | None = None if args.no_cache else (args.cache_dir or mkdtemp(prefix="train-"))
+
 data_model_pipeline = ImbPipeline(
     steps=[
         ("preprocessor", preprocessor),
         ("undersampling", RandomUnderSampler(random_state=42)),
         ("model", LogisticRegression(solver="liblinear")),
-    ]
+    ],
+    memory=Memory(cache_dir, verbose=0) if cache_dir else None,
 )
 
 score: str = "precision"
@@ -245,15 +172,26 @@ grid_search = GridSearchCV(
     hyperparams,
     cv=5,
     scoring=score,
-    n_jobs=8,
+    n_jobs=args.n_jobs,
 )
-grid_search.fit(x_train, y_train)
+try:
+    with phase("hyperparameter search"):
+        grid_search.fit(x_train, y_train)
+finally:
+    if cache_dir and not args.cache_dir:
+        rmtree(cache_dir, ignore_errors=True)
 
 best_data_model_pipeline: Pipeline = grid_search.best_estimator_
+best_data_model_pipeline.set_params(memory=None)  # the cache is not shipped with the model
 
-y_pred = best_data_model_pipeline.predict(x_test)
-metric_result = precision_score(y_test, y_pred)
+with phase("evaluation"):
+    y_pred = best_data_model_pipeline.predict(x_test)
+    metric_result = precision_score(y_test, y_pred)
 print(f"evaluation metric: {metric_result}")
+print(
+    "wall time per phase: "
+    + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in phase_times.items())
+)
 
 BASELINE_SCORE = 0.57
 
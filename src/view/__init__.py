@@ -1,21 +1,33 @@
+from src.view.admin.model_version_view import ModelVersionView
 from src.view.base_view import BaseView
+from src.view.batch.decision_threshold_view import DecisionThresholdView
 from src.view.batch.download_predictions_view import DonwloadPredictionsView
+from src.view.batch.feature_drift_view import FeatureDriftView
 from src.view.batch.file_preview_view import FilePreviewView
 from src.view.batch.predictions_preview_view import PredictionsPreviewView
 from src.view.batch.predictions_stats_view import PredictionsStatsView
+from src.view.batch.shadow_scoring_view import ShadowScoringView
+from src.view.batch.stage_metrics_view import StageMetricsView
 from src.view.batch.upload_file_view import UploadFileView
 from src.view.form.credit_request_view import CreditRequestView
 from src.view.form.financial_status_view import FinancialStatusView
 from src.view.form.personal_information_view import PersonalInformationView
+from src.view.form.prediction_explanation_view import PredictionExplanationView
 
 __all__ = [
     "BaseView",
     "CreditRequestView",
+    "DecisionThresholdView",
     "DonwloadPredictionsView",
+    "FeatureDriftView",
     "FilePreviewView",
     "FinancialStatusView",
+    "ModelVersionView",
     "PersonalInformationView",
+    "PredictionExplanationView",
     "PredictionsPreviewView",
     "PredictionsStatsView",
+    "ShadowScoringView",
+    "StageMetricsView",
     "UploadFileView",
 ]
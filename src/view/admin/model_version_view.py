@@ -0,0 +1,33 @@
+from streamlit import button, caption, selectbox, sidebar
+
+from src.view.base_view import BaseView
+
+
+class ModelVersionView(BaseView):
+    def render(self, versions: list[int], active: int | None) -> int | None:
+        """
+        Renders the model versions found in the models directory in the sidebar, with the one
+        serving predictions selected.
+
+        Args:
+            versions (list[int]): Available versions, oldest first.
+            active (int | None): Version serving predictions.
+
+        Returns:
+            int | None: Version to activate, None unless another version was chosen and
+                confirmed.
+        """
+        with sidebar:
+            if not versions:
+                caption("No model versions found.")
+                return None
+            selected: int = selectbox(
+                "Model version",
+                options=versions,
+                index=versions.index(active) if active in versions else len(versions) - 1,
+                help="New artifacts in the models directory show up on the next rerun.",
+            )
+            caption(f"Serving version {active}.")
+            if selected != active and button(f"Activate version {selected}"):
+                return selected
+        return None
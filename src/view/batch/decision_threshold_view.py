@@ -0,0 +1,28 @@
+from streamlit import slider
+
+from src.view.base_view import BaseView
+
+
+class DecisionThresholdView(BaseView):
+    def render(self, threshold: float, key: str) -> float:
+        """
+        Renders the approval cutoff of a scored batch. Moving it relabels the batch from the
+        scores it already has, the model is not run again.
+
+        Args:
+            threshold (float): Cutoff the batch is currently labelled with.
+            key (str): Widget key, one per batch so every batch keeps its own cutoff.
+
+        Returns:
+            float: The selected cutoff.
+        """
+        selected: float = slider(
+            "Approval threshold",
+            min_value=0.0,
+            max_value=1.0,
+            value=threshold,
+            step=0.01,
+            key=key,
+            help="Requests whose approval score is above the threshold are approved.",
+        )
+        return selected
@@ -1,13 +1,130 @@
-from streamlit import download_button
+from collections.abc import Callable, Iterator
+from gzip import GzipFile
+from io import TextIOWrapper
+from shutil import copyfileobj
+from tempfile import SpooledTemporaryFile
+from typing import IO, ClassVar, TextIO, TypeAlias
+
+from pandas import DataFrame, read_csv
+from pyarrow import Schema, Table
+from pyarrow.parquet import ParquetWriter
+from streamlit import button, download_button, fragment, radio
 
 from src.view.base_view import BaseView
 
+Relabel: TypeAlias = Callable[[DataFrame], DataFrame]
+
 
 class DonwloadPredictionsView(BaseView):
-    def render(self, file: str) -> None:
-        download_button(
-            label="Download results as CSV",
-            data=file,
-            file_name="credit_requests_predictions.csv",
-            mime="text/csv",
-        )
+    FORMATS: ClassVar[dict[str, tuple[str, str]]] = {  # label: (extension, mime type)
+        "CSV": ("csv", "text/csv"),
+        "CSV (gzip)": ("csv.gz", "application/gzip"),
+        "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    }
+    FILE_NAME: ClassVar[str] = "credit_requests_predictions"
+    CHUNK_SIZE: ClassVar[int] = 100_000  # rows serialized at a time
+    SPOOL_SIZE: ClassVar[int] = 32 * 1024**2  # bytes kept in memory before spilling to disk
+    WIDENING: ClassVar[list[str]] = ["Int64", "float64", "string"]  # narrowest CSV dtype first
+
+    def __chunks(
+        self, predictions: DataFrame | TextIO, relabel: Relabel | None = None
+    ) -> Iterator[DataFrame]:
+        """
+        Yields the predictions `CHUNK_SIZE` rows at a time. A CSV stream is read twice: once
+        to find the dtype every chunk fits in, then to parse the chunks with those dtypes,
+        which are relabelled by `relabel` if given. Object columns of a DataFrame, which may
+        mix numbers and text, become strings.
+        """
+        if isinstance(predictions, DataFrame):
+            text: list[str] = predictions.select_dtypes(include="object").columns.tolist()
+            predictions = predictions.astype(dict.fromkeys(text, "string"))
+            for start in range(0, len(predictions), self.CHUNK_SIZE):
+                yield predictions.iloc[start : start + self.CHUNK_SIZE]
+            return
+
+        dtypes: dict[str, str] = {}
+        for chunk in read_csv(predictions, chunksize=self.CHUNK_SIZE):
+            for col, dtype in chunk.dtypes.items():
+                kind: str = {"i": "Int64", "u": "Int64", "f": "float64"}.get(dtype.kind, "string")
+                dtypes[str(col)] = max(dtypes.get(str(col), kind), kind, key=self.WIDENING.index)
+        predictions.seek(0)
+        for chunk in read_csv(predictions, chunksize=self.CHUNK_SIZE, dtype=dtypes):
+            yield chunk if relabel is None else relabel(chunk)
+
+    def __write_csv(
+        self, predictions: DataFrame | TextIO, output: IO[bytes], relabel: Relabel | None
+    ) -> None:
+        text: TextIOWrapper = TextIOWrapper(output, encoding="utf-8", newline="")
+        if isinstance(predictions, DataFrame) or relabel is not None:
+            for i, chunk in enumerate(self.__chunks(predictions, relabel)):
+                chunk.to_csv(text, index=False, header=not i)
+        else:
+            copyfileobj(predictions, text)  # already serialized, copied block by block
+        text.flush()
+        text.detach()  # leaves `output` open
+
+    def __write_parquet(
+        self, predictions: DataFrame | TextIO, output: IO[bytes], relabel: Relabel | None
+    ) -> None:
+        writer: ParquetWriter | None = None
+        for chunk in self.__chunks(predictions, relabel):
+            if writer is None:
+                schema: Schema = Schema.from_pandas(chunk, preserve_index=False)
+                writer = ParquetWriter(output, schema)
+            writer.write_table(Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        if writer is not None:
+            writer.close()
+
+    def export(
+        self, predictions: DataFrame | TextIO, file_format: str, relabel: Relabel | None = None
+    ) -> IO[bytes]:
+        """
+        Serializes the predictions chunk by chunk into a temporary file, which stays in
+        memory while small and spills to disk otherwise.
+
+        Args:
+            predictions (DataFrame | TextIO): Labelled rows, or a CSV stream of them.
+            file_format (str): One of the `FORMATS` labels.
+            relabel (Relabel | None, optional): Labels the chunks of a CSV stream again,
+                when the labels it was written with are stale. Defaults to None.
+
+        Returns:
+            IO[bytes]: The serialized predictions, positioned at their start.
+        """
+        assert file_format in self.FORMATS, f"Unknown export format: {file_format}"
+        if not isinstance(predictions, DataFrame):
+            predictions.seek(0)
+
+        output: IO[bytes] = SpooledTemporaryFile(max_size=self.SPOOL_SIZE)  # noqa: SIM115
+        if file_format == "Parquet":
+            self.__write_parquet(predictions, output, relabel)
+        elif file_format == "CSV (gzip)":
+            with GzipFile(fileobj=output, mode="wb") as compressed:
+                self.__write_csv(predictions, compressed, relabel)  # type: ignore[arg-type]
+        else:
+            self.__write_csv(predictions, output, relabel)
+        output.seek(0)
+        return output
+
+    @fragment
+    def render(self, predictions: DataFrame | TextIO, relabel: Relabel | None = None) -> None:
+        """
+        Renders the export of the predictions. Nothing is serialized until the user asks
+        for a format, and the choice only reruns this fragment, not the whole batch tab.
+
+        Args:
+            predictions (DataFrame | TextIO): Labelled rows, or a CSV stream of them, which
+                must stay open while the tab is displayed.
+            relabel (Relabel | None, optional): Labels the chunks of a CSV stream again,
+                when the labels it was written with are stale. Defaults to None.
+        """
+        file_format: str = radio("Export format", list(self.FORMATS), horizontal=True)
+        if button("Prepare download"):
+            extension, mime = self.FORMATS[file_format]
+            download_button(
+                label=f"Download results as {file_format}",
+                data=self.export(predictions, file_format, relabel),
+                file_name=f"{self.FILE_NAME}.{extension}",
+                mime=mime,
+                on_click="ignore",
+            )
@@ -0,0 +1,23 @@
+from pandas import DataFrame
+from streamlit import caption, dataframe, expander
+
+from src.view.base_view import BaseView
+
+
+class FeatureDriftView(BaseView):
+    def render(self, batch: DataFrame, observed: DataFrame) -> None:
+        """
+        Renders how far the features of this batch, and of every batch scored so far,
+        are from the training data, inside a collapsed expander.
+
+        Args:
+            batch (DataFrame): Drift report of this batch, one row per feature.
+            observed (DataFrame): Drift report of every batch scored by the app.
+        """
+        drifted: list[str] = batch.loc[batch["drifted"], "feature"].tolist()
+        title: str = f"📈 Feature drift: {', '.join(drifted)}" if drifted else "📈 No feature drift"
+        with expander(title):
+            caption("This batch against the training data")
+            dataframe(batch, hide_index=True)
+            caption("Every batch scored so far against the training data")
+            dataframe(observed, hide_index=True)
@@ -1,21 +1,100 @@
-from matplotlib import pyplot as plt
+from typing import TYPE_CHECKING, ClassVar
+
+from numpy import arange, exp, histogram, linspace, ndarray
+from numpy.fft import irfft, rfft
 from pandas import DataFrame
-from seaborn import kdeplot
-from streamlit import columns, metric, pyplot, subheader
+from streamlit import cache_resource, columns, metric, pyplot, subheader
 
 from src.controller.streamlit_controller import StreamlitController
 from src.view.base_view import BaseView
 
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+
+@cache_resource(max_entries=16)
+def _density_figure(
+    grid: ndarray, densities: tuple[tuple[str, ndarray], ...], colors: tuple[str, ...]
+) -> "Figure":
+    """
+    Draws the density curves of every prediction class. Inputs have a fixed size whatever
+    the batch size, and the figure is cached so reruns over the same batch reuse it.
+
+    Args:
+        grid (ndarray): Credit amounts the densities are evaluated at.
+        densities (tuple[tuple[str, ndarray], ...]): Label and density of every class.
+        colors (tuple[str, ...]): Fill color of every class.
+
+    Returns:
+        Figure: The configured matplotlib figure.
+    """
+    from matplotlib.figure import Figure  # loaded on the first plot
+
+    figure: Figure = Figure(figsize=(10, 6))
+    axes = figure.subplots()
+    for (label, density), color in zip(densities, colors, strict=True):
+        axes.fill_between(grid, density, alpha=0.5, color=color, label=label)
+        axes.plot(grid, density, color=color, linewidth=1)
+    axes.legend(title=StreamlitController.CREDIT_REQUEST_COL, frameon=False)
+    axes.set_title("Distribution of Credit Amounts by Decision")
+    axes.set_xlabel("Credit Amount (€)")
+    axes.set_ylabel("Density")
+
+    axes.get_yaxis().set_visible(False)  # remove Y axis
+
+    for spine in ["top", "right", "left"]:
+        axes.spines[spine].set_visible(False)  # remove frame
+
+    return figure
+
 
 class PredictionsStatsView(BaseView):
     PLOT_COLUMNS: list[str] = StreamlitController.PLOT_COLUMNS
+    PALETTE: ClassVar[dict[str, str]] = {
+        StreamlitController.CREDIT_REQUEST_MAPPINGS[0]: "#EF553B",
+        StreamlitController.CREDIT_REQUEST_MAPPINGS[1]: "#00CC96",
+    }
+    GRID_SIZE: ClassVar[int] = 512  # points every density is evaluated at
+    CUT: ClassVar[float] = 3.0  # bandwidths the grid extends past the data, like seaborn
+
+    @staticmethod
+    def __scott_bandwidth(values: ndarray) -> float:
+        """Gaussian kernel bandwidth by Scott's rule, the seaborn (scipy) default."""
+        return float(values.std(ddof=1) * len(values) ** (-1 / 5))
 
-    def __plot_credit_distribution_by_prediction(self, plot_data: DataFrame) -> plt:
+    def __binned_density(self, values: ndarray, grid: ndarray, bandwidth: float) -> ndarray:
         """
-        Creates a KDE plot showing the distribution of credit amounts
-        segmented by prediction class (e.g., approved or denied).
+        Gaussian KDE of `values` evaluated on `grid`: the values are binned on the grid once
+        and the counts are convolved with the kernel through an FFT, so the cost past the
+        binning does not depend on the number of values.
 
-        The Y-axis and left/top/right frame lines are removed for a cleaner appearance.
+        Args:
+            values (ndarray): Credit amounts of one prediction class.
+            grid (ndarray): Evenly spaced evaluation points.
+            bandwidth (float): Standard deviation of the Gaussian kernel.
+
+        Returns:
+            ndarray: Density at every grid point, integrating to one.
+        """
+        step: float = float(grid[1] - grid[0])
+        counts: ndarray = histogram(
+            values, bins=len(grid), range=(grid[0] - step / 2, grid[-1] + step / 2)
+        )[0]
+        offsets: ndarray = arange(-(len(grid) - 1), len(grid)) * step
+        kernel: ndarray = exp(-0.5 * (offsets / bandwidth) ** 2)
+        size: int = 1 << (len(counts) + len(kernel) - 2).bit_length()  # no circular wrap
+        convolved: ndarray = irfft(rfft(counts, size) * rfft(kernel, size), size)
+        density: ndarray = convolved[len(grid) - 1 : 2 * len(grid) - 1].clip(min=0)
+        normalized: ndarray = density / (density.sum() * step)
+        return normalized
+
+    def __credit_distribution_by_prediction(
+        self, plot_data: DataFrame
+    ) -> tuple[ndarray, tuple[tuple[str, ndarray], ...], tuple[str, ...]]:
+        """
+        Reduces the plot data to a fixed-size density per prediction class, each normalized
+        on its own (like `kdeplot(common_norm=False)`). Classes with fewer than two distinct
+        credit amounts have no density and are left out.
 
         Args:
             plot_data (DataFrame): DataFrame containing the prediction results with
@@ -24,28 +103,35 @@ class PredictionsStatsView(BaseView):
                 - One categorical column for the prediction label.
 
         Returns:
-            matplotlib.pyplot: The configured matplotlib plot object.
+            tuple: The evaluation grid, the label and density of every class and their colors.
         """
-        plt.figure(figsize=(10, 6))
-        kdeplot(
-            data=plot_data,
-            x=self.PLOT_COLUMNS[0],
-            hue=self.PLOT_COLUMNS[1],
-            fill=True,
-            common_norm=False,
-            alpha=0.5,
-            palette=["#EF553B", "#00CC96"],
-        )
-        plt.title("Distribution of Credit Amounts by Decision")
-        plt.xlabel("Credit Amount (€)")
-        plt.ylabel("Density")
-
-        plt.gca().axes.get_yaxis().set_visible(False)  # remove Y axis
-
-        for spine in ["top", "right", "left"]:
-            plt.gca().spines[spine].set_visible(False)  # remove frame
+        amount_col, label_col = self.PLOT_COLUMNS
+        classes: dict[str, ndarray] = {
+            str(label): group[amount_col].to_numpy(dtype=float)
+            for label, group in plot_data.groupby(label_col, observed=True)
+            if group[amount_col].nunique() > 1
+        }
+        if not classes:
+            return linspace(0, 1, self.GRID_SIZE), (), ()
 
-        return plt
+        bandwidths: dict[str, float] = {
+            label: self.__scott_bandwidth(values) for label, values in classes.items()
+        }
+        cut: float = self.CUT * max(bandwidths.values())
+        grid: ndarray = linspace(
+            min(values.min() for values in classes.values()) - cut,
+            max(values.max() for values in classes.values()) + cut,
+            self.GRID_SIZE,
+        )
+        labels: list[str] = sorted(classes, key=list(self.PALETTE).index)
+        return (
+            grid,
+            tuple(
+                (label, self.__binned_density(classes[label], grid, bandwidths[label]))
+                for label in labels
+            ),
+            tuple(self.PALETTE[label] for label in labels),
+        )
 
     def render(self, approval_rate: float, rejection_rate: float, plot_data: DataFrame) -> None:
         """
@@ -67,4 +153,4 @@ class PredictionsStatsView(BaseView):
         with right:
             metric("❌ Denied Requests (%)", f"{rejection_rate:.1f}%")
 
-        pyplot(self.__plot_credit_distribution_by_prediction(plot_data))
+        pyplot(_density_figure(*self.__credit_distribution_by_prediction(plot_data)))
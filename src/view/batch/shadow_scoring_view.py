@@ -0,0 +1,37 @@
+from streamlit import caption, columns, error, expander, info, metric
+
+from src.service.shadow_scoring_service import ShadowReport
+from src.view.base_view import BaseView
+
+
+class ShadowScoringView(BaseView):
+    def render(self, report: ShadowReport) -> None:
+        """
+        Renders how the candidate model compares with the served one on this batch, inside
+        a collapsed expander. The candidate scores in the background, so the comparison may
+        still be incomplete when the batch results are shown.
+
+        Args:
+            report (ShadowReport): Comparison accumulated while the batch was scored.
+        """
+        with expander("🧪 Candidate model (shadow scoring)"):
+            if report.error is not None:
+                error(report.error)
+            if not report.rows:
+                info("The candidate model is still scoring this batch.")
+                return
+
+            agreement, approval, latency = columns(3)
+            with agreement:
+                metric("Agreement (%)", f"{report.agreement_rate:.1f}%")
+            with approval:
+                metric("Approval rate change", f"{report.approval_rate_change:+.1f} pp")
+            with latency:
+                metric("Extra latency", f"{report.extra_latency * 1000:+,.0f} ms")
+            caption(
+                f"{report.rows:,} requests compared"
+                + (f", {report.skipped:,} skipped" if report.skipped else "")
+                + ("" if report.finished else ", more to come")
+                + ". Latency is what serving the candidate would add, this batch was not "
+                "slowed down."
+            )
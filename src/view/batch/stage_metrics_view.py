@@ -0,0 +1,19 @@
+from pandas import DataFrame
+from streamlit import code, dataframe, expander
+
+from src.view.base_view import BaseView
+
+
+class StageMetricsView(BaseView):
+    def render(self, last_run: DataFrame, prometheus_text: str) -> None:
+        """
+        Renders the time spent in every stage of the last batch run, and the
+        process-wide totals as Prometheus text, inside a collapsed expander.
+
+        Args:
+            last_run (DataFrame): Calls, seconds and rows of every stage of the last run.
+            prometheus_text (str): Totals in the Prometheus text exposition format.
+        """
+        with expander("⏱️ Stage timings of the last run"):
+            dataframe(last_run.sort_values("seconds", ascending=False), hide_index=True)
+            code(prometheus_text, language="text")
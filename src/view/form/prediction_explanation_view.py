@@ -0,0 +1,42 @@
+from typing import ClassVar
+
+from pandas import Series
+from streamlit import caption, pyplot, subheader
+
+from src.view.base_view import BaseView
+
+
+class PredictionExplanationView(BaseView):
+    COLORS: ClassVar[tuple[str, str]] = ("#EF553B", "#00CC96")  # against, in favour
+
+    def render(self, contributions: Series, expected_value: float) -> None:
+        """
+        Renders how much every answer of the form moved the request towards approval
+        (green) or rejection (red), largest effects first.
+
+        Args:
+            contributions (Series): Contribution of every feature to the log-odds of approval.
+            expected_value (float): Log-odds of approval of the average request.
+        """
+        from matplotlib.figure import Figure  # loaded on the first explanation
+
+        ordered: Series = contributions.reindex(contributions.abs().sort_values().index)
+
+        figure: Figure = Figure(figsize=(10, 4))
+        axes = figure.subplots()
+        axes.barh(
+            ordered.index,
+            ordered.to_numpy(),
+            color=[self.COLORS[value > 0] for value in ordered],
+        )
+        axes.axvline(0, color="grey", linewidth=1)
+        axes.set_xlabel("Contribution to the log-odds of approval")
+        for spine in ["top", "right", "left"]:
+            axes.spines[spine].set_visible(False)  # remove frame
+
+        subheader("What Drove This Decision")
+        pyplot(figure)
+        caption(
+            f"Contributions are relative to an average applicant, whose log-odds of approval "
+            f"are {expected_value:.2f}. They add up to the log-odds of this request."
+        )